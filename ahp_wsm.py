@@ -1,4 +1,8 @@
+from fractions import Fraction
 
+import numpy as np
+
+from modelo import aplanar_jerarquia, como_problema, es_jerarquico
 
 
 def normalizar_pesos(criterios: list[dict]) -> list[dict]:
@@ -6,6 +10,10 @@ def normalizar_pesos(criterios: list[dict]) -> list[dict]:
     if not criterios:
         raise ValueError("La lista de criterios está vacía.")
 
+    # Con columna 'Padre': solo las hojas, con su peso global
+    if es_jerarquico(criterios):
+        return aplanar_jerarquia(criterios)
+
     total = sum(c['Importancia (1-10)'] for c in criterios)
 
     if total == 0:
@@ -46,83 +54,307 @@ def calcular_score(valores_normalizados: dict, criterios_con_pesos: list[dict])
     return score
 
 
-def rankear_alternativas(alternativas: list[dict], criterios: list[dict]) -> list[dict]:
-    
-    if not alternativas:
-        raise ValueError("No hay alternativas para evaluar.")
+# ── AHP CON COMPARACIONES POR PARES ───────────────────────
+
+# Índice aleatorio de Saaty (RI) según el número de criterios
+INDICE_ALEATORIO = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32,
+                    8: 1.41, 9: 1.45, 10: 1.49, 11: 1.51, 12: 1.48, 13: 1.56,
+                    14: 1.57, 15: 1.59}
+
+# Razón de consistencia máxima aceptable
+CR_MAXIMO = 0.10
+
+
+def _juicio(valor):
+    # Acepta 3, 0.333 o '1/3'; None si la celda está vacía
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    texto = str(valor).strip()
+    if texto == '' or texto.lower() == 'nan':
+        return None
+    return float(Fraction(texto))
+
+
+def matriz_comparaciones(registros: list[dict], nombres_crit: list[str]) -> np.ndarray:
+    """
+    Construye la matriz de Saaty (criterios × criterios) desde la hoja
+    Comparaciones: una fila por criterio (columna 'Criterio') y una columna
+    por criterio; la celda (A, B) dice cuántas veces A es más importante que B.
+    Basta con llenar un triángulo: las celdas vacías toman el recíproco.
+    """
+    n = len(nombres_crit)
+    indice = {nombre: j for j, nombre in enumerate(nombres_crit)}
+    matriz = np.full((n, n), np.nan)
+    np.fill_diagonal(matriz, 1.0)
+
+    for reg in registros:
+        fila = str(reg.get('Criterio', '')).strip()
+        if fila not in indice:
+            raise ValueError(f"Comparación para un criterio desconocido: '{fila}'.")
+        for columna, j in indice.items():
+            valor = _juicio(reg.get(columna))
+            if valor is None or columna == fila:
+                continue
+            if valor <= 0:
+                raise ValueError(f"La comparación {fila} vs {columna} debe ser positiva.")
+            matriz[indice[fila], j] = valor
+
+    # Completar con recíprocos y verificar los pares llenados dos veces
+    for i in range(n):
+        for j in range(i + 1, n):
+            a, b = matriz[i, j], matriz[j, i]
+            if np.isnan(a) and np.isnan(b):
+                raise ValueError(f"Falta la comparación entre '{nombres_crit[i]}' "
+                                 f"y '{nombres_crit[j]}'.")
+            if np.isnan(a):
+                matriz[i, j] = 1 / b
+            elif np.isnan(b):
+                matriz[j, i] = 1 / a
+            elif abs(a * b - 1) > 0.01:
+                raise ValueError(f"Las comparaciones entre '{nombres_crit[i]}' y "
+                                 f"'{nombres_crit[j]}' no son recíprocas ({a:g} y {b:g}).")
+    return matriz
+
+
+def pesos_autovector(matrices, tolerancia: float = 1e-10, max_iter: int = 500) -> tuple:
+    """
+    Autovector principal por iteración de potencias. Acepta una matriz
+    (n × n) o un lote (m × n × n) que se resuelve a la vez con matmul.
+    Retorna (pesos, lambda_max) con pesos normalizados a suma 1.
+    """
+    matrices = np.asarray(matrices, dtype=float)
+
+    # Arranque con la media geométrica de cada fila (ya cerca del autovector)
+    pesos = np.exp(np.log(matrices).mean(axis=-1))
+    pesos /= pesos.sum(axis=-1, keepdims=True)
+
+    for _ in range(max_iter):
+        producto = np.matmul(matrices, pesos[..., None])[..., 0]
+        nuevos   = producto / producto.sum(axis=-1, keepdims=True)
+        listo    = np.max(np.abs(nuevos - pesos)) < tolerancia
+        pesos    = nuevos
+        if listo:
+            break
+
+    # Con suma de pesos 1, lambda_max = suma(A · w)
+    lambda_max = np.matmul(matrices, pesos[..., None])[..., 0].sum(axis=-1)
+    return pesos, lambda_max
+
+
+def consistencia(lambda_max, n: int) -> dict:
+    """Índice (CI) y razón (CR) de consistencia de Saaty."""
+    ci = (lambda_max - n) / (n - 1) if n > 2 else 0.0 * lambda_max
+    ri = INDICE_ALEATORIO.get(n, INDICE_ALEATORIO[15])
+    cr = ci / ri if ri > 0 else 0.0 * ci
+    return {"lambda_max": lambda_max, "ci": ci, "cr": cr}
+
+
+def pesos_ahp(criterios: list[dict], comparaciones) -> tuple:
+    """
+    Pesos AHP desde la matriz de comparaciones (registros de la hoja
+    Comparaciones o una matriz ya armada). Retorna (criterios_con_pesos,
+    consistencia): la lista tiene el mismo formato que normalizar_pesos,
+    con el autovector en el campo 'peso', así que el resto del flujo no
+    cambia.
+    """
     if not criterios:
-        raise ValueError("No hay criterios definidos.")
+        raise ValueError("La lista de criterios está vacía.")
+    if es_jerarquico(criterios):
+        raise ValueError("Las comparaciones por pares requieren criterios sin jerarquía (columna Padre).")
+
+    nombres_crit = [c['Criterio'] for c in criterios]
+    if isinstance(comparaciones, np.ndarray):
+        matriz = comparaciones
+    else:
+        matriz = matriz_comparaciones(comparaciones, nombres_crit)
 
-    # PASO 1: Normalizar pesos de criterios
-    criterios_con_pesos = normalizar_pesos(criterios)
+    pesos, lambda_max = pesos_autovector(matriz)
+    indices = consistencia(float(lambda_max), len(nombres_crit))
+    indices["consistente"] = indices["cr"] <= CR_MAXIMO
 
-    # PASO 2: Para cada criterio, calcular el rango global usando el promedio de cada alternativa
-    # Usamos el promedio de (Min + Max) / 2 como valor representativo de cada alternativa
-    rangos_globales = {}
-    for criterio in criterios_con_pesos:
-        nombre = criterio['Criterio']
-        col_min = f"{nombre}_Min"
-        col_max = f"{nombre}_Max"
-
-        # Calculamos el valor promedio de cada alternativa para este criterio
-        promedios = []
-        for alt in alternativas:
-            if col_min in alt and col_max in alt:
-                promedio = (alt[col_min] + alt[col_max]) / 2
-            elif nombre in alt:
-                # Por si el criterio tiene un solo valor (sin rango)
-                promedio = alt[nombre]
-            else:
-                promedio = 0.0
-            promedios.append(promedio)
-
-        rangos_globales[nombre] = {
-            'min': min(promedios),
-            'max': max(promedios),
-            'tipo': criterio['Tipo']
+    resultado = []
+    for c, peso in zip(criterios, pesos.tolist()):
+        copia = dict(c)
+        copia['peso'] = peso
+        resultado.append(copia)
+
+    return resultado, indices
+
+
+def perturbar_comparaciones(matriz: np.ndarray, n: int, dispersion: float, rng) -> np.ndarray:
+    """
+    Lote de n matrices con juicios perturbados: cada celda del triángulo
+    superior se multiplica por un factor lognormal (sigma = dispersion en
+    escala log) y el inferior conserva la reciprocidad.
+    """
+    k = matriz.shape[0]
+    superior = np.triu_indices(k, 1)
+
+    ruido = np.zeros((n, k, k))
+    ruido[:, superior[0], superior[1]] = rng.normal(0.0, dispersion, (n, superior[0].size))
+    ruido -= ruido.transpose(0, 2, 1)
+    return matriz * np.exp(ruido)
+
+
+def muestrear_pesos_ahp(matriz: np.ndarray, n: int, dispersion: float, rng) -> np.ndarray:
+    """Pesos (n × criterios) de n juicios perturbados, resueltos en un solo lote."""
+    pesos, _ = pesos_autovector(perturbar_comparaciones(matriz, n, dispersion, rng))
+    return pesos
+
+
+def matriz_normalizada(alternativas, criterios: list[dict] = None) -> tuple:
+    """
+    Matriz de decisión normalizada del WSM, en NumPy. Acepta registros o
+    un DecisionProblem (en ese caso `criterios` se omite).
+    Retorna (nombres, nombres_criterios, X, pesos): X es (alternativas ×
+    criterios) con la normalización 0-1 de rankear_alternativas sobre el
+    punto medio de cada rango y `pesos` el vector de pesos normalizados,
+    así que X @ pesos son los scores.
+    """
+    problema = como_problema(alternativas, criterios)
+
+    valores = (problema.mins + problema.maxs) / 2
+    minimos = valores.min(axis=0)
+    maximos = valores.max(axis=0)
+    rango   = maximos - minimos
+
+    # Rango nulo: todas las alternativas reciben 0.5 en ese criterio
+    divisor = np.where(rango == 0, 1.0, rango)
+    X = np.where(problema.minimizar, maximos - valores, valores - minimos) / divisor
+    X[:, rango == 0] = 0.5
+
+    return problema.nombres, problema.criterios, X, problema.pesos
+
+
+# Intervalo de pesos del criterio j en que cada par (a sobre b) conserva su orden
+def _limites_pares(delta: np.ndarray, dif_x: np.ndarray, pesos: np.ndarray) -> tuple:
+    """
+    Al mover el peso j a t (los demás reescalados en proporción), la
+    diferencia de scores del par es lineal en t, vale `delta` en t = w_j y
+    tiene pendiente (dif_x_j - delta) / (1 - w_j). El orden se invierte en
+        t* = w_j - delta (1 - w_j) / (dif_x_j - delta)
+    que es cota inferior si la pendiente es positiva y superior si es negativa.
+    Retorna (inferior, superior, par_inferior, par_superior) por criterio.
+    """
+    libre     = pesos < 1 - 1e-12
+    pendiente = (dif_x - delta[:, None]) / np.where(libre, 1 - pesos, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cruce = pesos - delta[:, None] / pendiente
+
+    cotas_inf = np.where(pendiente > 1e-12, cruce, -np.inf)
+    cotas_sup = np.where(pendiente < -1e-12, cruce, np.inf)
+    par_inf   = np.argmax(cotas_inf, axis=0)
+    par_sup   = np.argmin(cotas_sup, axis=0)
+
+    columnas = np.arange(pesos.size)
+    inferior = np.clip(cotas_inf[par_inf, columnas], 0.0, pesos)
+    superior = np.clip(cotas_sup[par_sup, columnas], pesos, 1.0)
+
+    # Sin ningún cruce dentro de (0, 1) en un lado, el límite es el extremo
+    # y no hay rival: un cruce fuera de rango nunca se alcanza y uno en el
+    # extremo mismo solo empata
+    cruce_inf = cotas_inf[par_inf, columnas]
+    cruce_sup = cotas_sup[par_sup, columnas]
+    par_inf = np.where(cruce_inf > 1e-12, par_inf, -1)
+    par_sup = np.where(cruce_sup < 1 - 1e-12, par_sup, -1)
+
+    # Un criterio con todo el peso no tiene hacia dónde reescalar los demás
+    inferior[~libre] = superior[~libre] = pesos[~libre]
+    return inferior, superior, par_inf, par_sup
+
+
+def intervalos_estabilidad(alternativas, criterios: list[dict] = None) -> dict:
+    """
+    Para cada criterio, cuánto puede moverse su peso (los demás se
+    reescalan en proporción) sin que cambie el ganador ni el orden de
+    ningún par de alternativas consecutivas del ranking. Es una fórmula
+    cerrada sobre la matriz normalizada: no simula ni recorre una rejilla.
+
+    Retorna:
+      - "ganador": alternativa en primer lugar;
+      - "criterios": {criterio: {"peso", "minimo", "maximo", "rival_minimo",
+        "rival_maximo"}}, donde los rivales son las alternativas que pasarían
+        a ganar en cada límite (None si el límite es 0 o 1);
+      - "ranking": {criterio: {"minimo", "maximo"}} para el orden completo.
+    """
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    scores = X @ pesos
+    orden  = np.argsort(-np.round(scores, 4), kind="stable")
+
+    # Diferencias negativas dentro del redondeo son empates
+    def _pares(arriba, abajo):
+        delta = np.maximum(scores[arriba] - scores[abajo], 0.0)
+        delta[delta < 1e-12] = 0.0
+        return _limites_pares(delta, X[arriba] - X[abajo], pesos)
+
+    ganador = orden[0]
+    rivales = orden[1:]
+    g_inf, g_sup, r_inf, r_sup = _pares(np.full(rivales.size, ganador), rivales)
+    o_inf, o_sup, _, _         = _pares(orden[:-1], orden[1:])
+
+    def _rival(indice):
+        return nombres[rivales[indice]] if indice >= 0 else None
+
+    return {
+        "ganador": nombres[ganador],
+        "criterios": {
+            nombre: {
+                "peso":         float(pesos[j]),
+                "minimo":       float(g_inf[j]),
+                "maximo":       float(g_sup[j]),
+                "rival_minimo": _rival(r_inf[j]),
+                "rival_maximo": _rival(r_sup[j])
+            } for j, nombre in enumerate(nombres_crit)
+        },
+        "ranking": {
+            nombre: {"minimo": float(o_inf[j]), "maximo": float(o_sup[j])}
+            for j, nombre in enumerate(nombres_crit)
         }
+    }
+
+
+# Índices de los k mejores scores, en el mismo orden que un argsort estable completo
+def seleccionar_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    argpartition elige k candidatos en O(n); los empates en el umbral se
+    resuelven por índice (como el orden estable) y solo se ordenan los k.
+    """
+    if k >= scores.size:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=int)
+
+    umbral    = scores[np.argpartition(-scores, k - 1)[:k]].min()
+    mayores   = np.flatnonzero(scores > umbral)
+    empatados = np.flatnonzero(scores == umbral)[:k - mayores.size]
+    elegidos  = np.concatenate([mayores, empatados])
+    return elegidos[np.argsort(-scores[elegidos], kind="stable")]
 
-    # PASO 3 y 4: Normalizar valores y calcular score por alternativa
-    resultados = []
-    pesos_dict = {c['Criterio']: c['peso'] for c in criterios_con_pesos}
-
-    for alt in alternativas:
-        valores_normalizados = {}
-
-        for criterio in criterios_con_pesos:
-            nombre = criterio['Criterio']
-            col_min = f"{nombre}_Min"
-            col_max = f"{nombre}_Max"
-
-            # Valor representativo de esta alternativa para este criterio
-            if col_min in alt and col_max in alt:
-                valor_repr = (alt[col_min] + alt[col_max]) / 2
-            elif nombre in alt:
-                valor_repr = alt[nombre]
-            else:
-                valor_repr = 0.0
-
-            rango = rangos_globales[nombre]
-            valores_normalizados[nombre] = normalizar_valores(
-                valor=valor_repr,
-                minimo=rango['min'],
-                maximo=rango['max'],
-                tipo=rango['tipo']
-            )
-
-        score = calcular_score(valores_normalizados, criterios_con_pesos)
-
-        resultados.append({
-            'alternativa': alt['Alternativa'],
-            'score': round(score, 4),
-            'desglose': {k: round(v, 4) for k, v in valores_normalizados.items()},
-            'pesos': pesos_dict
-        })
-
-    # PASO 5: Ordenar de mayor a menor score
-    resultados.sort(key=lambda x: x['score'], reverse=True)
-
-    return resultados
+
+def rankear_alternativas(alternativas, criterios: list[dict] = None, top_k: int = None) -> list[dict]:
+    # Acepta registros (alternativas, criterios) o un DecisionProblem.
+    # Con top_k solo se ordenan y desglosan las k mejores (catálogos grandes).
+
+    # PASO 1 y 2: Pesos normalizados y matriz de decisión normalizada (escala 0-1)
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+
+    # PASO 3 y 4: Todos los scores con un solo producto matriz-vector
+    scores   = np.round(X @ pesos, 4)
+    pesos_dict = dict(zip(nombres_crit, pesos.tolist()))
+
+    # PASO 5: Ordenar de mayor a menor score (estable: los empates conservan el orden)
+    if top_k is None:
+        orden = np.argsort(-scores, kind="stable")
+    else:
+        orden = seleccionar_top_k(scores, top_k)
+    desglose = np.round(X[orden], 4).tolist()
+
+    return [{
+        'alternativa': nombres[i],
+        'score': float(scores[i]),
+        'desglose': dict(zip(nombres_crit, fila)),
+        'pesos': pesos_dict
+    } for i, fila in zip(orden, desglose)]
 
 
 if __name__ == "__main__":
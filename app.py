@@ -5,10 +5,16 @@ import os
 import copy
 import pandas as pd
 
-from excel_reader import leer_alternativas, leer_criterios, leer_configuracion, validar_excel
-from ahp_wsm import rankear_alternativas, normalizar_pesos
-from montecarlo import simular_todas
-from recomendacion import generar_recomendacion, generar_razones, generar_advertencias, generar_tabla_resumen
+from excel_reader import (leer_alternativas, leer_criterios, leer_configuracion,
+                          leer_correlaciones, leer_comparaciones, validar_excel)
+from ahp_wsm import normalizar_pesos, intervalos_estabilidad, pesos_ahp
+from modelo import DecisionProblem, criterios_hoja
+from incremental import RankingIncremental, SimulacionIncremental
+from montecarlo import MAX_ELEMENTOS_BLOQUE, simular_todas
+from recomendacion import (generar_recomendacion, generar_razones, generar_advertencias,
+                          generar_tabla_resumen, generar_estabilidad, generar_consistencia,
+                          generar_dominadas)
+from cache_resultados import CacheResultados, clave_analisis
 
 # --- CONFIGURACIÓN ESTÉTICA PLANA ---
 BG_COLOR      = "#ffffff"
@@ -59,6 +65,30 @@ def col_width(header: str, rows: list, key: str, char_px: int = 9, pad: int = 20
     return max(100, max_len * char_px + pad)
 
 
+def config_entero(conf: dict, clave: str, defecto=None):
+    """Lee un parámetro entero opcional de la hoja Configuracion."""
+    valor = conf.get(clave)
+    if valor is None or pd.isna(valor) or str(valor).strip() == "":
+        return defecto
+    return int(float(valor))
+
+
+def config_decimal(conf: dict, clave: str, defecto=None):
+    """Lee un parámetro decimal opcional de la hoja Configuracion."""
+    valor = conf.get(clave)
+    if valor is None or pd.isna(valor) or str(valor).strip() == "":
+        return defecto
+    return float(valor)
+
+
+def config_texto(conf: dict, clave: str, defecto: str = "") -> str:
+    """Lee un parámetro de texto opcional de la hoja Configuracion."""
+    valor = conf.get(clave)
+    if valor is None or pd.isna(valor) or str(valor).strip() == "":
+        return defecto
+    return str(valor).strip()
+
+
 # ─────────────────────────────────────────────────────────
 #  DIÁLOGOS AUXILIARES
 # ─────────────────────────────────────────────────────────
@@ -98,8 +128,16 @@ class DialogCriterio(tk.Toplevel):
         tk.Radiobutton(frame_radio, text="maximizar", variable=self.tipo_var,
                        value="maximizar", bg=BG_COLOR, font=FONT_MAIN).pack(side="left", padx=10)
 
+        # Criterio que agrupa a este (vacío = nivel superior)
+        tk.Label(self, text="Padre (opcional):", font=FONT_MAIN,
+                 bg=BG_COLOR, fg=TEXT_PRIMARY).grid(row=3, column=0, padx=15, pady=5, sticky="w")
+        self.ent_padre = tk.Entry(self, font=FONT_MAIN, width=24)
+        padre = datos.get("Padre", "")
+        self.ent_padre.insert(0, "" if str(padre) == "nan" else str(padre))
+        self.ent_padre.grid(row=3, column=1, padx=15, pady=5)
+
         btn_frame = tk.Frame(self, bg=BG_COLOR)
-        btn_frame.grid(row=3, column=0, columnspan=2, pady=15)
+        btn_frame.grid(row=4, column=0, columnspan=2, pady=15)
         tk.Button(btn_frame, text="Guardar", command=self._guardar,
                   bg=ACCENT_COLOR, fg="white", font=FONT_BOLD,
                   relief="flat", padx=14, pady=5, cursor="hand2").pack(side="left", padx=5)
@@ -126,6 +164,9 @@ class DialogCriterio(tk.Toplevel):
             return
 
         self.resultado = {"Criterio": nombre, "Importancia (1-10)": imp, "Tipo": tipo}
+        padre = self.ent_padre.get().strip()
+        if padre:
+            self.resultado["Padre"] = padre
         self.destroy()
 
 
@@ -240,6 +281,15 @@ class App(tk.Tk):
         self.datos_alternativas: list[dict] = []
         self.datos_criterios:    list[dict] = []
         self.datos_config:       dict       = {"Iteraciones": 10000, "Nombre Decision": "Decisión"}
+        self.datos_correlaciones: list[dict] = []
+        self.datos_comparaciones: list[dict] = []
+
+        # Resultados ya calculados (compartidos en disco con los scripts)
+        self.cache = CacheResultados()
+        # Ranking WSM del último análisis; entre corridas solo se aplican los cambios
+        self.ranking_incremental = None
+        # Muestras por alternativa del último análisis; solo se re-simulan las editadas
+        self.simulacion_incremental = SimulacionIncremental()
 
         self._build_ui()
 
@@ -591,8 +641,11 @@ class App(tk.Tk):
             nombre_nuevo = dlg.resultado["Criterio"]
             self.datos_criterios[idx] = dlg.resultado
 
-            # Actualizar columnas en alternativas si cambió el nombre
+            # Actualizar columnas en alternativas (y los hijos) si cambió el nombre
             if nombre_viejo != nombre_nuevo:
+                for c in self.datos_criterios:
+                    if c.get("Padre") == nombre_viejo:
+                        c["Padre"] = nombre_nuevo
                 for alt in self.datos_alternativas:
                     for sufijo in ("_Min", "_Max"):
                         if f"{nombre_viejo}{sufijo}" in alt:
@@ -639,7 +692,8 @@ class App(tk.Tk):
         self.lbl_alt_aviso.config(text="", fg=BG_COLOR)
 
         cols = ["Alternativa"]
-        for c in self.datos_criterios:
+        # Los criterios que agrupan a otros (columna Padre) no llevan valores
+        for c in criterios_hoja(self.datos_criterios):
             cols += [f"{c['Criterio']}_Min", f"{c['Criterio']}_Max"]
 
         self.tree_alt["columns"] = cols
@@ -659,7 +713,7 @@ class App(tk.Tk):
             messagebox.showwarning("Sin criterios",
                 "Define al menos un criterio antes de agregar alternativas.")
             return
-        dlg = DialogAlternativa(self, self.datos_criterios)
+        dlg = DialogAlternativa(self, criterios_hoja(self.datos_criterios))
         self.wait_window(dlg)
         if dlg.resultado:
             nombres = [a["Alternativa"] for a in self.datos_alternativas]
@@ -677,7 +731,7 @@ class App(tk.Tk):
             messagebox.showinfo("Selección", "Selecciona una alternativa para editar.")
             return
         idx = self.tree_alt.index(sel[0])
-        dlg = DialogAlternativa(self, self.datos_criterios,
+        dlg = DialogAlternativa(self, criterios_hoja(self.datos_criterios),
                                 datos_existentes=self.datos_alternativas[idx])
         self.wait_window(dlg)
         if dlg.resultado:
@@ -708,7 +762,7 @@ class App(tk.Tk):
             messagebox.showwarning("Validación", "Iteraciones debe ser un entero ≥ 100.")
             return
         nombre = self.ent_nombre_dec.get().strip() or "Decisión"
-        self.datos_config = {"Iteraciones": iters, "Nombre Decision": nombre}
+        self.datos_config.update({"Iteraciones": iters, "Nombre Decision": nombre})
         self.status_var.set("Configuración aplicada.")
 
     # ── GUARDAR / CARGAR EXCEL ────────────────────────────
@@ -744,6 +798,12 @@ class App(tk.Tk):
                 df_alt.to_excel(writer,  sheet_name="Alternativas",  index=False)
                 df_crit.to_excel(writer, sheet_name="Criterios",     index=False)
                 df_conf.to_excel(writer, sheet_name="Configuracion", index=False)
+                if self.datos_correlaciones:
+                    pd.DataFrame(self.datos_correlaciones).to_excel(
+                        writer, sheet_name="Correlaciones", index=False)
+                if self.datos_comparaciones:
+                    pd.DataFrame(self.datos_comparaciones).to_excel(
+                        writer, sheet_name="Comparaciones", index=False)
 
             self.archivo_path = path
             self.lbl_archivo.config(
@@ -795,9 +855,21 @@ class App(tk.Tk):
             if err:
                 conf = {"Iteraciones": 10000, "Nombre Decision": "Decisión"}
 
-            self.datos_alternativas = alts
-            self.datos_criterios    = crits
-            self.datos_config       = conf
+            corrs, err = leer_correlaciones(path)
+            if err:
+                messagebox.showerror("Error", err)
+                return
+
+            comps, err = leer_comparaciones(path)
+            if err:
+                messagebox.showerror("Error", err)
+                return
+
+            self.datos_alternativas  = alts
+            self.datos_criterios     = crits
+            self.datos_config        = conf
+            self.datos_correlaciones = corrs
+            self.datos_comparaciones = comps
 
             # Refrescar editor
             self._refrescar_tree_crit()
@@ -850,22 +922,78 @@ class App(tk.Tk):
             crits = copy.deepcopy(self.datos_criterios)
             conf  = copy.deepcopy(self.datos_config)
 
-            ranking_ahp = rankear_alternativas(alts, crits)
-
             iteraciones = int(conf.get("Iteraciones", 10000))
-            pesos_norm  = {c["Criterio"]: c["peso"]
-                           for c in normalizar_pesos(crits)}
-            res_mc = simular_todas(alts, crits, pesos_norm, iteraciones=iteraciones)
-
-            self.after(0, lambda: self._render_resultados(ranking_ahp, res_mc, conf))
+            # Con hoja Comparaciones los pesos son el autovector AHP
+            if self.datos_comparaciones:
+                crits, consistencia = pesos_ahp(crits, self.datos_comparaciones)
+            else:
+                crits, consistencia = normalizar_pesos(crits), None
+            pesos_norm  = {c["Criterio"]: c["peso"] for c in crits}
+            # Compilado una vez y compartido por todos los motores
+            problema    = DecisionProblem.desde_registros(alts, crits)
+
+            incertidumbre = config_texto(conf, "Incertidumbre pesos", "fijos").lower()
+
+            # Todo lo que cambia el resultado entra en la clave; "Procesos" no
+            opciones_mc = {
+                "semilla":    config_entero(conf, "Semilla"),
+                "tolerancia": config_decimal(conf, "Tolerancia"),
+                "muestreo":   config_texto(conf, "Muestreo", "aleatorio").lower(),
+                "correlaciones": copy.deepcopy(self.datos_correlaciones),
+                "incertidumbre_pesos": incertidumbre if incertidumbre != "fijos" else None,
+                "concentracion": config_decimal(conf, "Concentracion", 100.0),
+                "metodo":     config_texto(conf, "Metodo", "wsm").lower(),
+                "filtrar_dominadas": config_texto(conf, "Filtrar dominadas", "no").lower() in ("si", "sí"),
+                "top_k":      config_entero(conf, "Top k"),
+            }
+            if incertidumbre == "ahp":
+                opciones_mc["comparaciones"]      = copy.deepcopy(self.datos_comparaciones)
+                opciones_mc["dispersion_juicios"] = config_decimal(conf, "Dispersion juicios", 0.2)
+            # Sin modo adaptativo, re-simular solo las alternativas editadas
+            # (con filtro y top k, solo las finalistas; cada una con su flujo)
+            procesos  = config_entero(conf, "Procesos", 1)
+            simuladas = problema.n_alternativas
+            if opciones_mc["top_k"] is not None:
+                simuladas = min(simuladas, opciones_mc["top_k"])
+            incremental = (opciones_mc["tolerancia"] is None
+                           and iteraciones * simuladas * len(problema.criterios) <= MAX_ELEMENTOS_BLOQUE)
+            # Sus flujos aleatorios son otros: no comparte clave con simular_todas
+            motor = {"motor": "incremental"} if incremental else {}
+            clave = clave_analisis(alts, crits, pesos_norm, iteraciones, **opciones_mc, **motor)
+
+            def _calcular():
+                ranking = self._ranking_actual(problema, opciones_mc["top_k"])
+                if incremental:
+                    opciones = {k: v for k, v in opciones_mc.items() if k != "tolerancia"}
+                    res = self.simulacion_incremental.simular(problema, iteraciones=iteraciones,
+                                                              procesos=procesos, **opciones)
+                else:
+                    res = simular_todas(problema, iteraciones=iteraciones,
+                                        procesos=procesos, **opciones_mc)
+                return ranking, res
+
+            ranking_ahp, res_mc = self.cache.obtener_o_calcular(clave, _calcular)
+            # Fórmula cerrada: más barata que consultar la caché
+            estabilidad = intervalos_estabilidad(problema)
+
+            self.after(0, lambda: self._render_resultados(ranking_ahp, res_mc, conf,
+                                                          estabilidad, consistencia))
 
         except Exception as e:
             self.after(0, lambda: messagebox.showerror("Error de Procesamiento", str(e)))
             self.after(0, lambda: self.status_var.set("Error en el análisis."))
 
+    def _ranking_actual(self, problema, top_k=None):
+        """Mismo resultado que rankear_alternativas, re-puntuando solo lo editado."""
+        if self.ranking_incremental is None:
+            self.ranking_incremental = RankingIncremental(problema)
+        else:
+            self.ranking_incremental.sincronizar(problema)
+        return self.ranking_incremental.ranking(top_k)
+
     # ── RENDER DASHBOARD ──────────────────────────────────
 
-    def _render_resultados(self, ranking_ahp, res_mc, conf):
+    def _render_resultados(self, ranking_ahp, res_mc, conf, estabilidad=None, consistencia=None):
         for w in self.tab_dashboard.winfo_children():
             w.destroy()
 
@@ -901,6 +1029,42 @@ class App(tk.Tk):
             tree.insert("", "end", values=list(row))
         tree.pack(fill="x", pady=(0, 16))
 
+        # ESTABILIDAD DE LOS PESOS
+        if estabilidad:
+            est_box = tk.Frame(container, bg=SURFACE_COLOR, padx=14, pady=14,
+                               highlightbackground=BORDER_COLOR, highlightthickness=1)
+            est_box.pack(fill="x", pady=(0, 16))
+            tk.Label(est_box, text="ESTABILIDAD DE LOS PESOS", font=FONT_BOLD,
+                     fg=ACCENT_COLOR, bg=SURFACE_COLOR).pack(anchor="w")
+            tk.Label(est_box,
+                     text=generar_estabilidad(estabilidad),
+                     font=FONT_MAIN, fg=TEXT_PRIMARY, bg=SURFACE_COLOR,
+                     justify="left", wraplength=950).pack(anchor="w", pady=(6, 0))
+
+        # CONSISTENCIA DE LOS JUICIOS (solo con hoja Comparaciones)
+        if consistencia:
+            cons_box = tk.Frame(container, bg=SURFACE_COLOR, padx=14, pady=14,
+                                highlightbackground=BORDER_COLOR, highlightthickness=1)
+            cons_box.pack(fill="x", pady=(0, 16))
+            tk.Label(cons_box, text="CONSISTENCIA DE LOS JUICIOS (AHP)", font=FONT_BOLD,
+                     fg=ACCENT_COLOR, bg=SURFACE_COLOR).pack(anchor="w")
+            tk.Label(cons_box,
+                     text=generar_consistencia(consistencia),
+                     font=FONT_MAIN, fg=TEXT_PRIMARY, bg=SURFACE_COLOR,
+                     justify="left", wraplength=950).pack(anchor="w", pady=(6, 0))
+
+        # ALTERNATIVAS DESCARTADAS (sin simular, nunca pueden ganar)
+        if res_mc.get("dominadas"):
+            dom_box = tk.Frame(container, bg=SURFACE_COLOR, padx=14, pady=14,
+                               highlightbackground=BORDER_COLOR, highlightthickness=1)
+            dom_box.pack(fill="x", pady=(0, 16))
+            tk.Label(dom_box, text="ALTERNATIVAS DOMINADAS", font=FONT_BOLD,
+                     fg=ACCENT_COLOR, bg=SURFACE_COLOR).pack(anchor="w")
+            tk.Label(dom_box,
+                     text=generar_dominadas(res_mc["dominadas"]),
+                     font=FONT_MAIN, fg=TEXT_PRIMARY, bg=SURFACE_COLOR,
+                     justify="left", wraplength=950).pack(anchor="w", pady=(6, 0))
+
         # ALERTAS
         alert_box = tk.Frame(container, bg="#fff3f3", padx=14, pady=14,
                              highlightbackground="#f5c2c7", highlightthickness=1)
@@ -914,7 +1078,8 @@ class App(tk.Tk):
 
         self.status_var.set(
             f"Análisis completado  •  Mejor opción: {ganador_ahp}  •  "
-            f"Ganador MC: {ganador_mc}"
+            f"Ganador MC: {ganador_mc}  •  "
+            f"{res_mc.get('iteraciones', 0):,} iteraciones"
         )
         self.notebook.select(self.tab_dashboard)
 
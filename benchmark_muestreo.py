@@ -0,0 +1,88 @@
+import sys
+import time
+
+import numpy as np
+
+from excel_reader import leer_alternativas, leer_criterios
+from ahp_wsm import normalizar_pesos
+from montecarlo import simular_matriz, METODOS_MUESTREO
+
+
+def _media_y_prob(matriz):
+    """Valor esperado y probabilidad de ganar sin redondear."""
+    ganadores = np.argmax(matriz, axis=0)
+    prob = np.bincount(ganadores, minlength=matriz.shape[0]) / matriz.shape[1]
+    return matriz.mean(axis=1), prob
+
+
+def calcular_referencia(alternativas, criterios, pesos, replicas=32, tam=2**16):
+    """Promedio de muchas réplicas Sobol: referencia de alta precisión."""
+    medias, probs = [], []
+    for r in range(replicas):
+        matriz = simular_matriz(alternativas, criterios, pesos, tam,
+                                rng=np.random.default_rng(10_000 + r), muestreo="sobol")
+        media, prob = _media_y_prob(matriz)
+        medias.append(media)
+        probs.append(prob)
+    return np.mean(medias, axis=0), np.mean(probs, axis=0)
+
+
+def correr_benchmark(archivo, presupuesto=4096, repeticiones=30):
+    """
+    Error cuadrático medio (RMSE) de 'media' y 'prob_ganar' por método de
+    muestreo con el mismo número de iteraciones, sobre varias repeticiones.
+    """
+    alternativas, err = leer_alternativas(archivo)
+    if err:
+        raise ValueError(err)
+    criterios, err = leer_criterios(archivo)
+    if err:
+        raise ValueError(err)
+    pesos = {c['Criterio']: c['peso'] for c in normalizar_pesos(criterios)}
+
+    ref_media, ref_prob = calcular_referencia(alternativas, criterios, pesos)
+
+    filas = []
+    for metodo in METODOS_MUESTREO:
+        err_media, err_prob = [], []
+        inicio = time.perf_counter()
+        for r in range(repeticiones):
+            matriz = simular_matriz(alternativas, criterios, pesos, presupuesto,
+                                    rng=np.random.default_rng(r), muestreo=metodo)
+            media, prob = _media_y_prob(matriz)
+            err_media.append(media - ref_media)
+            err_prob.append(prob - ref_prob)
+        duracion = (time.perf_counter() - inicio) / repeticiones
+
+        filas.append({
+            "metodo":      metodo,
+            "rmse_media":  float(np.sqrt(np.mean(np.square(err_media)))),
+            "rmse_prob":   float(np.sqrt(np.mean(np.square(err_prob)))),
+            "tiempo_ms":   duracion * 1000
+        })
+
+    return filas
+
+
+if __name__ == "__main__":
+    archivo     = sys.argv[1] if len(sys.argv) > 1 else "plantilla_10_proveedores.xlsx"
+    presupuesto = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+
+    print("=" * 64)
+    print(f" BENCHMARK DE MUESTREO — {archivo} ({presupuesto:,} iteraciones)")
+    print("=" * 64)
+
+    filas = correr_benchmark(archivo, presupuesto)
+    base  = filas[0]
+
+    print(f"{'Método':<11}{'RMSE media':>12}{'RMSE prob':>12}"
+          f"{'Gan. media':>12}{'Gan. prob':>11}{'ms/corrida':>12}")
+    for fila in filas:
+        # Ganancia en varianza = iteraciones aleatorias equivalentes / presupuesto
+        gan_media = (base["rmse_media"] / fila["rmse_media"]) ** 2
+        gan_prob  = (base["rmse_prob"] / fila["rmse_prob"]) ** 2
+        print(f"{fila['metodo']:<11}{fila['rmse_media']:>12.2e}{fila['rmse_prob']:>12.2e}"
+              f"{gan_media:>11.3g}x{gan_prob:>10.3g}x{fila['tiempo_ms']:>12.1f}")
+
+    print("\n* Ganancia: cuántas veces más iteraciones necesitaría el muestreo")
+    print("  aleatorio para igualar el error del método.")
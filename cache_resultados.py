@@ -0,0 +1,233 @@
+# Caché de resultados de AHP y Monte Carlo
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Cambiar si cambia el formato de los resultados, para invalidar lo guardado
+# (2: resúmenes compactos, VaR/CVaR, nuevas opciones de simulación)
+VERSION_CACHE = 2
+
+# Módulos que producen los resultados: su código entra en la clave, así que
+# un cambio de formato o de cálculo invalida la caché aunque no se suba la versión
+MODULOS_RESULTADO = ("ahp_wsm.py", "distribuciones.py", "dominancia.py", "incremental.py",
+                     "mcda.py", "modelo.py", "montecarlo.py")
+
+DIRECTORIO_DEFECTO = os.path.join(os.path.expanduser("~"), ".smartdecide_cache")
+
+
+# Llevar números a una forma única: 800, 800.0 y np.int64(800) son lo mismo
+def _canonico(obj):
+    if isinstance(obj, dict):
+        return {str(k): _canonico(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonico(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return [_canonico(v) for v in obj.tolist()]
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (int, float, np.integer, np.floating)):
+        valor = float(obj)
+        return None if np.isnan(valor) else valor.hex()
+    if isinstance(obj, str):
+        return obj.strip()
+    return obj
+
+
+# Huella del código de MODULOS_RESULTADO (se calcula una vez por proceso)
+def _huella_codigo() -> str:
+    global _HUELLA_CODIGO
+    if _HUELLA_CODIGO is None:
+        huella = hashlib.sha256()
+        base   = os.path.dirname(os.path.abspath(__file__))
+        for nombre in MODULOS_RESULTADO:
+            try:
+                with open(os.path.join(base, nombre), "rb") as f:
+                    huella.update(f.read())
+            except OSError:
+                huella.update(nombre.encode("utf-8"))
+        _HUELLA_CODIGO = huella.hexdigest()
+    return _HUELLA_CODIGO
+
+
+_HUELLA_CODIGO = None
+
+
+# Huella SHA-256 de todo lo que determina el resultado de un análisis
+def clave_analisis(alternativas: list,
+                   criterios: list,
+                   pesos: dict,
+                   iteraciones: int,
+                   semilla: int = None,
+                   **opciones) -> str:
+    """
+    `opciones` recoge los demás parámetros de simular_todas (muestreo,
+    tolerancia, etc.) para que dos corridas distintas nunca compartan clave.
+    La clave incluye VERSION_CACHE y la huella del código que calcula los
+    resultados, así que lo guardado por otra versión nunca se sirve.
+    """
+    contenido = {
+        "version":      VERSION_CACHE,
+        "codigo":       _huella_codigo(),
+        "alternativas": alternativas,
+        "criterios":    criterios,
+        "pesos":        pesos,
+        "iteraciones":  iteraciones,
+        "semilla":      semilla,
+        "opciones":     opciones,
+    }
+    texto = json.dumps(_canonico(contenido), sort_keys=True,
+                       ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheResultados:
+    """
+    Caché en dos niveles, direccionado por contenido:
+      - memoria: LRU de objetos serializados (cada acierto devuelve una
+        copia nueva, así que modificar un resultado no corrompe la caché);
+      - disco: un archivo por clave, escrito de forma atómica (archivo
+        temporal + os.replace) y podado por tamaño, del más antiguo al
+        más reciente según la fecha de último uso.
+
+    Varias instancias (GUI y scripts por lotes) pueden compartir el mismo
+    directorio: un archivo a medio escribir nunca es visible y uno
+    ilegible se trata como fallo de caché.
+    """
+
+    def __init__(self,
+                 directorio: str = DIRECTORIO_DEFECTO,
+                 max_memoria: int = 32,
+                 max_bytes_disco: int = 256 * 1024 * 1024):
+        self.directorio      = directorio
+        self.max_memoria     = max_memoria
+        self.max_bytes_disco = max_bytes_disco
+
+        self._memoria = OrderedDict()
+        self._lock    = threading.Lock()
+
+    # ── API ───────────────────────────────────────────────
+
+    def obtener(self, clave: str):
+        """Retorna el valor guardado o None si no existe."""
+        with self._lock:
+            datos = self._memoria.get(clave)
+            if datos is not None:
+                self._memoria.move_to_end(clave)
+
+        if datos is None and self.directorio:
+            datos = self._leer_disco(clave)
+            if datos is not None:
+                self._guardar_memoria(clave, datos)
+
+        return pickle.loads(datos) if datos is not None else None
+
+    def guardar(self, clave: str, valor):
+        datos = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        self._guardar_memoria(clave, datos)
+        if self.directorio:
+            self._escribir_disco(clave, datos)
+
+    def obtener_o_calcular(self, clave: str, funcion):
+        """Retorna el valor en caché o lo calcula con `funcion()` y lo guarda."""
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = funcion()
+            self.guardar(clave, valor)
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._memoria.clear()
+        for ruta, _, _ in self._archivos_disco():
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    # ── MEMORIA ───────────────────────────────────────────
+
+    def _guardar_memoria(self, clave: str, datos: bytes):
+        with self._lock:
+            self._memoria[clave] = datos
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+
+    # ── DISCO ─────────────────────────────────────────────
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave[:2], f"{clave}.pkl")
+
+    def _leer_disco(self, clave: str):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                datos = f.read()
+            pickle.loads(datos)       # validar antes de confiar en el archivo
+            os.utime(ruta)            # marcar como usado recientemente
+            return datos
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Archivo dañado o de otra versión: se descarta
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            return None
+
+    def _escribir_disco(self, clave: str, datos: bytes):
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(datos)
+                os.replace(temporal, ruta)
+            except BaseException:
+                os.remove(temporal)
+                raise
+        except OSError:
+            # Sin permisos o disco lleno: la caché en disco es opcional
+            return
+        self._podar_disco()
+
+    def _archivos_disco(self) -> list:
+        archivos = []
+        if not self.directorio or not os.path.isdir(self.directorio):
+            return archivos
+        for raiz, _, nombres in os.walk(self.directorio):
+            for nombre in nombres:
+                if not nombre.endswith(".pkl"):
+                    continue
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    info = os.stat(ruta)
+                except OSError:
+                    continue
+                archivos.append((ruta, info.st_size, info.st_mtime))
+        return archivos
+
+    def _podar_disco(self):
+        archivos = self._archivos_disco()
+        total    = sum(tam for _, tam, _ in archivos)
+        if total <= self.max_bytes_disco:
+            return
+
+        # Eliminar primero los usados hace más tiempo
+        for ruta, tam, _ in sorted(archivos, key=lambda a: a[2]):
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tam
+            if total <= self.max_bytes_disco:
+                break
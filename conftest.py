@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from ahp_wsm import normalizar_pesos
+from excel_reader import leer_alternativas, leer_criterios
+
+ARCHIVO = "plantilla.xlsx"
+
+
+@pytest.fixture(scope="session")
+def plantilla():
+    """(alternativas, criterios con peso) de la plantilla de ejemplo."""
+    alternativas, _ = leer_alternativas(ARCHIVO)
+    criterios, _    = leer_criterios(ARCHIVO)
+    return alternativas, normalizar_pesos(criterios)
+
+
+@pytest.fixture
+def problema_aleatorio():
+    """
+    Fábrica de problemas (alternativas, criterios con peso) en el formato
+    de excel_reader, con rangos Min/Max y criterios de ambos tipos.
+    """
+    def fabricar(rng, n_alt: int = 8, n_crit: int = 4) -> tuple:
+        criterios = [{"Criterio": f"C{j + 1}",
+                      "Importancia (1-10)": int(rng.integers(1, 11)),
+                      "Tipo": "minimizar" if rng.random() < 0.5 else "maximizar"}
+                     for j in range(n_crit)]
+
+        bajos = rng.uniform(0, 100, (n_alt, n_crit)).round(2)
+        altos = (bajos + rng.uniform(0, 30, (n_alt, n_crit))).round(2)
+        alternativas = []
+        for i in range(n_alt):
+            registro = {"Alternativa": f"A{i + 1}"}
+            for j, c in enumerate(criterios):
+                registro[f"{c['Criterio']}_Min"] = float(bajos[i, j])
+                registro[f"{c['Criterio']}_Max"] = float(altos[i, j])
+            alternativas.append(registro)
+
+        return alternativas, normalizar_pesos(criterios)
+
+    return fabricar
@@ -43,12 +43,20 @@ def generar_excel_10_proveedores():
         'Valor': [20000, 'Licitación Suministros Q3 2026', 'SmartDecide Pro']
     })
 
+    # 4. Hoja Correlaciones (opcional): criterios que se mueven juntos
+    df_correlaciones = pd.DataFrame({
+        'Criterio A':  ['Costo', 'Calidad'],
+        'Criterio B':  ['Entrega', 'Confiabilidad'],
+        'Correlacion': [0.5, 0.7]
+    })
+
     # Guardar archivo
     nombre_archivo = 'plantilla_10_proveedores.xlsx'
     with pd.ExcelWriter(nombre_archivo, engine='openpyxl') as writer:
         df_alternativas.to_excel(writer, sheet_name='Alternativas', index=False)
         df_criterios.to_excel(writer, sheet_name='Criterios', index=False)
         df_config.to_excel(writer, sheet_name='Configuracion', index=False)
+        df_correlaciones.to_excel(writer, sheet_name='Correlaciones', index=False)
     
     return nombre_archivo
 
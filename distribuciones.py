@@ -0,0 +1,305 @@
+# Distribuciones de probabilidad por criterio para la simulación Monte Carlo
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import betaincinv, ndtr, ndtri
+
+# Todas se definen por su función cuantil (inversa de la CDF): reciben
+# uniformes u en [0, 1) y parámetros por alternativa, y devuelven valores.
+# Así funcionan igual con muestreo aleatorio, Sobol/Halton/LHS y variables
+# antitéticas, y siempre de forma vectorizada:
+# u tiene forma (iteraciones, k) y cada parámetro forma (k,).
+
+# Percentiles prácticos de las distribuciones no acotadas (lognormal): se
+# truncan en [ε, 1 - ε], así que su soporte es finito y sirve para
+# normalizar y para acotar los histogramas
+_EPS_SOPORTE = 1e-4
+
+
+def _uniforme(u, p):
+    return p["min"] + u * (p["max"] - p["min"])
+
+
+def _triangular(u, p):
+    a, b, m = p["min"], p["max"], p["moda"]
+    ancho   = b - a
+    corte   = np.where(ancho > 0, (m - a) / np.where(ancho > 0, ancho, 1.0), 0.5)
+
+    izquierda = a + np.sqrt(u * ancho * (m - a))
+    derecha   = b - np.sqrt((1 - u) * ancho * (b - m))
+    return np.where(u < corte, izquierda, derecha)
+
+
+def _pert(u, p):
+    # Beta-PERT: beta escalada a [min, max] con la moda como valor más probable
+    a, b, m = p["min"], p["max"], p["moda"]
+    ancho   = np.where(b > a, b - a, 1.0)
+    alfa    = 1 + 4 * (m - a) / ancho
+    beta    = 1 + 4 * (b - m) / ancho
+    return a + (b - a) * betaincinv(alfa, beta, u)
+
+
+def _normal_truncada(u, p):
+    a, b   = p["min"], p["max"]
+    mu     = p["moda"]
+    sigma  = np.where(p["desv"] > 0, p["desv"], 1.0)
+
+    cdf_a = ndtr((a - mu) / sigma)
+    cdf_b = ndtr((b - mu) / sigma)
+    x     = mu + sigma * ndtri(cdf_a + u * (cdf_b - cdf_a))
+    return np.where(p["desv"] > 0, np.clip(x, a, b), mu)
+
+
+def _lognormal(u, p):
+    # Min y Max se interpretan como los percentiles 5 y 95; las colas más
+    # allá de los percentiles prácticos (_EPS_SOPORTE) se recortan
+    z95   = ndtri(0.95)
+    mu    = (np.log(p["min"]) + np.log(p["max"])) / 2
+    sigma = (np.log(p["max"]) - np.log(p["min"])) / (2 * z95)
+    return np.exp(mu + sigma * ndtri(np.clip(u, _EPS_SOPORTE, 1 - _EPS_SOPORTE)))
+
+
+def _empirica(u, p):
+    # Valores discretos con probabilidades; filas rellenadas hasta K valores
+    acumulada = p["acumulada"]                        # (k, K)
+    indice    = (u[..., None] >= acumulada).sum(axis=-1)
+    indice    = np.minimum(indice, acumulada.shape[1] - 1)
+    valores   = np.broadcast_to(p["valores"], u.shape + (acumulada.shape[1],))
+    return np.take_along_axis(valores, indice[..., None], axis=-1)[..., 0]
+
+
+# Registro: nombre → función cuantil
+DISTRIBUCIONES = {
+    "uniforme":        _uniforme,
+    "triangular":      _triangular,
+    "pert":            _pert,
+    "normal_truncada": _normal_truncada,
+    "lognormal":       _lognormal,
+    "empirica":        _empirica,
+}
+
+
+def registrar_distribucion(nombre: str, cuantil):
+    """
+    Agrega una distribución. `cuantil(u, parametros)` debe aceptar u con
+    forma (iteraciones, k) y parámetros con forma (k,) y ser vectorizada.
+    """
+    DISTRIBUCIONES[nombre.lower()] = cuantil
+
+
+def _texto(valor) -> str:
+    # Celdas vacías: None, NaN o 'nan' (normalizar_df convierte NaN a texto)
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return ""
+    texto = str(valor).strip()
+    return "" if texto.lower() == "nan" else texto
+
+
+def _numero(valor, defecto: float) -> float:
+    texto = _texto(valor)
+    return float(texto) if texto else defecto
+
+
+def _lista(valor) -> list:
+    texto = _texto(valor)
+    return [float(x) for x in texto.split(";") if x.strip()] if texto else []
+
+
+# Nombre de la distribución de la alternativa i para el criterio j
+def _distribucion_celda(problema, i: int, j: int) -> str:
+    """
+    Prioridad: columna '{Criterio}_Dist' de la alternativa, columna
+    'Distribucion' de la hoja Criterios y, por defecto, 'uniforme'.
+    """
+    nombre = problema.criterios[j]
+    dist   = (_texto(problema.extra_alternativa(i, f"{nombre}_Dist"))
+              or _texto(problema.extra_criterio(j, "Distribucion"))
+              or "uniforme").lower()
+
+    if dist not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución desconocida '{dist}' en '{nombre}'. "
+                         f"Opciones: {', '.join(DISTRIBUCIONES)}.")
+    return dist
+
+
+# Parámetros de un grupo de alternativas con la misma distribución
+def _parametros(problema, indices: np.ndarray, j: int, dist: str) -> dict:
+    nombre = problema.criterios[j]
+    mins   = problema.mins[indices, j]
+    maxs   = problema.maxs[indices, j]
+
+    # Valor más probable (triangular, PERT) o media (normal truncada)
+    modas = np.array([_numero(problema.extra_alternativa(i, f"{nombre}_Moda"), (lo + hi) / 2)
+                      for i, lo, hi in zip(indices, mins, maxs)])
+    desv  = np.array([_numero(problema.extra_alternativa(i, f"{nombre}_Desv"), (hi - lo) / 6)
+                      for i, lo, hi in zip(indices, mins, maxs)])
+
+    parametros = {"min": mins, "max": maxs, "moda": np.clip(modas, mins, maxs), "desv": desv}
+
+    if dist == "lognormal" and np.any(mins <= 0):
+        raise ValueError(f"La distribución lognormal de '{nombre}' requiere Min > 0.")
+
+    if dist == "empirica":
+        listas = []
+        for i in indices:
+            alternativa = problema.nombres[i]
+            valores = _lista(problema.extra_alternativa(i, f"{nombre}_Valores"))
+            if not valores:
+                raise ValueError(f"Falta '{nombre}_Valores' (ej. '10;12;15') "
+                                 f"para '{alternativa}'.")
+            probs = _lista(problema.extra_alternativa(i, f"{nombre}_Probs")) or [1.0] * len(valores)
+            if len(probs) != len(valores):
+                raise ValueError(f"'{nombre}_Probs' debe tener tantos elementos "
+                                 f"como '{nombre}_Valores' en '{alternativa}'.")
+            listas.append((valores, np.asarray(probs) / np.sum(probs)))
+
+        k_max     = max(len(v) for v, _ in listas)
+        valores   = np.array([v + [v[-1]] * (k_max - len(v)) for v, _ in listas])
+        acumulada = np.array([list(np.cumsum(p)[:-1]) + [1.0] * (k_max - len(p) + 1)
+                              for _, p in listas])
+        parametros["valores"]   = valores
+        parametros["acumulada"] = acumulada
+
+    return parametros
+
+
+# Agrupar por criterio y distribución todo lo que no es uniforme
+def compilar_distribuciones(problema) -> tuple:
+    """
+    `problema` es un DecisionProblem (ver modelo.py).
+
+    Retorna (grupos, inferior, superior):
+      - grupos: lista de dicts {"distribucion", "criterio" (índice),
+        "alternativas" (índices), "parametros"} solo para las
+        combinaciones no uniformes (la uniforme tiene su ruta rápida);
+      - inferior/superior: cotas (alternativas × criterios) de los valores
+        que puede producir cada distribución.
+    """
+    inferior = problema.mins.copy()
+    superior = problema.maxs.copy()
+    grupos   = []
+
+    # Sin columnas opcionales todo es uniforme
+    if problema.extras_alternativas is None and problema.extras_criterios is None:
+        return grupos, inferior, superior
+
+    for j in range(problema.n_criterios):
+        por_dist = {}
+        for i in range(problema.n_alternativas):
+            por_dist.setdefault(_distribucion_celda(problema, i, j), []).append(i)
+
+        for dist, indices in por_dist.items():
+            if dist == "uniforme":
+                continue
+            indices    = np.array(indices)
+            parametros = _parametros(problema, indices, j, dist)
+            cuantil    = DISTRIBUCIONES[dist]
+            extremos   = cuantil(np.array([[_EPS_SOPORTE], [1 - _EPS_SOPORTE]]), parametros)
+
+            inferior[indices, j] = np.minimum(extremos[0], extremos[1])
+            superior[indices, j] = np.maximum(extremos[0], extremos[1])
+            grupos.append({
+                "distribucion": dist,
+                "criterio":     j,
+                "alternativas": indices,
+                "parametros":   parametros
+            })
+
+    return grupos, inferior, superior
+
+
+# Aplicar las distribuciones no uniformes sobre el tensor de valores
+def aplicar_distribuciones(valores: np.ndarray, u: np.ndarray, grupos: list):
+    """
+    `valores` (iteraciones × alternativas × criterios) ya tiene la ruta
+    uniforme; aquí se sobrescriben las celdas de cada grupo a partir de
+    sus uniformes `u` originales.
+    """
+    for grupo in grupos:
+        idx, j = grupo["alternativas"], grupo["criterio"]
+        cuantil = DISTRIBUCIONES[grupo["distribucion"]]
+        valores[:, idx, j] = cuantil(u[:, idx, j], grupo["parametros"])
+
+
+# ── CORRELACIÓN ENTRE CRITERIOS (CÓPULA GAUSSIANA) ────────
+
+# Uniformes a z normales y de vuelta: evita ±inf en u = 0 o u = 1
+_EPS_COPULA = 1e-12
+
+
+@lru_cache(maxsize=64)
+def _cholesky(entradas: tuple, n: int) -> np.ndarray:
+    matriz = np.array(entradas, dtype=float).reshape(n, n)
+    try:
+        factor = np.linalg.cholesky(matriz)
+    except np.linalg.LinAlgError:
+        raise ValueError("La matriz de correlaciones no es definida positiva; "
+                         "revisa que las correlaciones sean coherentes entre sí.") from None
+    factor.setflags(write=False)
+    return factor
+
+
+def _matriz_correlacion(registros: list, nombres_crit: list) -> np.ndarray:
+    indice = {n: j for j, n in enumerate(nombres_crit)}
+    matriz = np.eye(len(nombres_crit))
+
+    for reg in registros:
+        a, b = _texto(reg.get("Criterio A")), _texto(reg.get("Criterio B"))
+        if a not in indice or b not in indice:
+            raise ValueError(f"Correlación entre criterios desconocidos: '{a}' y '{b}'.")
+        if a == b:
+            continue
+        rho = float(reg["Correlacion"])
+        if not -1 < rho < 1:
+            raise ValueError(f"La correlación entre '{a}' y '{b}' debe estar entre -1 y 1.")
+        matriz[indice[a], indice[b]] = matriz[indice[b], indice[a]] = rho
+
+    return matriz
+
+
+# Factores de Cholesky por alternativa a partir de la hoja Correlaciones
+def compilar_correlaciones(registros: list, nombres_alt: list, nombres_crit: list):
+    """
+    `registros`: filas {'Criterio A', 'Criterio B', 'Correlacion'} y,
+    opcionalmente, 'Alternativa'. Las filas sin alternativa valen para
+    todo el problema; las de una alternativa se aplican encima solo a ella.
+
+    Retorna None (sin correlaciones), un factor (criterios × criterios)
+    compartido por todas las alternativas o uno por alternativa
+    (alternativas × criterios × criterios). Cada matriz distinta se
+    factoriza una sola vez.
+    """
+    if not registros:
+        return None
+
+    generales    = [r for r in registros if not _texto(r.get("Alternativa"))]
+    particulares = {}
+    for r in registros:
+        nombre = _texto(r.get("Alternativa"))
+        # Las de alternativas fuera de la simulación (p. ej. filtradas) se ignoran
+        if nombre in nombres_alt:
+            particulares.setdefault(nombre, []).append(r)
+
+    n = len(nombres_crit)
+    factores = []
+    for nombre in (nombres_alt if particulares else [None]):
+        matriz = _matriz_correlacion(generales + particulares.get(nombre, []), nombres_crit)
+        factores.append(_cholesky(tuple(matriz.ravel()), n))
+
+    return factores[0] if len(factores) == 1 else np.stack(factores)
+
+
+# Correlacionar las uniformes (iteraciones × alternativas × criterios)
+def aplicar_copula(u: np.ndarray, cholesky: np.ndarray) -> np.ndarray:
+    """
+    u → z = Φ⁻¹(u) → z · Lᵀ → Φ(z). Las marginales siguen siendo uniformes,
+    así que cualquier distribución (cuantil) se aplica igual después, y
+    como Φ⁻¹(1 - u) = -Φ⁻¹(u) los pares antitéticos se conservan.
+    """
+    z = ndtri(np.clip(u, _EPS_COPULA, 1 - _EPS_COPULA))
+    if cholesky.ndim == 2:
+        z = z @ cholesky.T
+    else:
+        z = np.matmul(cholesky, z[..., None])[..., 0]
+    return ndtr(z, out=z)
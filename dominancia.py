@@ -0,0 +1,110 @@
+# Dominancia por intervalos: alternativas que nunca pueden ganar
+
+import numpy as np
+
+from distribuciones import compilar_distribuciones
+from modelo import como_problema
+
+# Candidatas que se comparan juntas en cada paso del filtro
+TAM_BLOQUE_DOMINANCIA = 256
+
+
+# Peor y mejor valor posible de cada celda, orientados para que más alto sea mejor
+def _intervalos(problema) -> tuple:
+    """
+    Usa el soporte de la distribución de cada celda (val_inf/val_sup de
+    distribuciones.py), así que también cubre las lognormales, que pueden
+    salir de [Min, Max].
+    """
+    _, inferior, superior = compilar_distribuciones(problema)
+    signo = np.where(problema.minimizar, -1.0, 1.0)
+    a, b  = inferior * signo, superior * signo
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+# dominan[k, m] = la fila k de (peor_a) domina a la fila m de (mejor_b)
+def _dominan(peor_a: np.ndarray, mejor_b: np.ndarray) -> np.ndarray:
+    diferencia = peor_a[:, None, :] - mejor_b[None, :, :]
+    return (diferencia >= 0).all(axis=2) & (diferencia > 0).any(axis=2)
+
+
+def frontera_dominancia(alternativas, criterios: list = None) -> dict:
+    """
+    a domina a b si el peor caso de a es al menos tan bueno como el mejor
+    caso de b en todos los criterios (y mejor en alguno): b no puede ganarle
+    a a en ningún escenario ni con ningún vector de pesos.
+
+    Filtro por ordenamiento (SFS): si a domina a b, la suma de peores casos
+    de a es estrictamente mayor que la de b, así que basta ordenar por esa
+    suma y comparar cada bloque de candidatas solo contra la frontera ya
+    encontrada y contra las anteriores del mismo bloque. Como la dominancia
+    es transitiva, ninguna alternativa dominada se escapa.
+
+    Retorna:
+      - "no_dominadas": índices (en el orden original) que pueden ganar;
+      - "dominadas": {alternativa: alternativa de la frontera que la domina}.
+    """
+    problema    = como_problema(alternativas, criterios)
+    peor, mejor = _intervalos(problema)
+    n_alt       = problema.n_alternativas
+
+    orden     = np.argsort(-peor.sum(axis=1), kind="stable")
+    frontera  = np.empty(0, dtype=int)
+    dominador = np.full(n_alt, -1)
+
+    for inicio in range(0, n_alt, TAM_BLOQUE_DOMINANCIA):
+        bloque = orden[inicio:inicio + TAM_BLOQUE_DOMINANCIA]
+
+        # Contra la frontera: quién domina a cada candidata (la primera que lo haga)
+        dominada = np.zeros(bloque.size, dtype=bool)
+        if frontera.size:
+            por_frontera = _dominan(peor[frontera], mejor[bloque])
+            dominada     = por_frontera.any(axis=0)
+            dominador[bloque[dominada]] = frontera[por_frontera.argmax(axis=0)[dominada]]
+
+        # Contra las demás del bloque: por el orden, solo una anterior puede dominarla
+        internas = _dominan(peor[bloque], mejor[bloque]).T
+        nuevas   = internas.any(axis=1) & ~dominada
+        dominador[bloque[nuevas]] = bloque[internas.argmax(axis=1)[nuevas]]
+
+        frontera = np.concatenate([frontera, bloque[~(dominada | nuevas)]])
+
+    # Si la dominadora también está dominada, apuntar a la de la frontera (transitividad)
+    cadena = (dominador >= 0) & (dominador[np.maximum(dominador, 0)] >= 0)
+    while cadena.any():
+        dominador[cadena] = dominador[dominador[cadena]]
+        cadena = (dominador >= 0) & (dominador[np.maximum(dominador, 0)] >= 0)
+
+    nombres = problema.nombres
+    return {
+        "no_dominadas": np.sort(frontera).tolist(),
+        "dominadas": {nombres[i]: nombres[dominador[i]]
+                      for i in np.flatnonzero(dominador >= 0)}
+    }
+
+
+if __name__ == "__main__":
+    try:
+        from excel_reader import leer_alternativas, leer_criterios
+
+        archivo = "plantilla.xlsx"
+        alternativas, err = leer_alternativas(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+        criterios, err = leer_criterios(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        resultado = frontera_dominancia(alternativas, criterios)
+        print("=" * 55)
+        print("   DOMINANCIA POR INTERVALOS")
+        print("=" * 55)
+        for nombre, dominadora in resultado["dominadas"].items():
+            print(f"  {nombre:<20} dominada por {dominadora}")
+        if not resultado["dominadas"]:
+            print("  Ninguna alternativa está dominada.")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
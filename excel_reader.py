@@ -1,5 +1,7 @@
 import pandas as pd
 
+from modelo import DecisionProblem
+
 def normalizar_df(df):
     """
     Limpia los nombres de las columnas (quita espacios extra) 
@@ -84,6 +86,70 @@ def leer_configuracion(archivo):
     except Exception as e:
         return None, f"Error en Configuracion: {str(e)}"
 
+def leer_correlaciones(archivo):
+    """
+    Hoja opcional 'Correlaciones': filas Criterio A, Criterio B, Correlacion
+    y, si la correlación es solo de una alternativa, la columna Alternativa.
+    Si la hoja no existe retorna una lista vacía.
+    """
+    try:
+        xls = pd.ExcelFile(archivo)
+        hoja = next((h for h in xls.sheet_names if h in ['Correlaciones', 'correlaciones']), None)
+        if hoja is None:
+            return [], None
+
+        df = pd.read_excel(xls, sheet_name=hoja)
+        df = normalizar_df(df)
+
+        cols_req = ['Criterio A', 'Criterio B', 'Correlacion']
+        for col in cols_req:
+            if col not in df.columns:
+                return None, f"Error: Falta la columna '{col}' en la hoja Correlaciones."
+
+        df = df.dropna(subset=cols_req)
+        return df.to_dict(orient='records'), None
+    except Exception as e:
+        return None, f"Error en Correlaciones: {str(e)}"
+
+def leer_comparaciones(archivo):
+    """
+    Hoja opcional 'Comparaciones': matriz de Saaty con la columna Criterio
+    y una columna por criterio (valores 1-9 o fracciones como '1/3').
+    Si la hoja no existe retorna una lista vacía.
+    """
+    try:
+        xls = pd.ExcelFile(archivo)
+        hoja = next((h for h in xls.sheet_names if h in ['Comparaciones', 'comparaciones']), None)
+        if hoja is None:
+            return [], None
+
+        df = pd.read_excel(xls, sheet_name=hoja)
+        df = normalizar_df(df)
+
+        if 'Criterio' not in df.columns:
+            return None, "Error: Falta la columna 'Criterio' en la hoja Comparaciones."
+
+        # Filas sin criterio (normalizar_df deja 'nan' en las celdas de texto vacías)
+        df = df[df['Criterio'].astype(str) != 'nan']
+        return df.to_dict(orient='records'), None
+    except Exception as e:
+        return None, f"Error en Comparaciones: {str(e)}"
+
+def leer_problema(archivo):
+    """
+    Lee Alternativas y Criterios y los compila a un DecisionProblem.
+    """
+    alternativas, err = leer_alternativas(archivo)
+    if err: return None, err
+
+    criterios, err = leer_criterios(archivo)
+    if err: return None, err
+
+    try:
+        return DecisionProblem.desde_registros(alternativas, criterios), None
+    except (KeyError, ValueError, TypeError) as e:
+        return None, f"Error al compilar el problema: {str(e)}"
+
 def validar_excel(archivo):
     """
     Verificación completa antes de procesar nada.
@@ -0,0 +1,503 @@
+# Ranking WSM incremental: re-puntuar solo lo que cambió al editar el problema
+
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from ahp_wsm import seleccionar_top_k
+from distribuciones import _texto
+from modelo import como_problema
+from montecarlo import (MAX_ELEMENTOS_BLOQUE, NIVELES_VAR, _estadisticas_fila, _limites_scores,
+                        _muestrear_normalizados, _muestrear_pesos, _preparar_modelo, _puntuar,
+                        _victorias_matriz, calcular_estadisticas_matriz, clasificar_riesgo,
+                        rangos_problema, seleccionar_finalistas)
+
+# Si cambia más de esta fracción de filas, reconstruir todo es más barato
+FRACCION_RECONSTRUIR = 0.25
+
+# Flujo de los pesos, fuera del rango de crc32 (los de las alternativas)
+FLUJO_PESOS = 2 ** 32
+
+
+class _Extremos:
+    """
+    Mínimo y máximo de cada columna junto con cuántas filas los alcanzan.
+    Una columna solo se vuelve a recorrer cuando la última fila que tenía
+    su extremo lo pierde.
+    """
+
+    __slots__ = ("minimo", "maximo", "n_min", "n_max")
+
+    def __init__(self, matriz: np.ndarray):
+        n_col = matriz.shape[1]
+        self.minimo = np.empty(n_col)
+        self.maximo = np.empty(n_col)
+        self.n_min  = np.zeros(n_col, dtype=np.int64)
+        self.n_max  = np.zeros(n_col, dtype=np.int64)
+        self.recalcular(matriz, np.arange(n_col))
+
+    def recalcular(self, matriz: np.ndarray, columnas: np.ndarray):
+        bloque = matriz[:, columnas]
+        self.minimo[columnas] = bloque.min(axis=0)
+        self.maximo[columnas] = bloque.max(axis=0)
+        self.n_min[columnas]  = (bloque == self.minimo[columnas]).sum(axis=0)
+        self.n_max[columnas]  = (bloque == self.maximo[columnas]).sum(axis=0)
+
+    def reemplazar(self, matriz, viejo: np.ndarray = None, nuevo: np.ndarray = None) -> np.ndarray:
+        """
+        La fila `viejo` pasó a ser `nuevo` (None al agregar o al eliminar
+        una fila). `matriz` es una función que retorna la matriz ya
+        actualizada; solo se llama si hay que volver a recorrer columnas.
+        Retorna la máscara de columnas cuyo mínimo o máximo cambió.
+        """
+        minimo, maximo = self.minimo.copy(), self.maximo.copy()
+
+        if viejo is not None:
+            self.n_min -= viejo == minimo
+            self.n_max -= viejo == maximo
+        if nuevo is not None:
+            self.n_min += nuevo == minimo
+            self.n_max += nuevo == maximo
+
+            menor = nuevo < minimo
+            self.minimo[menor], self.n_min[menor] = nuevo[menor], 1
+            mayor = nuevo > maximo
+            self.maximo[mayor], self.n_max[mayor] = nuevo[mayor], 1
+
+        vacias = np.flatnonzero((self.n_min == 0) | (self.n_max == 0))
+        if vacias.size:
+            self.recalcular(matriz(), vacias)
+        return (self.minimo != minimo) | (self.maximo != maximo)
+
+
+class RankingIncremental:
+    """
+    Mantiene la matriz normalizada y los scores del WSM (los mismos de
+    rankear_alternativas) para que editar una alternativa o un peso no
+    obligue a recalcular todo:
+      - una fila que cambia se re-normaliza y re-puntúa sola, salvo que
+        mueva el mínimo o el máximo de una columna; entonces se
+        re-normalizan esas columnas y se re-puntúa todo con un producto;
+      - un cambio de pesos re-puntúa con un solo producto matriz-vector.
+
+    También lleva los extremos de los valores Min/Max crudos, así que
+    rangos_globales() no recorre las alternativas.
+    """
+
+    def __init__(self, alternativas, criterios: list = None):
+        self._construir(como_problema(alternativas, criterios))
+
+    def _construir(self, problema):
+        self.nombres   = list(problema.nombres)
+        self.criterios = list(problema.criterios)
+        self.tipos     = list(problema.tipos)
+        self.minimizar = problema.minimizar.copy()
+        self.pesos     = problema.pesos.copy()
+        self.indice    = {n: i for i, n in enumerate(self.nombres)}
+
+        self.mins    = problema.mins.copy()
+        self.maxs    = problema.maxs.copy()
+        self.valores = (self.mins + self.maxs) / 2
+
+        self._extremos = _Extremos(self.valores)
+        self._bajos    = _Extremos(np.minimum(self.mins, self.maxs))
+        self._altos    = _Extremos(np.maximum(self.mins, self.maxs))
+
+        self.X = np.empty_like(self.valores)
+        self._normalizar_columnas(np.arange(len(self.criterios)))
+        self.scores = self.X @ self.pesos
+
+    # ── NORMALIZACIÓN ─────────────────────────────────────
+
+    # Misma normalización 0-1 que matriz_normalizada, sobre filas o columnas
+    def _normalizar(self, valores: np.ndarray, columnas) -> np.ndarray:
+        minimos = self._extremos.minimo[columnas]
+        maximos = self._extremos.maximo[columnas]
+        rango   = maximos - minimos
+        divisor = np.where(rango == 0, 1.0, rango)
+        X = np.where(self.minimizar[columnas], maximos - valores, valores - minimos) / divisor
+        return np.where(rango == 0, 0.5, X)
+
+    def _normalizar_columnas(self, columnas: np.ndarray):
+        self.X[:, columnas] = self._normalizar(self.valores[:, columnas], columnas)
+
+    # Propagar el cambio de la fila i; `viejo` = (mins, maxs) anteriores o None
+    def _aplicar_fila(self, i: int, viejo: tuple, presente: bool = True):
+        # Extremos de los valores crudos (para rangos_globales)
+        bajo = alto = None
+        if presente:
+            bajo = np.minimum(self.mins[i], self.maxs[i])
+            alto = np.maximum(self.mins[i], self.maxs[i])
+        self._bajos.reemplazar(lambda: np.minimum(self.mins, self.maxs),
+                               None if viejo is None else np.minimum(*viejo), bajo)
+        self._altos.reemplazar(lambda: np.maximum(self.mins, self.maxs),
+                               None if viejo is None else np.maximum(*viejo), alto)
+
+        valor_viejo = None if viejo is None else (viejo[0] + viejo[1]) / 2
+        movidas = self._extremos.reemplazar(lambda: self.valores, valor_viejo,
+                                            self.valores[i] if presente else None)
+
+        if presente:
+            self.X[i] = self._normalizar(self.valores[i], slice(None))
+        if movidas.any():
+            self._normalizar_columnas(np.flatnonzero(movidas))
+            self.scores = self.X @ self.pesos
+        elif presente:
+            self.scores[i] = self.X[i] @ self.pesos
+
+    # ── EDICIÓN ───────────────────────────────────────────
+
+    def _fila_registro(self, registro: dict) -> tuple:
+        mins = np.array([registro[f"{c}_Min"] for c in self.criterios], dtype=float)
+        maxs = np.array([registro[f"{c}_Max"] for c in self.criterios], dtype=float)
+        return mins, maxs
+
+    def actualizar_alternativa(self, registro: dict, mins=None, maxs=None):
+        """Reemplaza los valores de una alternativa existente (registro de excel_reader)."""
+        if mins is None:
+            mins, maxs = self._fila_registro(registro)
+        nombre = registro['Alternativa']
+        if nombre not in self.indice:
+            raise ValueError(f"La alternativa '{nombre}' no existe.")
+
+        i     = self.indice[nombre]
+        viejo = (self.mins[i].copy(), self.maxs[i].copy())
+        self.mins[i], self.maxs[i] = mins, maxs
+        self.valores[i] = (self.mins[i] + self.maxs[i]) / 2
+        self._aplicar_fila(i, viejo)
+
+    def agregar_alternativa(self, registro: dict, mins=None, maxs=None):
+        """Agrega una alternativa al final (como el editor)."""
+        if mins is None:
+            mins, maxs = self._fila_registro(registro)
+        nombre = registro['Alternativa']
+        if nombre in self.indice:
+            raise ValueError(f"Ya existe una alternativa llamada '{nombre}'.")
+
+        self.indice[nombre] = len(self.nombres)
+        self.nombres.append(nombre)
+        self.mins    = np.vstack([self.mins, mins])
+        self.maxs    = np.vstack([self.maxs, maxs])
+        self.valores = np.vstack([self.valores, (mins + maxs) / 2])
+        self.X       = np.vstack([self.X, np.zeros(len(self.criterios))])
+        self.scores  = np.append(self.scores, 0.0)
+        self._aplicar_fila(len(self.nombres) - 1, None)
+
+    def eliminar_alternativa(self, nombre: str):
+        if nombre not in self.indice:
+            raise ValueError(f"La alternativa '{nombre}' no existe.")
+
+        i     = self.indice[nombre]
+        viejo = (self.mins[i].copy(), self.maxs[i].copy())
+        self.nombres.pop(i)
+        self.indice  = {n: k for k, n in enumerate(self.nombres)}
+        self.mins    = np.delete(self.mins, i, axis=0)
+        self.maxs    = np.delete(self.maxs, i, axis=0)
+        self.valores = np.delete(self.valores, i, axis=0)
+        self.X       = np.delete(self.X, i, axis=0)
+        self.scores  = np.delete(self.scores, i)
+        self._aplicar_fila(i, viejo, presente=False)
+
+    def actualizar_pesos(self, pesos):
+        """Nuevo vector de pesos (suma 1): un solo producto matriz-vector."""
+        self.pesos  = np.asarray(pesos, dtype=float).copy()
+        self.scores = self.X @ self.pesos
+
+    # ── SINCRONIZACIÓN ────────────────────────────────────
+
+    def sincronizar(self, alternativas, criterios: list = None) -> dict:
+        """
+        Lleva el estado al problema dado aplicando solo las diferencias:
+        filas editadas, agregadas al final o eliminadas y pesos. Si cambian
+        los criterios, el orden de las alternativas o una gran parte de las
+        filas, reconstruye todo.
+        Retorna {"reconstruido": bool, "filas": filas re-puntuadas}.
+        """
+        problema = como_problema(alternativas, criterios)
+        if problema.criterios != self.criterios or problema.tipos != self.tipos:
+            self._construir(problema)
+            return {"reconstruido": True, "filas": problema.n_alternativas}
+
+        # Eliminadas y agregadas (por nombre); el resto debe conservar el orden
+        nuevos     = set(problema.nombres)
+        eliminadas = [n for n in self.nombres if n not in nuevos]
+        agregadas  = [i for i, n in enumerate(problema.nombres) if n not in self.indice]
+        conservadas = [n for n in problema.nombres if n in self.indice]
+        if ([n for n in self.nombres if n in nuevos] != conservadas
+                or any(i < len(conservadas) for i in agregadas)):
+            self._construir(problema)
+            return {"reconstruido": True, "filas": problema.n_alternativas}
+
+        viejas   = [self.indice[n] for n in conservadas]
+        editadas = np.flatnonzero((self.mins[viejas] != problema.mins[:len(viejas)]).any(axis=1)
+                                  | (self.maxs[viejas] != problema.maxs[:len(viejas)]).any(axis=1))
+        cambios  = len(eliminadas) + len(agregadas) + editadas.size
+        if cambios > FRACCION_RECONSTRUIR * max(problema.n_alternativas, 1):
+            self._construir(problema)
+            return {"reconstruido": True, "filas": problema.n_alternativas}
+
+        for nombre in eliminadas:
+            self.eliminar_alternativa(nombre)
+        for i in editadas:
+            self.actualizar_alternativa({'Alternativa': problema.nombres[i]},
+                                        problema.mins[i], problema.maxs[i])
+        for i in agregadas:
+            self.agregar_alternativa({'Alternativa': problema.nombres[i]},
+                                     problema.mins[i], problema.maxs[i])
+        if not np.array_equal(problema.pesos, self.pesos):
+            self.actualizar_pesos(problema.pesos)
+
+        return {"reconstruido": False, "filas": cambios}
+
+    # ── CONSULTAS ─────────────────────────────────────────
+
+    def ranking(self, top_k: int = None) -> list[dict]:
+        """Mismo resultado que rankear_alternativas sobre el problema actual."""
+        scores = np.round(self.scores, 4)
+        orden  = (np.argsort(-scores, kind="stable") if top_k is None
+                  else seleccionar_top_k(scores, top_k))
+        desglose   = np.round(self.X[orden], 4).tolist()
+        pesos_dict = dict(zip(self.criterios, self.pesos.tolist()))
+
+        return [{
+            'alternativa': self.nombres[i],
+            'score': float(scores[i]),
+            'desglose': dict(zip(self.criterios, fila)),
+            'pesos': pesos_dict
+        } for i, fila in zip(orden, desglose)]
+
+    def rangos_globales(self) -> dict:
+        """
+        Mismo formato que montecarlo.calcular_rangos_globales, sobre los
+        Min/Max crudos (sin ampliar al soporte de distribuciones como la
+        lognormal, que puede salir de [Min, Max]).
+        """
+        return {nombre: {"min": self._bajos.minimo[j].item(),
+                         "max": self._altos.maximo[j].item(),
+                         "tipo": self.tipos[j]}
+                for j, nombre in enumerate(self.criterios)}
+
+
+# Flujo aleatorio propio de una alternativa
+def _rng_alternativa(entropia, nombre: str):
+    clave = zlib.crc32(nombre.encode("utf-8"))
+    return np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(clave,)))
+
+
+# Valores crudos (iteraciones × criterios) de un problema de una sola
+# alternativa, con su propio flujo; también corre en los procesos del pool
+def _muestrear_alternativa(problema, iteraciones: int, entropia,
+                           muestreo: str, correlaciones: list) -> tuple:
+    modelo  = _preparar_modelo(problema, muestreo=muestreo, correlaciones=correlaciones)
+    crudo   = dict(modelo, escala=1.0, desplazamiento=0.0)
+    rng     = _rng_alternativa(entropia, problema.nombres[0])
+    valores = _muestrear_normalizados(crudo, iteraciones, rng)[:, 0, :]
+    return valores, modelo["val_inf"][0], modelo["val_sup"][0]
+
+
+class SimulacionIncremental:
+    """
+    Monte Carlo en modo matriz que guarda los valores simulados de cada
+    alternativa y, en la corrida siguiente, solo vuelve a muestrear las que
+    cambiaron.
+
+    Cada alternativa tiene su propio flujo aleatorio (derivado de la
+    semilla y de su nombre), así que sus muestras no dependen de las
+    demás. La caché guarda los valores crudos (iteraciones × criterios),
+    antes de normalizar: si una edición mueve el mínimo o el máximo global
+    de un criterio, las demás alternativas se re-normalizan con una
+    operación afín sin volver a muestrearse. Los pesos, los scores y las
+    estadísticas se recalculan siempre sobre el tensor completo.
+
+    Sin `semilla`, la instancia fija una al crearse, de modo que las
+    corridas sucesivas comparten flujos.
+
+    Como los flujos son por alternativa, los números no dependen de
+    `procesos` ni de qué alternativas dejen fuera filtrar_dominadas o
+    top_k; pero no coinciden con los de simular_todas para la misma
+    semilla, que reparte sus flujos por bloques de iteraciones.
+    """
+
+    def __init__(self):
+        self._entropia = np.random.SeedSequence().entropy
+        self._comun    = None
+        self._cache    = {}          # nombre → (clave, valores, val_inf, val_sup)
+
+    # Lo que comparten todas las alternativas: si cambia, se vacía la caché
+    def _clave_comun(self, problema, entropia, iteraciones, muestreo, generales) -> tuple:
+        return (entropia, iteraciones, muestreo, tuple(problema.criterios),
+                repr(problema.extras_criterios), repr(generales))
+
+    def _clave_alternativa(self, problema, i: int, particulares: dict) -> tuple:
+        nombre = problema.nombres[i]
+        extras = problema.extras_alternativas[i] if problema.extras_alternativas else None
+        return (problema.mins[i].tobytes(), problema.maxs[i].tobytes(),
+                repr(extras), repr(particulares.get(nombre, [])))
+
+    # Valores crudos de las alternativas `indices`, repartidas entre procesos
+    def _muestrear(self, problema, indices: list, iteraciones: int, entropia,
+                   muestreo: str, correlaciones: list, procesos: int) -> list:
+        tareas  = [problema.subconjunto([i]) for i in indices]
+        funcion = partial(_muestrear_alternativa, iteraciones=iteraciones, entropia=entropia,
+                          muestreo=muestreo, correlaciones=correlaciones)
+        if procesos <= 1 or len(tareas) <= 1:
+            return [funcion(t) for t in tareas]
+
+        trozo = -(-len(tareas) // (procesos * 4))
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            return list(ejecutor.map(funcion, tareas, chunksize=trozo))
+
+    def simular(self,
+                alternativas,
+                criterios: list = None,
+                pesos_normalizados: dict = None,
+                iteraciones: int = 10000,
+                semilla: int = None,
+                procesos: int = 1,
+                muestreo: str = "aleatorio",
+                niveles_var: tuple = NIVELES_VAR,
+                correlaciones: list = None,
+                incertidumbre_pesos: str = None,
+                concentracion: float = 100.0,
+                comparaciones=None,
+                dispersion_juicios: float = 0.2,
+                metodo: str = "wsm",
+                parametros_metodo: dict = None,
+                filtrar_dominadas: bool = False,
+                top_k: int = None) -> dict:
+        """
+        Mismos parámetros y mismo formato de resultado que simular_todas en
+        modo matriz (sin modo adaptativo ni reducción de varianza), más
+        "redibujadas": las alternativas que se volvieron a muestrear, en
+        `procesos` procesos.
+        """
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+
+        # Finalistas normalizadas con los rangos de todas (como simular_todas)
+        problema = como_problema(alternativas, criterios)
+        rangos   = rangos_problema(problema)
+        todas    = set(problema.nombres)
+        extra    = {}
+        if filtrar_dominadas or top_k is not None:
+            indices, extra = seleccionar_finalistas(problema, pesos_normalizados,
+                                                    filtrar_dominadas, top_k)
+            if indices.size < problema.n_alternativas:
+                problema = problema.subconjunto(indices)
+        nombres = problema.nombres
+        if iteraciones * max(problema.mins.size, 1) > MAX_ELEMENTOS_BLOQUE:
+            raise ValueError("El problema no cabe en memoria como matriz; usa simular_todas.")
+
+        # Pesos, método y normalización: se validan y compilan sobre una sola fila
+        modelo = _preparar_modelo(problema.subconjunto([0]), pesos_normalizados=pesos_normalizados,
+                                  rangos_globales=rangos, muestreo=muestreo,
+                                  incertidumbre_pesos=incertidumbre_pesos,
+                                  concentracion=concentracion, comparaciones=comparaciones,
+                                  dispersion_juicios=dispersion_juicios,
+                                  metodo=metodo, parametros_metodo=parametros_metodo)
+
+        generales    = [r for r in correlaciones or [] if not _texto(r.get("Alternativa"))]
+        particulares = {}
+        for r in correlaciones or []:
+            if _texto(r.get("Alternativa")):
+                particulares.setdefault(_texto(r.get("Alternativa")), []).append(r)
+
+        entropia = self._entropia if semilla is None else semilla
+        comun    = self._clave_comun(problema, entropia, iteraciones, muestreo, generales)
+        if comun != self._comun:
+            self._comun, self._cache = comun, {}
+
+        claves     = [self._clave_alternativa(problema, i, particulares) for i in range(len(nombres))]
+        pendientes = [i for i, nombre in enumerate(nombres)
+                      if nombre not in self._cache or self._cache[nombre][0] != claves[i]]
+        nuevas     = self._muestrear(problema, pendientes, iteraciones, entropia,
+                                     muestreo, correlaciones, procesos)
+
+        # Las eliminadas del problema salen de la caché; las que quedaron
+        # fuera por el filtro o el top k se conservan para la próxima corrida
+        cache = {n: e for n, e in self._cache.items() if n in todas}
+        for i, valores in zip(pendientes, nuevas):
+            cache[nombres[i]] = (claves[i],) + valores
+        self._cache = cache
+        redibujadas = [nombres[i] for i in pendientes]
+
+        print(f"\nEjecutando {iteraciones:,} simulaciones por alternativa "
+              f"({len(redibujadas)} de {len(nombres)} muestreadas de nuevo)...")
+
+        # Tensor (iteraciones × alternativas × criterios) normalizado con los rangos actuales
+        normalizados = np.stack([cache[n][1] for n in nombres], axis=1)
+        normalizados *= modelo["escala"]
+        normalizados += modelo["desplazamiento"]
+
+        modelo.update(nombres=nombres,
+                      val_inf=np.stack([cache[n][2] for n in nombres]),
+                      val_sup=np.stack([cache[n][3] for n in nombres]))
+        rng_pesos = np.random.default_rng(np.random.SeedSequence(entropia,
+                                                                 spawn_key=(FLUJO_PESOS,)))
+        matriz = _puntuar(modelo, normalizados,
+                          _muestrear_pesos(modelo, iteraciones, rng_pesos))
+
+        kernel = calcular_estadisticas_matriz(matriz, _limites_scores(modelo),
+                                              niveles_var=niveles_var)
+        victorias  = _victorias_matriz(matriz) / iteraciones
+        resultados = {}
+        for i, nombre in enumerate(nombres):
+            stats = _estadisticas_fila(kernel, i)
+            stats["riesgo"]     = clasificar_riesgo(stats["desviacion"])
+            stats["prob_ganar"] = round(float(victorias[i]), 4)
+            resultados[nombre]  = stats
+
+        ganador = max(resultados, key=lambda x: resultados[x]["media"])
+        print(f"\nSimulación completada.")
+        print(f"Ganador Monte Carlo: {ganador}")
+
+        return {
+            "ganador":     ganador,
+            "resultados":  resultados,
+            "iteraciones": iteraciones,
+            "redibujadas": redibujadas,
+            **extra
+        }
+
+
+if __name__ == "__main__":
+    try:
+        import time
+
+        from excel_reader import leer_alternativas, leer_criterios
+
+        archivo = "plantilla.xlsx"
+        alternativas, err = leer_alternativas(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+        criterios, err = leer_criterios(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        motor = RankingIncremental(alternativas, criterios)
+        print("Ranking inicial:", [r['alternativa'] for r in motor.ranking()])
+
+        # Editar una alternativa: solo se re-puntúa esa fila
+        editada = dict(alternativas[-1])
+        for c in criterios:
+            editada[f"{c['Criterio']}_Min"] *= 0.9
+        inicio = time.perf_counter()
+        motor.actualizar_alternativa(editada)
+        print(f"Tras editar {editada['Alternativa']} ({(time.perf_counter() - inicio) * 1000:.2f} ms):",
+              [r['alternativa'] for r in motor.ranking()])
+
+        # Re-simular: solo la alternativa editada se vuelve a muestrear
+        simulacion = SimulacionIncremental()
+        simulacion.simular(alternativas, criterios, semilla=42)
+        inicio = time.perf_counter()
+        res = simulacion.simular(alternativas[:-1] + [editada], criterios, semilla=42)
+        print(f"Re-simulación ({(time.perf_counter() - inicio) * 1000:.1f} ms), "
+              f"redibujadas: {res['redibujadas']}")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
@@ -0,0 +1,418 @@
+# Evaluación por lotes: muchos problemas de decisión chicos en una sola pasada
+
+import os
+
+import numpy as np
+
+import montecarlo
+from ahp_wsm import CR_MAXIMO, consistencia, matriz_comparaciones, pesos_autovector
+from distribuciones import compilar_distribuciones
+from modelo import DecisionProblem, como_problema
+from montecarlo import (MAX_ELEMENTOS_BLOQUE, NIVELES_VAR, _ejecutar_tramos, _estadisticas_fila,
+                        calcular_estadisticas_matriz, clasificar_riesgo, simular_todas)
+
+# Incertidumbre de pesos que el camino vectorizado resuelve; las demás
+# opciones (AHP perturbado, otros métodos, QMC) van problema por problema
+INCERTIDUMBRE_LOTE = (None, "dirichlet", "simplex")
+
+# Relleno máximo de un paquete: elementos con relleno / elementos reales
+MAX_RELLENO = 1.25
+
+
+def _como_problema(entrada) -> DecisionProblem:
+    if isinstance(entrada, DecisionProblem):
+        return entrada
+    return como_problema(*entrada)
+
+
+def _vacio(valor) -> bool:
+    return valor is None or (not isinstance(valor, np.ndarray) and not valor)
+
+
+# Pesos AHP de todos los problemas con comparaciones, un lote por tamaño de matriz
+def _pesos_ahp_lote(problemas: list, comparaciones: list) -> list:
+    """
+    Reemplaza los pesos de cada problema con comparaciones por el
+    autovector de su matriz y retorna la consistencia de cada uno (None
+    sin comparaciones), con el mismo formato que pesos_ahp.
+    """
+    consistencias = [None] * len(problemas)
+    por_tamano    = {}
+    for k, (problema, registros) in enumerate(zip(problemas, comparaciones)):
+        if _vacio(registros):
+            continue
+        matriz = (np.asarray(registros, dtype=float) if isinstance(registros, np.ndarray)
+                  else matriz_comparaciones(registros, problema.criterios))
+        por_tamano.setdefault(problema.n_criterios, []).append((k, matriz))
+
+    for n, grupo in por_tamano.items():
+        indices, matrices = zip(*grupo)
+        pesos, lambda_max = pesos_autovector(np.stack(matrices))
+        indices_c = consistencia(lambda_max, n)
+        for fila, k in enumerate(indices):
+            problema       = problemas[k].subconjunto(np.arange(problemas[k].n_alternativas))
+            problema.pesos = pesos[fila]
+            problemas[k]   = problema
+            cr = float(indices_c["cr"][fila])
+            consistencias[k] = {
+                "lambda_max":  float(lambda_max[fila]),
+                "ci":          float(indices_c["ci"][fila]),
+                "cr":          cr,
+                "consistente": cr <= CR_MAXIMO
+            }
+    return consistencias
+
+
+# Grupos de problemas de tamaño parecido cuyo arreglo con relleno cabe en `limite`
+def _agrupar(problemas: list, indices: list, elementos_fila: int, limite: int) -> list:
+    """
+    Se ordena por tamaño y se corta un grupo cuando no cabe en `limite` o
+    cuando el relleno hasta las alternativas y criterios de su problema
+    más grande supera MAX_RELLENO; problemas de la misma forma quedan
+    juntos y sin relleno.
+    """
+    orden  = sorted(indices, key=lambda k: problemas[k].mins.shape)
+    grupos = []
+    actual, max_alt, max_crit, reales = [], 0, 0, 0
+    for k in orden:
+        n_alt, n_crit = problemas[k].mins.shape
+        n_alt, n_crit = max(max_alt, n_alt), max(max_crit, n_crit)
+        rellenos = (len(actual) + 1) * n_alt * n_crit
+        if actual and (rellenos * elementos_fila > limite
+                       or rellenos > MAX_RELLENO * (reales + problemas[k].mins.size)):
+            grupos.append(actual)
+            actual, reales = [], 0
+            n_alt, n_crit = problemas[k].mins.shape
+        actual.append(k)
+        max_alt, max_crit = n_alt, n_crit
+        reales += problemas[k].mins.size
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+
+# Arreglos con relleno (problemas × alternativas × criterios) y sus máscaras
+def _empaquetar(problemas: list) -> dict:
+    n_alt  = max(p.n_alternativas for p in problemas)
+    n_crit = max(p.n_criterios for p in problemas)
+    forma  = (len(problemas), n_alt, n_crit)
+
+    paquete = {
+        "mins":        np.zeros(forma),
+        "maxs":        np.zeros(forma),
+        "minimizar":   np.zeros(forma[::2], dtype=bool),
+        "pesos":       np.zeros(forma[::2]),
+        "alt_valida":  np.zeros(forma[:2], dtype=bool),
+        "crit_valido": np.zeros(forma[::2], dtype=bool),
+    }
+    for p, problema in enumerate(problemas):
+        a, c = problema.mins.shape
+        paquete["mins"][p, :a, :c]    = problema.mins
+        paquete["maxs"][p, :a, :c]    = problema.maxs
+        paquete["minimizar"][p, :c]   = problema.minimizar
+        paquete["pesos"][p, :c]       = problema.pesos
+        paquete["alt_valida"][p, :a]  = True
+        paquete["crit_valido"][p, :c] = True
+    return paquete
+
+
+# Mínimo y máximo de cada criterio entre las alternativas reales: (problemas × criterios)
+def _extremos(valores_bajos: np.ndarray, valores_altos: np.ndarray, alt_valida: np.ndarray) -> tuple:
+    validas = alt_valida[..., None]
+    return (np.where(validas, valores_bajos, np.inf).min(axis=1),
+            np.where(validas, valores_altos, -np.inf).max(axis=1))
+
+
+# ── RANKING WSM ───────────────────────────────────────────
+
+def _rankings_paquete(problemas: list, paquete: dict) -> list:
+    """Mismo resultado que rankear_alternativas para cada problema del paquete."""
+    valores = (paquete["mins"] + paquete["maxs"]) / 2
+    minimos, maximos = _extremos(valores, valores, paquete["alt_valida"])
+    rango   = maximos - minimos
+    divisor = np.where(rango == 0, 1.0, rango)
+
+    X = np.where(paquete["minimizar"][:, None, :],
+                 maximos[:, None, :] - valores, valores - minimos[:, None, :]) / divisor[:, None, :]
+    X = np.where((rango == 0)[:, None, :], 0.5, X)
+
+    scores   = np.round(np.matmul(X, paquete["pesos"][..., None])[..., 0], 4)
+    orden    = np.argsort(np.where(paquete["alt_valida"], -scores, np.inf), axis=1, kind="stable")
+    desglose = np.round(X, 4)
+
+    rankings = []
+    for p, problema in enumerate(problemas):
+        a, c       = problema.mins.shape
+        filas      = orden[p, :a]
+        pesos_dict = dict(zip(problema.criterios, problema.pesos.tolist()))
+        rankings.append([{
+            'alternativa': problema.nombres[i],
+            'score': score,
+            'desglose': dict(zip(problema.criterios, fila)),
+            'pesos': pesos_dict
+        } for i, score, fila in zip(filas, scores[p, filas].tolist(),
+                                    desglose[p, filas, :c].tolist())])
+    return rankings
+
+
+# ── MONTE CARLO ───────────────────────────────────────────
+
+# Scores de un paquete: (iteraciones × problemas × alternativas), relleno en -inf
+def _scores_paquete(paquete: dict, opciones: dict, rng) -> tuple:
+    """
+    Misma simulación que simular_todas (uniforme en [Min, Max], normalizada
+    con los rangos globales de cada problema y pesos fijos, Dirichlet o
+    simplex), con todos los problemas del paquete en un solo tensor. Los
+    criterios de relleno tienen escala cero y peso cero, así que no suman.
+    Retorna (scores, escala, desplazamiento).
+    """
+    mins, maxs   = paquete["mins"], paquete["maxs"]
+    g_min, g_max = _extremos(np.minimum(mins, maxs), np.maximum(mins, maxs), paquete["alt_valida"])
+
+    minimizar = paquete["minimizar"]
+    rango     = g_max - g_min
+    constante = rango == 0
+    divisor   = np.where(constante, 1.0, rango)
+    escala         = np.where(minimizar, -1.0, 1.0) / divisor
+    desplazamiento = np.where(minimizar, g_max, -g_min) / divisor
+    escala[constante]         = 0.0
+    desplazamiento[constante] = 0.5
+
+    # Uniforme en [Min, Max] y normalización como una sola transformación afín
+    # por celda, para que cada operación recorra el tensor de corrido
+    pendiente = (maxs - mins) * escala[:, None, :]
+    origen    = mins * escala[:, None, :] + desplazamiento[:, None, :]
+
+    n = opciones["iteraciones"]
+    valores  = rng.random((n,) + mins.shape)
+    valores *= pendiente
+    valores += origen
+
+    pesos = paquete["pesos"]
+    if opciones["incertidumbre_pesos"] is None:
+        scores = np.matmul(valores, pesos[..., None])[..., 0]
+    else:
+        if opciones["incertidumbre_pesos"] == "dirichlet":
+            muestras = rng.standard_gamma(opciones["concentracion"] * pesos, (n,) + pesos.shape)
+        else:
+            muestras = rng.standard_exponential((n,) + pesos.shape) * paquete["crit_valido"]
+        muestras /= muestras.sum(axis=2, keepdims=True)
+        scores = np.matmul(valores, muestras[..., None])[..., 0]
+
+    scores[:, ~paquete["alt_valida"]] = -np.inf
+    return scores, escala, desplazamiento
+
+
+# Cotas del score de cada alternativa real (como montecarlo._limites_scores)
+def _limites_paquete(paquete: dict, escala: np.ndarray, desplazamiento: np.ndarray,
+                     incertidumbre_pesos: str) -> tuple:
+    norm_a = paquete["mins"] * escala[:, None, :] + desplazamiento[:, None, :]
+    norm_b = paquete["maxs"] * escala[:, None, :] + desplazamiento[:, None, :]
+    bajo, alto = np.minimum(norm_a, norm_b), np.maximum(norm_a, norm_b)
+
+    if incertidumbre_pesos is None:
+        inferior = np.matmul(bajo, paquete["pesos"][..., None])[..., 0]
+        superior = np.matmul(alto, paquete["pesos"][..., None])[..., 0]
+    else:
+        validos  = paquete["crit_valido"][:, None, :]
+        inferior = np.where(validos, bajo, np.inf).min(axis=2)
+        superior = np.where(validos, alto, -np.inf).max(axis=2)
+    return inferior[paquete["alt_valida"]], superior[paquete["alt_valida"]]
+
+
+def _modelo_de(modelo: dict) -> dict:
+    return modelo if modelo is not None else montecarlo._MODELO_TRABAJADOR
+
+
+# Estadísticas de cada paquete de un tramo: (kernel, victorias) por paquete
+def _simular_tramo(tramo: list, modelo: dict = None) -> list:
+    opciones = _modelo_de(modelo)
+    parciales = []
+    for paquete, semilla in tramo:
+        scores, escala, desplazamiento = _scores_paquete(paquete, opciones,
+                                                         np.random.default_rng(semilla))
+        n_prob, n_alt = paquete["alt_valida"].shape
+
+        ganador   = scores.argmax(axis=2) + n_alt * np.arange(n_prob)
+        victorias = np.bincount(ganador.ravel(), minlength=n_prob * n_alt).reshape(n_prob, n_alt)
+
+        # Filas (alternativa real × iteraciones) de todos los problemas, en orden
+        matriz = scores.transpose(1, 2, 0)[paquete["alt_valida"]]
+        limites = _limites_paquete(paquete, escala, desplazamiento, opciones["incertidumbre_pesos"])
+        kernel  = calcular_estadisticas_matriz(matriz, limites, niveles_var=opciones["niveles_var"])
+        parciales.append((kernel, victorias))
+    return parciales
+
+
+# Resultado de simular_todas para un problema a partir de su parte del kernel
+def _resultado_problema(problema, kernel: dict, fila: int, victorias: np.ndarray,
+                        iteraciones: int) -> dict:
+    resultados = {}
+    for i, nombre in enumerate(problema.nombres):
+        stats = _estadisticas_fila(kernel, fila + i)
+        stats["riesgo"]     = clasificar_riesgo(stats["desviacion"])
+        stats["prob_ganar"] = round(float(victorias[i] / iteraciones), 4)
+        resultados[nombre]  = stats
+
+    return {
+        "ganador":     max(resultados, key=lambda x: resultados[x]["media"]),
+        "resultados":  resultados,
+        "iteraciones": iteraciones
+    }
+
+
+# Si el problema puede ir en el tensor compartido
+def _vectorizable(problema, correlaciones, iteraciones: int) -> bool:
+    if not _vacio(correlaciones):
+        return False
+    if iteraciones * problema.mins.size > MAX_ELEMENTOS_BLOQUE:
+        return False
+    if problema.extras_alternativas is None and problema.extras_criterios is None:
+        return True
+    # Columnas opcionales que solo declaran la uniforme no impiden el lote
+    grupos, _, _ = compilar_distribuciones(problema)
+    return not grupos
+
+
+def evaluar_lote(problemas: list,
+                 comparaciones: list = None,
+                 correlaciones: list = None,
+                 iteraciones: int = 10000,
+                 semilla: int = None,
+                 procesos: int = 1,
+                 muestreo: str = "aleatorio",
+                 niveles_var: tuple = NIVELES_VAR,
+                 incertidumbre_pesos: str = None,
+                 concentracion: float = 100.0,
+                 dispersion_juicios: float = 0.2,
+                 metodo: str = "wsm",
+                 parametros_metodo: dict = None) -> list[dict]:
+    """
+    Evalúa muchos problemas de decisión a la vez. `problemas` es una lista
+    de DecisionProblem o de tuplas (alternativas, criterios), con cualquier
+    número de alternativas y criterios cada uno. `comparaciones` y
+    `correlaciones` son listas paralelas opcionales (None donde un problema
+    no tiene hoja Comparaciones o Correlaciones); las demás opciones son
+    las de simular_todas y valen para todo el lote.
+
+    Los problemas se ordenan por tamaño y se empaquetan en arreglos con
+    relleno (problemas × alternativas × criterios) y máscaras, así que:
+      - los pesos AHP salen de un solo lote de autovectores por tamaño de
+        matriz;
+      - el ranking WSM de todos sale de un producto por paquete;
+      - Monte Carlo simula cada paquete en un solo tensor y calcula las
+        estadísticas de todas sus alternativas con un solo kernel. Los
+        paquetes se reparten entre `procesos`.
+
+    Los problemas con distribuciones no uniformes, correlaciones o que no
+    caben en memoria, y todo el lote si se pide muestreo QMC, otro método
+    o incertidumbre "ahp", se simulan uno por uno con simular_todas.
+
+    Retorna, en el orden de entrada, un dict por problema con "ranking"
+    (como rankear_alternativas), "montecarlo" (como simular_todas) y
+    "consistencia" (como pesos_ahp, None sin comparaciones). Con la misma
+    semilla el resultado se repite para el mismo lote, pero no coincide con
+    simular cada problema por separado.
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+
+    problemas     = [_como_problema(p) for p in problemas]
+    n_prob        = len(problemas)
+    comparaciones = list(comparaciones) if comparaciones is not None else [None] * n_prob
+    correlaciones = list(correlaciones) if correlaciones is not None else [None] * n_prob
+    if len(comparaciones) != n_prob or len(correlaciones) != n_prob:
+        raise ValueError("Debe haber una entrada de comparaciones y correlaciones por problema.")
+
+    # 1) Pesos AHP y ranking WSM de todos los problemas
+    consistencias = _pesos_ahp_lote(problemas, comparaciones)
+    rankings      = [None] * n_prob
+    for grupo in _agrupar(problemas, range(n_prob), 1, MAX_ELEMENTOS_BLOQUE):
+        parte = [problemas[k] for k in grupo]
+        for k, ranking in zip(grupo, _rankings_paquete(parte, _empaquetar(parte))):
+            rankings[k] = ranking
+
+    # 2) Monte Carlo: en paquetes lo que se puede, el resto uno por uno
+    lote_posible = (incertidumbre_pesos in INCERTIDUMBRE_LOTE and metodo == "wsm"
+                    and muestreo == "aleatorio")
+    en_lote = [k for k in range(n_prob)
+               if lote_posible and _vectorizable(problemas[k], correlaciones[k], iteraciones)]
+    separados = sorted(set(range(n_prob)) - set(en_lote))
+    print(f"\nEvaluando {n_prob} problemas ({len(en_lote)} en lote, "
+          f"{len(separados)} por separado)...")
+
+    grupos  = _agrupar(problemas, en_lote, iteraciones, MAX_ELEMENTOS_BLOQUE)
+    raiz    = np.random.SeedSequence(semilla)
+    hijas   = raiz.spawn(len(grupos) + len(separados))
+    bloques = [(_empaquetar([problemas[k] for k in grupo]), hija)
+               for grupo, hija in zip(grupos, hijas)]
+    opciones = {
+        "iteraciones":         iteraciones,
+        "incertidumbre_pesos": incertidumbre_pesos,
+        "concentracion":       concentracion,
+        "niveles_var":         niveles_var
+    }
+
+    simulaciones = [None] * n_prob
+    parciales    = (p for tramo in _ejecutar_tramos(_simular_tramo, opciones, bloques, procesos)
+                    for p in tramo)
+    for grupo, (kernel, victorias) in zip(grupos, parciales):
+        fila = 0
+        for p, k in enumerate(grupo):
+            simulaciones[k] = _resultado_problema(problemas[k], kernel, fila, victorias[p],
+                                                  iteraciones)
+            fila += problemas[k].n_alternativas
+
+    for k, hija in zip(separados, hijas[len(grupos):]):
+        simulaciones[k] = simular_todas(problemas[k], iteraciones=iteraciones,
+                                        semilla=int(hija.generate_state(1)[0]),
+                                        procesos=procesos, muestreo=muestreo,
+                                        niveles_var=niveles_var,
+                                        correlaciones=correlaciones[k],
+                                        incertidumbre_pesos=incertidumbre_pesos,
+                                        concentracion=concentracion,
+                                        comparaciones=comparaciones[k],
+                                        dispersion_juicios=dispersion_juicios,
+                                        metodo=metodo, parametros_metodo=parametros_metodo)
+
+    return [{
+        "ranking":      rankings[k],
+        "montecarlo":   simulaciones[k],
+        "consistencia": consistencias[k]
+    } for k in range(n_prob)]
+
+
+if __name__ == "__main__":
+    try:
+        import time
+
+        from excel_reader import leer_problema
+
+        archivo = "plantilla.xlsx"
+        problema, err = leer_problema(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        # Cincuenta licitaciones parecidas a la plantilla, con valores desplazados
+        rng = np.random.default_rng(0)
+        problemas = []
+        for _ in range(50):
+            factor = rng.uniform(0.8, 1.2, problema.mins.shape)
+            problemas.append(DecisionProblem(problema.nombres, problema.criterios,
+                                             problema.mins * factor, problema.maxs * factor,
+                                             problema.tipos, problema.importancias))
+
+        inicio = time.perf_counter()
+        lote   = evaluar_lote(problemas, iteraciones=10000, semilla=42)
+        print(f"Lote de {len(lote)} problemas: {time.perf_counter() - inicio:.2f} s")
+
+        ganadores = {}
+        for resultado in lote:
+            ganador = resultado["montecarlo"]["ganador"]
+            ganadores[ganador] = ganadores.get(ganador, 0) + 1
+        for nombre, veces in sorted(ganadores.items(), key=lambda x: -x[1]):
+            print(f"  {nombre:<20} gana en {veces} de {len(lote)}")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
@@ -0,0 +1,240 @@
+# Métodos multicriterio sobre la matriz normalizada (TOPSIS, VIKOR, PROMETHEE II)
+
+import numpy as np
+
+from ahp_wsm import matriz_normalizada
+
+METODOS = ("wsm", "topsis", "vikor", "promethee")
+
+# VIKOR: peso de la estrategia de "mayoría de criterios" (v) frente al arrepentimiento
+V_VIKOR = 0.5
+
+# PROMETHEE II: umbrales de indiferencia (q) y preferencia estricta (p) de la
+# función en V, en unidades de la escala normalizada 0-1
+INDIFERENCIA = 0.05
+PREFERENCIA  = 0.30
+
+# PROMETHEE compara todos los pares hasta este número de alternativas;
+# con más, ordenar cada criterio es más barato (ver _preferencia_neta)
+MAX_ALT_PARES = 16
+
+# Elementos por bloque: del tensor de diferencias por pares (≈ 32 MB en
+# float64) y de los valores que se ordenan (≈ 40 MB con sumas y conteos)
+MAX_ELEMENTOS_PARES     = 4_000_000
+MAX_ELEMENTOS_PROMETHEE = 1_000_000
+
+
+# Pesos listos para multiplicar contra (…, alternativas, criterios)
+def _pesos_bloque(pesos: np.ndarray) -> np.ndarray:
+    pesos = np.asarray(pesos, dtype=float)
+    return pesos if pesos.ndim == 1 else pesos[:, None, :]
+
+
+# Cociente que vale `defecto` donde el divisor es cero
+def _dividir(numerador, divisor, defecto: float = 0.0):
+    seguro = np.where(divisor > 0, divisor, 1.0)
+    return np.where(divisor > 0, numerador / seguro, defecto)
+
+
+def puntuar_wsm(normalizados: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    return (normalizados * _pesos_bloque(pesos)).sum(axis=-1)
+
+
+def puntuar_topsis(normalizados: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    """
+    Cercanía relativa d⁻ / (d⁺ + d⁻) a la solución ideal, con la ideal y la
+    anti-ideal tomadas entre las alternativas de cada iteración.
+    """
+    ponderados = normalizados * _pesos_bloque(pesos)
+    ideal      = ponderados.max(axis=-2, keepdims=True)
+    anti_ideal = ponderados.min(axis=-2, keepdims=True)
+
+    d_ideal = np.sqrt(((ponderados - ideal) ** 2).sum(axis=-1))
+    d_anti  = np.sqrt(((ponderados - anti_ideal) ** 2).sum(axis=-1))
+    return _dividir(d_anti, d_ideal + d_anti, 0.5)
+
+
+def puntuar_vikor(normalizados: np.ndarray, pesos: np.ndarray, v: float = V_VIKOR) -> np.ndarray:
+    """
+    Retorna 1 - Q para que, como en los demás métodos, más alto sea mejor.
+    S es el arrepentimiento ponderado total, R el máximo por criterio.
+    """
+    mejor = normalizados.max(axis=-2, keepdims=True)
+    peor  = normalizados.min(axis=-2, keepdims=True)
+    arrepentimiento = _pesos_bloque(pesos) * _dividir(mejor - normalizados, mejor - peor)
+
+    s = arrepentimiento.sum(axis=-1)
+    r = arrepentimiento.max(axis=-1)
+    s_min, s_max = s.min(axis=-1, keepdims=True), s.max(axis=-1, keepdims=True)
+    r_min, r_max = r.min(axis=-1, keepdims=True), r.max(axis=-1, keepdims=True)
+
+    q = v * _dividir(s - s_min, s_max - s_min) + (1 - v) * _dividir(r - r_min, r_max - r_min)
+    return 1 - q
+
+
+# Σ_b [P(x_a - x_b) - P(x_b - x_a)] de cada fila de `filas` (filas × alternativas)
+def _preferencia_neta(filas: np.ndarray, indiferencia: float, preferencia: float) -> np.ndarray:
+    """
+    P(d) - P(-d) es lineal por tramos en x_b: +1 si x_b <= x_a - p, 0 si
+    |x_a - x_b| <= q, -1 si x_b >= x_a + p, y rectas entre medio. Con cada
+    fila ordenada y sus sumas acumuladas, cada tramo se resuelve con un
+    conteo (searchsorted) y una diferencia de sumas: O(n log n) por fila en
+    lugar de comparar todos los pares. Todas las filas se buscan a la vez
+    desplazándolas a intervalos disjuntos de un solo arreglo ordenado.
+    """
+    n_filas, n_alt = filas.shape
+    indices = np.argsort(filas, axis=1)
+    orden   = np.take_along_axis(filas, indices, axis=1)
+    acum    = np.zeros((n_filas, n_alt + 1))
+    np.cumsum(orden, axis=1, out=acum[:, 1:])
+
+    # Consultas en orden creciente: searchsorted aprovecha la anterior
+    espacio = 2 * (np.abs(orden).max() + preferencia) + 1
+    desfase = (np.arange(n_filas) * espacio)[:, None]
+    plano   = (orden + desfase).ravel()
+    base    = (np.arange(n_filas) * n_alt)[:, None]
+
+    def contar(umbral, lado):
+        return np.searchsorted(plano, (umbral + desfase).ravel(), side=lado).reshape(filas.shape) - base
+
+    def sumar(desde, hasta):
+        return np.take_along_axis(acum, hasta, axis=1) - np.take_along_axis(acum, desde, axis=1)
+
+    c1 = contar(orden - preferencia, "right")      # x_b <= x_a - p
+    c2 = contar(orden - indiferencia, "left")      # x_b <  x_a - q
+    c3 = contar(orden + indiferencia, "right")     # x_b <= x_a + q
+    c4 = contar(orden + preferencia, "left")       # x_b <  x_a + p
+
+    amplitud = preferencia - indiferencia
+    ordenada  = (c1 - (n_alt - c4)).astype(float)
+    ordenada += ((c2 - c1) * (orden - indiferencia) - sumar(c1, c2)) / amplitud
+    ordenada -= (sumar(c3, c4) - (c4 - c3) * (orden + indiferencia)) / amplitud
+
+    # De vuelta al orden original de las alternativas
+    neta = np.empty_like(ordenada)
+    np.put_along_axis(neta, indices, ordenada, axis=1)
+    return neta
+
+
+# Σ_b [P(x_a - x_b) - P(x_b - x_a)] comparando todos los pares: (iteraciones × alternativas × criterios)
+def _preferencia_pares(bloque: np.ndarray, indiferencia: float, preferencia: float) -> np.ndarray:
+    d    = bloque[:, :, None, :] - bloque[:, None, :, :]
+    neta = np.abs(d)
+    neta -= indiferencia
+    neta /= preferencia - indiferencia
+    np.clip(neta, 0.0, 1.0, out=neta)
+    np.copysign(neta, d, out=neta)
+    return neta.sum(axis=2)
+
+
+def puntuar_promethee(normalizados: np.ndarray,
+                      pesos: np.ndarray,
+                      indiferencia: float = INDIFERENCIA,
+                      preferencia: float = PREFERENCIA) -> np.ndarray:
+    """
+    Flujo neto φ(a) = Σ_b [π(a, b) - π(b, a)] / (n - 1), en [-1, 1].
+
+    Con la función de preferencia en V con indiferencia, P(d) - P(-d) es
+    impar, así que el flujo de cada criterio sale de comparar todos los
+    pares (pocas alternativas) o de ordenarlas (ver _preferencia_neta).
+    Cada bloque abarca todas las alternativas y tantas iteraciones como
+    permiten MAX_ELEMENTOS_PARES o MAX_ELEMENTOS_PROMETHEE.
+    """
+    if preferencia <= indiferencia:
+        raise ValueError("El umbral de preferencia debe ser mayor que el de indiferencia.")
+
+    lote  = normalizados.ndim == 3
+    norm  = normalizados if lote else normalizados[None]
+    pesos = np.asarray(pesos, dtype=float)
+    n, n_alt, n_crit = norm.shape
+    if n_alt < 2:
+        return np.zeros(normalizados.shape[:-1])
+
+    por_pares = n_alt <= MAX_ALT_PARES
+    paso = max((MAX_ELEMENTOS_PARES // (n_alt * n_alt * n_crit)) if por_pares
+               else (MAX_ELEMENTOS_PROMETHEE // (n_alt * n_crit)), 1)
+
+    flujo = np.empty((n, n_alt))
+    for i0 in range(0, n, paso):
+        bloque = norm[i0:i0 + paso]
+        if por_pares:
+            neta = _preferencia_pares(bloque, indiferencia, preferencia)
+        else:
+            filas = np.swapaxes(bloque, 1, 2).reshape(-1, n_alt)    # (iteraciones·criterios × alternativas)
+            neta  = _preferencia_neta(filas, indiferencia, preferencia)
+            neta  = np.swapaxes(neta.reshape(bloque.shape[0], n_crit, n_alt), 1, 2)
+        w = pesos if pesos.ndim == 1 else pesos[i0:i0 + paso]
+        flujo[i0:i0 + paso] = puntuar_wsm(neta, w)
+
+    flujo /= n_alt - 1
+    return flujo if lote else flujo[0]
+
+
+PUNTUADORES = {
+    "wsm":       puntuar_wsm,
+    "topsis":    puntuar_topsis,
+    "vikor":     puntuar_vikor,
+    "promethee": puntuar_promethee,
+}
+
+
+# Scores de cualquier método: (…, alternativas), más alto = mejor
+def puntuar(metodo: str, normalizados: np.ndarray, pesos: np.ndarray, **parametros) -> np.ndarray:
+    """
+    `normalizados` es (alternativas × criterios) o un lote (iteraciones ×
+    alternativas × criterios); `pesos` es un vector o uno por iteración.
+    """
+    if metodo not in PUNTUADORES:
+        raise ValueError(f"Método desconocido: '{metodo}'. Opciones: {', '.join(METODOS)}.")
+    return PUNTUADORES[metodo](normalizados, pesos, **parametros)
+
+
+# Rango posible del score de cada método (para los histogramas de Monte Carlo)
+def limites_metodo(metodo: str) -> tuple:
+    return (-1.0, 1.0) if metodo == "promethee" else (0.0, 1.0)
+
+
+def rankear_metodo(alternativas,
+                   criterios: list[dict] = None,
+                   metodo: str = "topsis",
+                   **parametros) -> list[dict]:
+    """
+    Ranking determinista con el método indicado, sobre la misma matriz
+    normalizada que rankear_alternativas (punto medio de cada rango).
+    """
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    scores = np.round(puntuar(metodo, X, pesos, **parametros), 4)
+    orden  = np.argsort(-scores, kind="stable")
+    pesos_dict = dict(zip(nombres_crit, pesos.tolist()))
+
+    return [{
+        'alternativa': nombres[i],
+        'score': float(scores[i]),
+        'pesos': pesos_dict
+    } for i in orden]
+
+
+if __name__ == "__main__":
+    try:
+        from excel_reader import leer_alternativas, leer_criterios
+
+        archivo = "plantilla.xlsx"
+        alternativas, err = leer_alternativas(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+        criterios, err = leer_criterios(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        print("=" * 55)
+        print("   RANKING POR MÉTODO")
+        print("=" * 55)
+        for metodo in METODOS:
+            ranking = rankear_metodo(alternativas, criterios, metodo)
+            orden = "  >  ".join(f"{r['alternativa']} ({r['score']:.3f})" for r in ranking)
+            print(f"  {metodo:<10} {orden}")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
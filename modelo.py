@@ -0,0 +1,273 @@
+# Problema de decisión compilado a arreglos, compartido por todos los motores
+
+from operator import itemgetter
+
+import numpy as np
+
+# Columnas que el modelo guarda como arreglos; el resto se conserva como extras
+COLUMNAS_CRITERIO = ('Criterio', 'Importancia (1-10)', 'Tipo', 'peso')
+
+
+# ── JERARQUÍA DE CRITERIOS ────────────────────────────────
+
+# Nombre del criterio padre ('' en la raíz; NaN y 'nan' cuentan como vacío)
+def _padre(criterio: dict) -> str:
+    valor = criterio.get('Padre')
+    if valor is None or valor != valor:
+        return ''
+    texto = str(valor).strip()
+    return '' if texto.lower() == 'nan' else texto
+
+
+def es_jerarquico(criterios: list[dict]) -> bool:
+    return any(_padre(c) for c in criterios)
+
+
+# Criterios que no agrupan a otros: los únicos con valores en Alternativas
+def criterios_hoja(criterios: list[dict]) -> list[dict]:
+    padres = {_padre(c) for c in criterios}
+    return [c for c in criterios if c['Criterio'] not in padres]
+
+
+def aplanar_jerarquia(criterios: list[dict]) -> list[dict]:
+    """
+    Convierte un árbol de criterios (columna 'Padre') en la lista plana de
+    hojas con su peso global en 'peso':
+      - peso local = importancia / suma de importancias de sus hermanos;
+      - peso global = producto de los pesos locales hasta la raíz.
+    El producto se resuelve por niveles sobre arreglos (una pasada por
+    nivel, no por nodo), y solo una vez: los motores trabajan sobre las
+    hojas como si el problema fuera plano.
+    """
+    nombres = [c['Criterio'] for c in criterios]
+    indice  = {n: j for j, n in enumerate(nombres)}
+    if len(indice) != len(nombres):
+        raise ValueError("Hay criterios con el nombre repetido.")
+
+    padres = []
+    for c in criterios:
+        padre = _padre(c)
+        if padre and padre not in indice:
+            raise ValueError(f"El padre '{padre}' de '{c['Criterio']}' no existe.")
+        padres.append(indice[padre] if padre else -1)
+    padres = np.array(padres, dtype=int)
+
+    # Importancias relativas entre hermanos (grupo 0 = raíz)
+    importancias = np.array([c['Importancia (1-10)'] for c in criterios], dtype=float)
+    suma_grupo   = np.bincount(padres + 1, weights=importancias, minlength=len(nombres) + 1)
+    if np.any(suma_grupo[padres + 1] == 0):
+        raise ValueError("La suma de importancias de un grupo de criterios no puede ser cero.")
+    locales = importancias / suma_grupo[padres + 1]
+
+    # Propagar hacia abajo: cada pasada fija un nivel más del árbol, y la
+    # profundidad deja de cambiar cuando todos los niveles están resueltos
+    raiz        = padres < 0
+    globales    = locales.copy()
+    profundidad = np.zeros(len(nombres), dtype=int)
+    for _ in range(len(nombres) + 1):
+        globales = np.where(raiz, locales, locales * globales[padres])
+        nueva    = np.where(raiz, 0, profundidad[padres] + 1)
+        if np.array_equal(nueva, profundidad):
+            break
+        profundidad = nueva
+    else:
+        raise ValueError("La jerarquía de criterios tiene un ciclo.")
+
+    hojas = []
+    for c in criterios_hoja(criterios):
+        copia = {k: v for k, v in c.items() if k != 'Padre'}
+        copia['peso'] = float(globales[indice[c['Criterio']]])
+        hojas.append(copia)
+    return hojas
+
+
+class DecisionProblem:
+    """
+    Alternativas y criterios compilados una sola vez:
+      - nombres / criterios: listas de nombres, con búsqueda por nombre en
+        `indice` e `indice_criterio`;
+      - mins / maxs: arreglos contiguos (alternativas × criterios);
+      - minimizar: vector booleano con la dirección de cada criterio;
+      - importancias / pesos: vectores por criterio (pesos suma 1). Por
+        defecto los pesos son las importancias normalizadas; si se pasan
+        `pesos` (p. ej. el autovector AHP) se usan esos.
+
+    Las columnas opcionales (distribuciones, modas, etc.) se guardan tal cual
+    en `extras_alternativas` / `extras_criterios` (None si no hay ninguna),
+    así que a_registros() reproduce los registros originales.
+    """
+
+    __slots__ = ("nombres", "criterios", "tipos", "mins", "maxs", "minimizar",
+                 "importancias", "pesos", "indice", "indice_criterio",
+                 "extras_alternativas", "extras_criterios")
+
+    def __init__(self,
+                 nombres: list,
+                 criterios: list,
+                 mins,
+                 maxs,
+                 tipos: list,
+                 importancias,
+                 extras_alternativas: list = None,
+                 extras_criterios: list = None,
+                 pesos=None):
+        if not nombres:
+            raise ValueError("No hay alternativas para evaluar.")
+        if not criterios:
+            raise ValueError("No hay criterios definidos.")
+
+        self.nombres   = list(nombres)
+        self.criterios = list(criterios)
+        self.tipos     = [str(t) for t in tipos]
+        self.mins      = np.ascontiguousarray(mins, dtype=float)
+        self.maxs      = np.ascontiguousarray(maxs, dtype=float)
+        self.minimizar = np.array([t.lower() == 'minimizar' for t in self.tipos])
+
+        forma = (len(self.nombres), len(self.criterios))
+        if self.mins.shape != forma or self.maxs.shape != forma:
+            raise ValueError(f"Min y Max deben tener forma {forma}.")
+
+        self.importancias = np.asarray(importancias, dtype=float)
+        total = self.importancias.sum()
+        if total == 0:
+            raise ValueError("La suma de importancias no puede ser cero.")
+        self.pesos = self.importancias / total
+        if pesos is not None:
+            self.pesos = np.asarray(pesos, dtype=float)
+            if self.pesos.shape != self.importancias.shape:
+                raise ValueError("Debe haber un peso por criterio.")
+
+        self.indice          = {n: i for i, n in enumerate(self.nombres)}
+        self.indice_criterio = {n: j for j, n in enumerate(self.criterios)}
+
+        self.extras_alternativas = extras_alternativas if extras_alternativas and any(extras_alternativas) else None
+        self.extras_criterios    = extras_criterios if extras_criterios and any(extras_criterios) else None
+
+    # ── CONVERSIÓN ────────────────────────────────────────
+
+    @classmethod
+    def desde_registros(cls, alternativas: list[dict], criterios: list[dict]) -> "DecisionProblem":
+        """
+        Compila las listas de dicts de excel_reader. Un criterio sin
+        columnas Min/Max usa la columna con su nombre como valor fijo y,
+        si tampoco existe, 0.0 (igual que rankear_alternativas). Si todos
+        los criterios traen 'peso' (normalizar_pesos o pesos_ahp), se usa.
+        Con columna 'Padre' el árbol se aplana a sus hojas con pesos globales.
+        """
+        if not alternativas:
+            raise ValueError("No hay alternativas para evaluar.")
+        if not criterios:
+            raise ValueError("No hay criterios definidos.")
+        if es_jerarquico(criterios):
+            criterios = aplanar_jerarquia(criterios)
+
+        nombres_crit = [c['Criterio'] for c in criterios]
+        n_crit = len(nombres_crit)
+        columnas = [f"{n}_Min" for n in nombres_crit] + [f"{n}_Max" for n in nombres_crit]
+
+        try:
+            # Caso normal: todas tienen Min y Max; una sola extracción por fila
+            obtener  = itemgetter(*columnas)
+            extremos = np.array([obtener(alt) for alt in alternativas], dtype=float)
+            extremos = extremos.reshape(len(alternativas), 2, n_crit)
+            mins, maxs = extremos[:, 0], extremos[:, 1]
+        except KeyError:
+            mins = np.empty((len(alternativas), n_crit))
+            maxs = np.empty((len(alternativas), n_crit))
+            for i, alt in enumerate(alternativas):
+                for j, n in enumerate(nombres_crit):
+                    if f"{n}_Min" in alt and f"{n}_Max" in alt:
+                        mins[i, j], maxs[i, j] = alt[f"{n}_Min"], alt[f"{n}_Max"]
+                    else:
+                        mins[i, j] = maxs[i, j] = alt.get(n, 0.0)
+
+        nucleo = {'Alternativa'} | set(columnas)
+        extras_alt  = [{k: v for k, v in alt.items() if k not in nucleo} for alt in alternativas]
+        extras_crit = [{k: v for k, v in c.items() if k not in COLUMNAS_CRITERIO} for c in criterios]
+        pesos = [c['peso'] for c in criterios] if all('peso' in c for c in criterios) else None
+
+        return cls(nombres=[alt['Alternativa'] for alt in alternativas],
+                   criterios=nombres_crit,
+                   mins=mins,
+                   maxs=maxs,
+                   tipos=[c['Tipo'] for c in criterios],
+                   importancias=[c['Importancia (1-10)'] for c in criterios],
+                   extras_alternativas=extras_alt,
+                   extras_criterios=extras_crit,
+                   pesos=pesos)
+
+    def a_registros(self) -> tuple:
+        """Retorna (alternativas, criterios) en el formato de excel_reader."""
+        mins, maxs = self.mins.tolist(), self.maxs.tolist()
+
+        alternativas = []
+        for i, nombre in enumerate(self.nombres):
+            registro = {'Alternativa': nombre}
+            for j, criterio in enumerate(self.criterios):
+                registro[f"{criterio}_Min"] = mins[i][j]
+                registro[f"{criterio}_Max"] = maxs[i][j]
+            if self.extras_alternativas:
+                registro.update(self.extras_alternativas[i])
+            alternativas.append(registro)
+
+        criterios = []
+        for j, criterio in enumerate(self.criterios):
+            registro = {'Criterio': criterio,
+                        'Importancia (1-10)': self.importancias[j].item(),
+                        'Tipo': self.tipos[j],
+                        'peso': self.pesos[j].item()}
+            if self.extras_criterios:
+                registro.update(self.extras_criterios[j])
+            criterios.append(registro)
+
+        return alternativas, criterios
+
+    # ── CONSULTAS ─────────────────────────────────────────
+
+    @property
+    def n_alternativas(self) -> int:
+        return len(self.nombres)
+
+    @property
+    def n_criterios(self) -> int:
+        return len(self.criterios)
+
+    def pesos_dict(self) -> dict:
+        return dict(zip(self.criterios, self.pesos.tolist()))
+
+    def extra_alternativa(self, i: int, clave: str, defecto=None):
+        if self.extras_alternativas is None:
+            return defecto
+        return self.extras_alternativas[i].get(clave, defecto)
+
+    def extra_criterio(self, j: int, clave: str, defecto=None):
+        if self.extras_criterios is None:
+            return defecto
+        return self.extras_criterios[j].get(clave, defecto)
+
+    def subconjunto(self, indices) -> "DecisionProblem":
+        """Nuevo problema solo con las alternativas indicadas (mismos criterios)."""
+        indices = np.asarray(indices, dtype=int)
+        extras  = ([self.extras_alternativas[i] for i in indices]
+                   if self.extras_alternativas else None)
+        problema = DecisionProblem(nombres=[self.nombres[i] for i in indices],
+                                   criterios=self.criterios,
+                                   mins=self.mins[indices],
+                                   maxs=self.maxs[indices],
+                                   tipos=self.tipos,
+                                   importancias=self.importancias,
+                                   extras_alternativas=extras,
+                                   extras_criterios=self.extras_criterios)
+        problema.pesos = self.pesos
+        return problema
+
+    def __repr__(self) -> str:
+        return (f"DecisionProblem({self.n_alternativas} alternativas, "
+                f"{self.n_criterios} criterios)")
+
+
+# Aceptar registros o un DecisionProblem en todos los motores
+def como_problema(alternativas, criterios: list = None) -> DecisionProblem:
+    if isinstance(alternativas, DecisionProblem):
+        return alternativas
+    return DecisionProblem.desde_registros(alternativas, criterios)
@@ -1,29 +1,73 @@
 # Simulación Monte Carlo
 
+import os
+import tempfile
+import warnings
+import weakref
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+from scipy.stats import qmc
+
+from distribuciones import (aplicar_copula, aplicar_distribuciones,
+                            compilar_correlaciones, compilar_distribuciones)
+from ahp_wsm import matriz_comparaciones, matriz_normalizada, muestrear_pesos_ahp, seleccionar_top_k
+from dominancia import frontera_dominancia
+from mcda import METODOS, limites_metodo, puntuar
+from modelo import como_problema
+
+# Presupuesto de elementos del tensor por bloque (≈160 MB en float64)
+MAX_ELEMENTOS_BLOQUE = 20_000_000
+
+# Tamaño de bloque con semilla propia (define la partición reproducible)
+TAM_BLOQUE_DEFECTO = 65_536
+
+# Tamaño de bloque del modo adaptativo (granularidad del criterio de parada)
+TAM_BLOQUE_ADAPTATIVO = 4096
+
+# Métodos de muestreo disponibles para las uniformes base
+METODOS_MUESTREO = ("aleatorio", "sobol", "halton", "lhs")
+
+# Incertidumbre en los pesos: alrededor de las importancias o sin preferencias
+INCERTIDUMBRE_PESOS = ("dirichlet", "simplex", "ahp")
+
+# Contenedores del histograma por alternativa (cuantiles en modo por bloques):
+# como máximo CONTENEDORES_HISTOGRAMA, y entre todas las alternativas no más de
+# PRESUPUESTO_HISTOGRAMA, porque cada tramo envía su histograma entre procesos
+CONTENEDORES_HISTOGRAMA = 8192
+PRESUPUESTO_HISTOGRAMA  = 2 ** 21
+
+# Resumen compacto que se guarda en cada resultado en lugar de los scores
+CONTENEDORES_RESUMEN = 64
+CUANTILES_RESUMEN    = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+# Niveles de confianza (%) para VaR y CVaR del score
+NIVELES_VAR = (95,)
+
+# Mínimo y máximo global de cada criterio sobre las cotas de todas las celdas
+def _extremos_soporte(inferior: np.ndarray, superior: np.ndarray) -> tuple:
+    return (np.minimum(inferior.min(axis=0), superior.min(axis=0)),
+            np.maximum(inferior.max(axis=0), superior.max(axis=0)))
+
 
 # Calcular rangos globales por criterio
 def calcular_rangos_globales(alternativas: list, criterios: list) -> dict:
-    rangos = {}
-
-    for criterio in criterios:
-        nombre = criterio['Criterio']
-        tipo   = criterio['Tipo']
-        col_min = f"{nombre}_Min"
-        col_max = f"{nombre}_Max"
-
-        todos_los_valores = []
-        for alt in alternativas:
-            todos_los_valores.append(alt[col_min])
-            todos_los_valores.append(alt[col_max])
-
-        rangos[nombre] = {
-            "min":  min(todos_los_valores),
-            "max":  max(todos_los_valores),
-            "tipo": tipo
-        }
+    """
+    Rango de normalización de cada criterio: Min/Max de todas las
+    alternativas, ampliado al soporte práctico de las distribuciones que
+    pueden salir de [Min, Max] (lognormal, empírica), para que los scores
+    simulados queden siempre en [0, 1].
+    """
+    return rangos_problema(como_problema(alternativas, criterios))
+
 
-    return rangos
+# Mismo formato que calcular_rangos_globales, desde un DecisionProblem
+def rangos_problema(problema) -> dict:
+    _, inferior, superior = compilar_distribuciones(problema)
+    g_min, g_max = (v.tolist() for v in _extremos_soporte(inferior, superior))
+    return {nombre: {"min": g_min[j], "max": g_max[j], "tipo": problema.tipos[j]}
+            for j, nombre in enumerate(problema.criterios)}
 
 
 # Normalizar un valor a escala 0-1
@@ -40,60 +84,400 @@ def normalizar_valor(valor: float,
         return (valor - minimo_global) / (maximo_global - minimo_global)
 
 
+# Compilar alternativas y criterios a matrices (alternativas × criterios)
+def _preparar_modelo(alternativas,
+                     criterios: list = None,
+                     pesos_normalizados: dict = None,
+                     rangos_globales: dict = None,
+                     muestreo: str = "aleatorio",
+                     antiteticas: bool = False,
+                     correlaciones: list = None,
+                     incertidumbre_pesos: str = None,
+                     concentracion: float = 100.0,
+                     comparaciones=None,
+                     dispersion_juicios: float = 0.2,
+                     metodo: str = "wsm",
+                     parametros_metodo: dict = None) -> dict:
+    """
+    Convierte los registros (o un DecisionProblem) a arreglos de NumPy
+    una sola vez. Sin `pesos_normalizados` se usan los del problema.
+
+    La normalización 0-1 de cada criterio es una transformación afín
+    (valor * escala + desplazamiento) sobre el rango global (ver
+    calcular_rangos_globales), así que se guarda ya resuelta:
+      - minimizar: (max - x) / (max - min)
+      - maximizar: (x - min) / (max - min)
+      - rango nulo: 0.5 constante
+
+    Las celdas con una distribución distinta de la uniforme (columna
+    'Distribucion' o '{Criterio}_Dist') se agrupan por criterio y tipo
+    para muestrearlas de forma vectorizada (ver distribuciones.py).
+
+    `correlaciones` (filas de la hoja Correlaciones) se factoriza aquí
+    con Cholesky una sola vez; cada bloque solo paga la cópula.
+
+    Con incertidumbre_pesos="ahp", `comparaciones` (filas de la hoja
+    Comparaciones o la matriz de Saaty) se arma aquí una sola vez.
+
+    `metodo` elige cómo se puntúa cada iteración (ver mcda.py).
+    """
+    if muestreo not in METODOS_MUESTREO:
+        raise ValueError(f"Método de muestreo desconocido: '{muestreo}'. "
+                         f"Opciones: {', '.join(METODOS_MUESTREO)}.")
+    if incertidumbre_pesos not in (None,) + INCERTIDUMBRE_PESOS:
+        raise ValueError(f"Incertidumbre de pesos desconocida: '{incertidumbre_pesos}'. "
+                         f"Opciones: {', '.join(INCERTIDUMBRE_PESOS)}.")
+    if concentracion <= 0:
+        raise ValueError("La concentración de los pesos debe ser mayor que cero.")
+    if incertidumbre_pesos == "ahp" and comparaciones is None:
+        raise ValueError("La incertidumbre 'ahp' requiere la matriz de comparaciones.")
+    if dispersion_juicios < 0:
+        raise ValueError("La dispersión de los juicios no puede ser negativa.")
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: '{metodo}'. Opciones: {', '.join(METODOS)}.")
+
+    problema     = como_problema(alternativas, criterios)
+    nombres_crit = problema.criterios
+    mins, maxs   = problema.mins, problema.maxs
+
+    grupos, val_inf, val_sup = compilar_distribuciones(problema)
+
+    if rangos_globales is None:
+        g_min, g_max = _extremos_soporte(val_inf, val_sup)
+        minimizar    = problema.minimizar
+    else:
+        g_min = np.array([rangos_globales[n]["min"] for n in nombres_crit], dtype=float)
+        g_max = np.array([rangos_globales[n]["max"] for n in nombres_crit], dtype=float)
+        minimizar = np.array([rangos_globales[n]["tipo"].lower() == "minimizar"
+                              for n in nombres_crit])
+
+    if pesos_normalizados is None:
+        pesos = problema.pesos
+    else:
+        pesos = np.array([pesos_normalizados[n] for n in nombres_crit], dtype=float)
+
+    rango     = g_max - g_min
+    constante = rango == 0
+    divisor   = np.where(constante, 1.0, rango)
+
+    escala         = np.where(minimizar, -1.0, 1.0) / divisor
+    desplazamiento = np.where(minimizar, g_max, -g_min) / divisor
+    escala[constante]         = 0.0
+    desplazamiento[constante] = 0.5
+
+    matriz_ahp = None
+    if incertidumbre_pesos == "ahp":
+        matriz_ahp = (np.asarray(comparaciones, dtype=float)
+                      if isinstance(comparaciones, np.ndarray)
+                      else matriz_comparaciones(comparaciones, nombres_crit))
+
+    nombres_alt = problema.nombres
+
+    return {
+        "nombres":        nombres_alt,
+        "criterios":      nombres_crit,
+        "mins":           mins,
+        "amplitud":       maxs - mins,
+        "distribuciones": grupos,
+        "val_inf":        val_inf,
+        "val_sup":        val_sup,
+        "cholesky":       compilar_correlaciones(correlaciones, nombres_alt, nombres_crit),
+        "escala":         escala,
+        "desplazamiento": desplazamiento,
+        "pesos":          pesos,
+        "incertidumbre_pesos": incertidumbre_pesos,
+        "concentracion":  concentracion,
+        "comparaciones":  matriz_ahp,
+        "dispersion_juicios": dispersion_juicios,
+        "metodo":         metodo,
+        "parametros_metodo": dict(parametros_metodo or {}),
+        "muestreo":       muestreo,
+        "antiteticas":    antiteticas
+    }
+
+
+# Uniformes base en [0, 1): tensor (iteraciones × alternativas × criterios)
+def _uniformes(modelo: dict, iteraciones: int, rng) -> np.ndarray:
+    """
+    'aleatorio' usa el generador directamente. 'sobol' y 'halton' son
+    secuencias de baja discrepancia aleatorizadas (scrambling) y 'lhs'
+    estratifica cada dimensión (Latin Hypercube). En los tres casos cada
+    par alternativa-criterio es una dimensión y el motor se siembra con
+    `rng`, así que cada bloque es una réplica independiente (RQMC).
+
+    Reducción de varianza (antiteticas): la segunda mitad del bloque es
+    1 - u de la primera, así que la iteración i y la i + ceil(n/2) forman
+    un par. Cada alternativa conserva su distribución, y con ella el
+    significado de prob_ganar.
+    """
+    forma  = (iteraciones,) + modelo["mins"].shape
+    n_base = -(-iteraciones // 2) if modelo["antiteticas"] else iteraciones
+
+    u = _uniformes_base(modelo["muestreo"], n_base, forma[1:], rng)
+
+    if modelo["antiteticas"]:
+        u = np.concatenate([u, 1.0 - u])[:iteraciones]
+    return u
+
+
+# Extraer n puntos uniformes con el método indicado
+def _uniformes_base(metodo: str, n: int, forma: tuple, rng) -> np.ndarray:
+    if metodo == "aleatorio":
+        return rng.random((n,) + forma)
+
+    dimension = int(np.prod(forma))
+    if metodo == "sobol":
+        motor = qmc.Sobol(dimension, scramble=True, seed=rng)
+    elif metodo == "halton":
+        motor = qmc.Halton(dimension, scramble=True, seed=rng)
+    else:
+        motor = qmc.LatinHypercube(dimension, seed=rng)
+
+    # Sobol solo conserva el balance con potencias de 2; el último bloque
+    # de una corrida puede no serlo y se acepta esa pequeña pérdida
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return motor.random(n).reshape((n,) + forma)
+
+
+# Muestrear valores normalizados: tensor (iteraciones × alternativas × criterios)
+def _muestrear_normalizados(modelo: dict, iteraciones: int, rng) -> np.ndarray:
+    # Una sola extracción para todas las alternativas y criterios
+    u = _uniformes(modelo, iteraciones, rng)
+    if modelo["cholesky"] is not None:
+        u = aplicar_copula(u, modelo["cholesky"])
+
+    # Uniforme en [Min, Max] y normalización, todo en el mismo buffer
+    # (con otras distribuciones `u` se necesita intacto para sus cuantiles)
+    en_sitio = not modelo["distribuciones"]
+    valores  = np.multiply(u, modelo["amplitud"], out=u if en_sitio else None)
+    valores += modelo["mins"]
+    aplicar_distribuciones(valores, u, modelo["distribuciones"])
+    valores *= modelo["escala"]
+    valores += modelo["desplazamiento"]
+    return valores
+
+
+# Pesos por iteración: matriz (iteraciones × criterios)
+def _muestrear_pesos(modelo: dict, iteraciones: int, rng) -> np.ndarray:
+    """
+    Sin incertidumbre se repiten los pesos fijos (vista sin copia).
+      - dirichlet: Dirichlet(concentracion · pesos), con media en los pesos
+        declarados; a mayor concentración, menos dispersión.
+      - simplex: uniforme sobre todos los vectores de pesos (Dirichlet(1, …, 1)),
+        para cuando no hay acuerdo sobre las preferencias.
+      - ahp: autovector de la matriz de comparaciones con cada juicio
+        perturbado (lognormal, sigma = dispersion_juicios), todo el bloque
+        resuelto en un solo lote.
+    """
+    pesos = modelo["pesos"]
+    if modelo["incertidumbre_pesos"] is None:
+        return np.broadcast_to(pesos, (iteraciones, pesos.size))
+
+    if modelo["incertidumbre_pesos"] == "ahp":
+        return muestrear_pesos_ahp(modelo["comparaciones"], iteraciones,
+                                   modelo["dispersion_juicios"], rng)
+
+    if modelo["incertidumbre_pesos"] == "dirichlet":
+        muestras = rng.standard_gamma(modelo["concentracion"] * pesos, (iteraciones, pesos.size))
+    else:
+        muestras = rng.standard_exponential((iteraciones, pesos.size))
+    return muestras / muestras.sum(axis=1, keepdims=True)
+
+
+# Scores con un vector de pesos por iteración: matriz (alternativas × iteraciones)
+def _ponderar(normalizados: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    return np.matmul(normalizados, pesos[:, :, None])[..., 0].T
+
+
+# Scores de un bloque con el método del modelo: matriz (alternativas × iteraciones)
+def _puntuar(modelo: dict, normalizados: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    if modelo["metodo"] == "wsm":
+        if pesos.ndim == 1:
+            return (normalizados @ pesos).T
+        return _ponderar(normalizados, pesos)
+    return puntuar(modelo["metodo"], normalizados, pesos, **modelo["parametros_metodo"]).T
+
+
+# Scores ponderados: matriz (alternativas × iteraciones)
+def _muestrear_scores(modelo: dict, iteraciones: int, rng) -> np.ndarray:
+    normalizados = _muestrear_normalizados(modelo, iteraciones, rng)
+    if modelo["incertidumbre_pesos"] is None:
+        return _puntuar(modelo, normalizados, modelo["pesos"])
+    return _puntuar(modelo, normalizados, _muestrear_pesos(modelo, iteraciones, rng))
+
+
+# Cotas inferior/superior del score de cada alternativa
+def _limites_scores(modelo: dict) -> tuple:
+    # Los demás métodos puntúan en una escala fija
+    if modelo["metodo"] != "wsm":
+        inferior, superior = limites_metodo(modelo["metodo"])
+        n_alt = len(modelo["nombres"])
+        return np.full(n_alt, inferior), np.full(n_alt, superior)
+
+    norm_a = modelo["val_inf"] * modelo["escala"] + modelo["desplazamiento"]
+    norm_b = modelo["val_sup"] * modelo["escala"] + modelo["desplazamiento"]
+
+    # Con pesos inciertos cualquier vértice del simplex es posible
+    if modelo["incertidumbre_pesos"] is not None:
+        return np.minimum(norm_a, norm_b).min(axis=1), np.maximum(norm_a, norm_b).max(axis=1)
+
+    inferior = np.minimum(norm_a, norm_b) @ modelo["pesos"]
+    superior = np.maximum(norm_a, norm_b) @ modelo["pesos"]
+    return inferior, superior
+
+
+# Simular TODAS las alternativas en un solo tensor
+def simular_matriz(alternativas,
+                   criterios: list = None,
+                   pesos_normalizados: dict = None,
+                   iteraciones: int = 10000,
+                   rangos_globales: dict = None,
+                   rng: np.random.Generator = None,
+                   muestreo: str = "aleatorio",
+                   correlaciones: list = None) -> np.ndarray:
+    """
+    Retorna la matriz de scores (alternativas × iteraciones),
+    en el mismo orden que `alternativas`.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    modelo = _preparar_modelo(alternativas, criterios, pesos_normalizados,
+                              rangos_globales, muestreo,
+                              correlaciones=correlaciones)
+    return _muestrear_scores(modelo, iteraciones, rng)
+
+
 # Simular UNA alternativa N veces
 def simular_alternativa(alternativa: dict,
                         criterios: list,
                         pesos_normalizados: dict,
                         rangos_globales: dict,
-                        iteraciones: int = 10000) -> list:
+                        iteraciones: int = 10000,
+                        correlaciones: list = None) -> list:
 
-    # Crear vector de scores en cero
-    scores = np.zeros(iteraciones)
+    scores = simular_matriz([alternativa], criterios, pesos_normalizados,
+                            iteraciones, rangos_globales,
+                            correlaciones=correlaciones)
+    return scores[0].tolist()
 
-    for criterio in criterios:
-        nombre  = criterio['Criterio']
-        col_min = f"{nombre}_Min"
-        col_max = f"{nombre}_Max"
+# Histograma de ancho fijo de cada fila con un solo bincount
+def _histograma_filas(matriz: np.ndarray,
+                      inferior: np.ndarray,
+                      ancho: np.ndarray,
+                      contenedores: int) -> np.ndarray:
+    n_filas = matriz.shape[0]
+    idx = ((matriz - inferior[:, None]) / ancho[:, None]).astype(np.int64)
+    np.clip(idx, 0, contenedores - 1, out=idx)
+    idx += (np.arange(n_filas) * contenedores)[:, None]
+    return np.bincount(
+        idx.ravel(), minlength=n_filas * contenedores
+    ).reshape(n_filas, contenedores)
 
-        val_min = alternativa[col_min]
-        val_max = alternativa[col_max]
 
-        min_global = rangos_globales[nombre]["min"]
-        max_global = rangos_globales[nombre]["max"]
-        tipo       = rangos_globales[nombre]["tipo"]
+# Histograma compacto para la gráfica (en lugar de todos los scores)
+def _resumen_histograma(conteos: np.ndarray, inferior: float, superior: float) -> dict:
+    return {
+        "conteos":  conteos.astype(np.int32),
+        "inferior": round(float(inferior), 4),
+        "superior": round(float(superior), 4)
+    }
+
+
+# Kernel de estadísticas para TODAS las alternativas a la vez
+def calcular_estadisticas_matriz(matriz: np.ndarray,
+                                 limites: tuple = None,
+                                 cuantiles: tuple = CUANTILES_RESUMEN,
+                                 niveles_var: tuple = NIVELES_VAR) -> dict:
+    """
+    Recibe la matriz de scores (alternativas × iteraciones) y retorna
+    arreglos con una entrada por alternativa. Todos los cuantiles, el
+    mínimo, el máximo y las colas de VaR/CVaR salen de una sola partición
+    parcial por fila (np.partition con todos los índices necesarios).
+
+    VaR al nivel α: score que se supera con probabilidad α (el percentil
+    100 - α). CVaR: score medio de las iteraciones en esa cola inferior.
+    Niveles y cuantiles se expresan en porcentaje, como np.percentile.
+    """
+    matriz = np.asarray(matriz, dtype=float)
+    n_alt, n = matriz.shape
 
-        # Generar TODOS los valores de una vez
-        valores = np.random.uniform(val_min, val_max, iteraciones)
+    # Posiciones (n-1)·q de cada cuantil pedido, incluidas las de VaR
+    niveles_var = tuple(niveles_var)
+    q_todos = np.array(tuple(cuantiles) + tuple(100 - a for a in niveles_var),
+                       dtype=float) / 100
+    posicion = (n - 1) * q_todos
+    bajo     = np.floor(posicion).astype(np.int64)
+    alto     = np.minimum(bajo + 1, n - 1)
+    fraccion = posicion - bajo
 
-        # Normalización vectorizada
-        if max_global == min_global:
-            valores_norm = np.full(iteraciones, 0.5)
-        elif tipo.lower() == "minimizar":
-            valores_norm = (max_global - valores) / (max_global - min_global)
-        else:
-            valores_norm = (valores - min_global) / (max_global - min_global)
+    # Tamaño de cada cola: las k peores iteraciones
+    colas = {a: max(int(np.ceil((100 - a) / 100 * n)), 1) for a in niveles_var}
 
-        # Acumular ponderación
-        peso = pesos_normalizados[nombre]
-        scores += peso * valores_norm
+    indices = np.unique(np.concatenate([bajo, alto, [0, n - 1],
+                                        [k - 1 for k in colas.values()]]))
+    parte = np.partition(matriz, indices, axis=1)
 
-    return scores.tolist()
+    a_bajo  = parte[:, bajo]
+    valores = a_bajo + (parte[:, alto] - a_bajo) * fraccion
+    n_q     = len(cuantiles)
 
-# Calcular estadísticas de los scores
-def calcular_estadisticas(scores: list) -> dict:
-    arr = np.array(scores)
+    media = matriz.mean(axis=1)
+
+    if limites is None:
+        inferior, superior = parte[:, 0], parte[:, n - 1]
+    else:
+        inferior, superior = (np.asarray(l, dtype=float) for l in limites)
+    ancho = np.maximum(superior - inferior, 1e-12) / CONTENEDORES_RESUMEN
+
+    return {
+        "media":      media,
+        "desviacion": np.sqrt(np.square(matriz - media[:, None]).mean(axis=1)),
+        "minimo":     parte[:, 0],
+        "maximo":     parte[:, n - 1],
+        "cuantiles":  {q: valores[:, j] for j, q in enumerate(cuantiles)},
+        "var":        {a: valores[:, n_q + j] for j, a in enumerate(niveles_var)},
+        "cvar":       {a: parte[:, :k].mean(axis=1) for a, k in colas.items()},
+        "histograma": _histograma_filas(matriz, inferior, ancho, CONTENEDORES_RESUMEN),
+        "inferior":   inferior,
+        "superior":   superior
+    }
+
+
+# Diccionario de resultados de UNA alternativa a partir del kernel
+def _estadisticas_fila(kernel: dict, i: int) -> dict:
+    cuantiles = {q: round(float(v[i]), 4) for q, v in kernel["cuantiles"].items()}
 
     return {
-        "media":        round(float(np.mean(arr)),             4),
-        "desviacion":   round(float(np.std(arr)),              4),
-        "percentil_5":  round(float(np.percentile(arr,  5)),   4),
-        "percentil_95": round(float(np.percentile(arr, 95)),   4),
-        "minimo":       round(float(np.min(arr)),              4),
-        "maximo":       round(float(np.max(arr)),              4),
-        "scores":       scores   # guardamos todos para la gráfica
+        "media":        round(float(kernel["media"][i]),      4),
+        "desviacion":   round(float(kernel["desviacion"][i]), 4),
+        "percentil_5":  round(float(kernel["cuantiles"][5][i]),  4),
+        "percentil_95": round(float(kernel["cuantiles"][95][i]), 4),
+        "minimo":       round(float(kernel["minimo"][i]),     4),
+        "maximo":       round(float(kernel["maximo"][i]),     4),
+        "cuantiles":    cuantiles,
+        "var":          {a: round(float(v[i]), 4) for a, v in kernel["var"].items()},
+        "cvar":         {a: round(float(v[i]), 4) for a, v in kernel["cvar"].items()},
+        "histograma":   _resumen_histograma(kernel["histograma"][i],
+                                            kernel["inferior"][i], kernel["superior"][i])
     }
 
 
+# Calcular estadísticas de los scores de UNA alternativa
+def calcular_estadisticas(scores, limites: tuple = None) -> dict:
+    """
+    Retorna un resumen de tamaño fijo: momentos, extremos, los cuantiles
+    de CUANTILES_RESUMEN, VaR/CVaR de NIVELES_VAR y un histograma de
+    CONTENEDORES_RESUMEN barras entre `limites` (por defecto, el mínimo y
+    máximo observados).
+    """
+    arr = np.asarray(scores, dtype=float)[None, :]
+    if limites is not None:
+        limites = ([limites[0]], [limites[1]])
+    return _estadisticas_fila(calcular_estadisticas_matriz(arr, limites), 0)
+
+
 # Clasificar nivel de riesgo
 def clasificar_riesgo(desviacion: float) -> str:
     """
@@ -110,54 +494,638 @@ def clasificar_riesgo(desviacion: float) -> str:
         return "ALTO"
 
 
+# Frecuencia con que cada fila de la matriz es la mayor
+def _victorias_matriz(matriz: np.ndarray) -> np.ndarray:
+    ganadores = np.argmax(matriz, axis=0)
+    return np.bincount(ganadores, minlength=matriz.shape[0])
+
+
 # Probabilidad de ganar por alternativa
 def calcular_prob_ganadora(scores_todas: dict) -> dict:
-    nombres     = list(scores_todas.keys())
-    matriz      = np.array(list(scores_todas.values()))
-    iteraciones = matriz.shape[1]
+    nombres = list(scores_todas.keys())
+    matriz  = np.asarray(list(scores_todas.values()))
+
+    victorias = _victorias_matriz(matriz) / matriz.shape[1]
+
+    return {nombre: round(float(victorias[i]), 4) for i, nombre in enumerate(nombres)}
+
+
+# Sumas de los pares antitéticos de un bloque: (pares, Σ s, Σ s²) por
+# alternativa, donde s = victorias del par (0, 1 o 2). Son enteras, así que
+# se fusionan sin error de redondeo y en cualquier orden
+def _sumas_pares(matriz: np.ndarray) -> tuple:
+    n_alt, n  = matriz.shape
+    m, mitad  = n // 2, -(-n // 2)
+    victorias = np.argmax(matriz, axis=0) == np.arange(n_alt)[:, None]
+    suma      = victorias[:, :m].astype(np.int64) + victorias[:, mitad:mitad + m]
+    return m, suma.sum(axis=1), np.square(suma).sum(axis=1)
+
+
+# Reducción de varianza lograda frente a muestreo independiente
+def calcular_reduccion_varianza(matriz: np.ndarray,
+                                nombres: list,
+                                bloques: list = None) -> dict:
+    """
+    Reducción de varianza del estimador de prob_ganar con variables
+    antitéticas: la media del indicador "la alternativa gana en la
+    iteración k", promediado primero dentro de cada par (dentro de cada
+    bloque de tamaño `bloques`, por defecto uno solo).
+
+    Con muestreo independiente su varianza sería p (1 - p) / n; el factor
+    es esa varianza dividida entre la observada, así que un factor de 10
+    equivale a necesitar 10 veces menos iteraciones.
+
+    Si la varianza observada es nula se usa la de un solo par distinto,
+    así que el factor es una cota inferior y nunca infinito. Una
+    alternativa que nunca gana (o siempre gana) tiene factor 1.
+
+    Retorna {"factores": {alternativa: factor},
+             "error_estandar": {alternativa: error estándar de prob_ganar}}.
+    """
+    pares, suma, cuadrados = 0, 0, 0
+    inicio = 0
+    for tam in (bloques or [matriz.shape[1]]):
+        m, s1, s2 = _sumas_pares(matriz[:, inicio:inicio + tam])
+        pares, suma, cuadrados = pares + m, suma + s1, cuadrados + s2
+        inicio += tam
+
+    return _reduccion_varianza(_victorias_matriz(matriz), matriz.shape[1],
+                               pares, suma, cuadrados, nombres)
 
-    # Índice del ganador en cada iteración
-    ganadores = np.argmax(matriz, axis=0)
 
-    probabilidades = {}
+# Factores de reducción a partir de las victorias y las sumas de los pares
+def _reduccion_varianza(victorias: np.ndarray, n: int, pares: int,
+                        suma: np.ndarray, cuadrados: np.ndarray, nombres: list) -> dict:
+    p = victorias / n
+    var_independiente = p * (1 - p) / n
+
+    # Varianza de los promedios de cada par (s / 2) y de su media
+    m           = max(pares, 1)
+    media_par   = suma / (2 * m)
+    var_par     = np.maximum(cuadrados / (4 * m) - np.square(media_par), 0.0)
+    var_observada = np.maximum(var_par / m, 0.25 / m ** 2)
+
+    factores, errores = {}, {}
+    for i, nombre in enumerate(nombres):
+        sin_varianza = var_independiente[i] == 0
+        factores[nombre] = 1.0 if sin_varianza else round(float(var_independiente[i] /
+                                                                var_observada[i]), 2)
+        errores[nombre]  = round(float(0.0 if sin_varianza else np.sqrt(var_observada[i])), 6)
+
+    return {"factores": factores, "error_estandar": errores}
+
+
+# Contenedores por alternativa según el presupuesto total del histograma
+def contenedores_histograma(n_alt: int) -> int:
+    """
+    Múltiplo de CONTENEDORES_RESUMEN (para que el resumen compacto reagrupe
+    contenedores enteros) entre CONTENEDORES_RESUMEN y CONTENEDORES_HISTOGRAMA.
+    """
+    por_alternativa = PRESUPUESTO_HISTOGRAMA // max(n_alt, 1)
+    por_alternativa = por_alternativa // CONTENEDORES_RESUMEN * CONTENEDORES_RESUMEN
+    return int(np.clip(por_alternativa, CONTENEDORES_RESUMEN, CONTENEDORES_HISTOGRAMA))
+
+
+# Estadísticas en línea para simular por bloques con memoria constante
+class AcumuladorEstadisticas:
+    """
+    Acumula media/varianza (Welford-Chan), mínimo, máximo, victorias y un
+    histograma de ancho fijo por alternativa. Cada bloque se descarta después
+    de `actualizar`, así que la memoria no depende del número de iteraciones.
+    Los percentiles se interpolan dentro del contenedor del histograma.
+    Sin `contenedores`, su número sale de contenedores_histograma(n_alt).
+    Con `antiteticas` también suma los pares de cada bloque (ver
+    calcular_reduccion_varianza y `reduccion_varianza`).
+    """
+
+    def __init__(self, limite_inferior, limite_superior,
+                 contenedores: int = None, antiteticas: bool = False):
+        inferior = np.asarray(limite_inferior, dtype=float)
+        superior = np.asarray(limite_superior, dtype=float)
+        n_alt    = inferior.shape[0]
+
+        if contenedores is None:
+            contenedores = contenedores_histograma(n_alt)
+        if contenedores < 1:
+            raise ValueError("contenedores debe ser al menos 1")
+
+        # Evitar contenedores de ancho cero si el score es constante
+        superior = np.where(superior > inferior, superior, inferior + 1e-12)
+
+        self.contenedores = contenedores
+        self.antiteticas  = antiteticas
+        self.n_alt        = n_alt
+        self.inferior     = inferior
+        self.superior     = superior
+        self.ancho        = (superior - inferior) / contenedores
+
+        self.n          = 0
+        self.media      = np.zeros(n_alt)
+        self.m2         = np.zeros(n_alt)
+        self.minimo     = np.full(n_alt, np.inf)
+        self.maximo     = np.full(n_alt, -np.inf)
+        self.victorias  = np.zeros(n_alt, dtype=np.int64)
+        self.histograma = np.zeros((n_alt, contenedores), dtype=np.int64)
+
+        self.pares           = 0
+        self.suma_pares      = np.zeros(n_alt, dtype=np.int64)
+        self.cuadrados_pares = np.zeros(n_alt, dtype=np.int64)
+
+    def actualizar(self, matriz: np.ndarray):
+        """Incorpora un bloque de scores (alternativas × iteraciones)."""
+        n_alt, n_bloque = matriz.shape
+        if n_bloque == 0:
+            return
+
+        self._combinar_momentos(n_bloque, *_momentos_bloque(matriz))
+        self._actualizar_conteos(matriz)
+
+    def _actualizar_conteos(self, matriz: np.ndarray):
+        """Mínimo, máximo, victorias, histograma y pares (todo exacto y conmutativo)."""
+        np.minimum(self.minimo, matriz.min(axis=1), out=self.minimo)
+        np.maximum(self.maximo, matriz.max(axis=1), out=self.maximo)
+        self.victorias  += _victorias_matriz(matriz)
+        self.histograma += _histograma_filas(matriz, self.inferior, self.ancho,
+                                             self.contenedores)
+        if self.antiteticas:
+            m, suma, cuadrados = _sumas_pares(matriz)
+            self.pares           += m
+            self.suma_pares      += suma
+            self.cuadrados_pares += cuadrados
+
+    def combinar(self, otro: "AcumuladorEstadisticas"):
+        """Fusiona otro acumulador con los mismos límites de histograma."""
+        if otro.n == 0:
+            return
+        self._combinar_momentos(otro.n, otro.media, otro.m2)
+        self._combinar_conteos(otro)
+
+    def _combinar_conteos(self, otro: "AcumuladorEstadisticas"):
+        np.minimum(self.minimo, otro.minimo, out=self.minimo)
+        np.maximum(self.maximo, otro.maximo, out=self.maximo)
+        self.victorias  += otro.victorias
+        self.histograma += otro.histograma
+        self.pares           += otro.pares
+        self.suma_pares      += otro.suma_pares
+        self.cuadrados_pares += otro.cuadrados_pares
+
+    def _combinar_momentos(self, n_b: int, media_b: np.ndarray, m2_b: np.ndarray):
+        n_total = self.n + n_b
+        delta   = media_b - self.media
+        self.media = self.media + delta * (n_b / n_total)
+        self.m2    = self.m2 + m2_b + np.square(delta) * (self.n * n_b / n_total)
+        self.n     = n_total
+
+    def desviacion(self) -> np.ndarray:
+        return np.sqrt(self.m2 / self.n)
+
+    def percentil(self, q: float) -> np.ndarray:
+        """Percentil aproximado (0-100) para cada alternativa."""
+        acumulado = np.cumsum(self.histograma, axis=1)
+        objetivo  = q / 100 * self.n
+
+        # Primer contenedor cuyo acumulado alcanza el objetivo
+        k = np.minimum((acumulado < objetivo).sum(axis=1), self.contenedores - 1)
+        filas    = np.arange(k.shape[0])
+        previo   = np.where(k > 0, acumulado[filas, k - 1], 0)
+        en_bin   = np.maximum(self.histograma[filas, k], 1)
+        fraccion = np.clip((objetivo - previo) / en_bin, 0.0, 1.0)
+
+        valor = self.inferior + (k + fraccion) * self.ancho
+        return np.clip(valor, self.minimo, self.maximo)
+
+    def cvar(self, nivel: float) -> np.ndarray:
+        """Media aproximada del (100 - nivel)% inferior, por alternativa."""
+        objetivo  = max((100 - nivel) / 100 * self.n, 1)
+        acumulado = np.cumsum(self.histograma, axis=1)
+        centros   = self.inferior[:, None] + (np.arange(self.contenedores) + 0.5) * self.ancho[:, None]
+
+        # Contenedores completos dentro de la cola + la fracción del último
+        previo  = np.concatenate([np.zeros((self.n_alt, 1)), acumulado[:, :-1]], axis=1)
+        en_cola = np.clip(objetivo - previo, 0, self.histograma)
+        return np.clip((en_cola * centros).sum(axis=1) / objetivo, self.minimo, self.maximo)
+
+    def reduccion_varianza(self, nombres: list) -> dict:
+        """Como calcular_reduccion_varianza, con los pares de todos los bloques."""
+        if not self.antiteticas:
+            raise ValueError("La reducción de varianza requiere variables antitéticas.")
+        return _reduccion_varianza(self.victorias, self.n, self.pares,
+                                   self.suma_pares, self.cuadrados_pares, nombres)
+
+    def histograma_compacto(self, contenedores: int = CONTENEDORES_RESUMEN) -> np.ndarray:
+        """Reagrupa el histograma fino en `contenedores` barras."""
+        cortes = np.linspace(0, self.contenedores, contenedores + 1).astype(int)[:-1]
+        return np.add.reduceat(self.histograma, cortes, axis=1)
+
+
+# Media y suma de cuadrados centrada de un bloque
+def _momentos_bloque(matriz: np.ndarray) -> tuple:
+    media = matriz.mean(axis=1)
+    m2    = np.square(matriz - media[:, None]).sum(axis=1)
+    return media, m2
+
+
+# Partición de las iteraciones en bloques, cada uno con su propia semilla
+def _semillas_bloques(raiz: np.random.SeedSequence,
+                      iteraciones: int,
+                      tam_bloque: int) -> list:
+    """
+    Los bloques y sus SeedSequence hijas dependen solo de la semilla,
+    las iteraciones y el tamaño de bloque, nunca del número de procesos;
+    por eso el resultado es idéntico con 1 o con N trabajadores.
+    Llamadas sucesivas con la misma raíz continúan la secuencia de hijas.
+    """
+    n_bloques = -(-iteraciones // tam_bloque)
+    hijas     = raiz.spawn(n_bloques)
+    return [(min(tam_bloque, iteraciones - i * tam_bloque), hija)
+            for i, hija in enumerate(hijas)]
+
+
+# Modelo compartido por los procesos trabajadores (se envía una sola vez)
+_MODELO_TRABAJADOR = None
+
+
+def _iniciar_trabajador(modelo: dict):
+    global _MODELO_TRABAJADOR
+    _MODELO_TRABAJADOR = modelo
+
+
+# Scores de un tramo de bloques consecutivos
+def _scores_tramo(tramo: list, modelo: dict = None) -> list:
+    modelo = modelo if modelo is not None else _MODELO_TRABAJADOR
+    return [_muestrear_scores(modelo, n, np.random.default_rng(semilla))
+            for n, semilla in tramo]
+
+
+# Estadísticas parciales de un tramo; los momentos se devuelven por bloque
+# para fusionarlos siempre en el mismo orden
+def _acumular_tramo(tramo: list, modelo: dict = None) -> tuple:
+    modelo  = modelo if modelo is not None else _MODELO_TRABAJADOR
+    parcial = AcumuladorEstadisticas(*_limites_scores(modelo),
+                                     antiteticas=modelo["antiteticas"])
+
+    momentos = []
+    for n, semilla in tramo:
+        matriz = _muestrear_scores(modelo, n, np.random.default_rng(semilla))
+        momentos.append((n,) + _momentos_bloque(matriz))
+        parcial._actualizar_conteos(matriz)
+
+    return parcial, momentos
+
+
+# Ejecutar una función por tramo, en este proceso o en un pool
+def _ejecutar_tramos(funcion, modelo: dict, bloques: list, procesos: int):
+    """Genera los resultados de cada tramo en el orden de los bloques."""
+    n_tramos = min(len(bloques), max(procesos, 1) * 4)
+    cortes   = np.linspace(0, len(bloques), n_tramos + 1).astype(int)
+    tramos   = [bloques[a:b] for a, b in zip(cortes[:-1], cortes[1:])]
+
+    if procesos <= 1:
+        for tramo in tramos:
+            yield funcion(tramo, modelo)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos,
+                             initializer=_iniciar_trabajador,
+                             initargs=(modelo,)) as ejecutor:
+        yield from ejecutor.map(funcion, tramos)
+
+
+# Simular por bloques sin guardar la matriz completa
+def _simular_por_bloques(modelo: dict, bloques: list, procesos: int) -> AcumuladorEstadisticas:
+    acumulador = AcumuladorEstadisticas(*_limites_scores(modelo),
+                                        antiteticas=modelo["antiteticas"])
+
+    for parcial, momentos in _ejecutar_tramos(_acumular_tramo, modelo, bloques, procesos):
+        for n, media_b, m2_b in momentos:
+            acumulador._combinar_momentos(n, media_b, m2_b)
+        acumulador._combinar_conteos(parcial)
+
+    return acumulador
+
+
+# Simular la matriz completa (alternativas × iteraciones) por bloques
+def _simular_matriz_bloques(modelo: dict, bloques: list, procesos: int) -> np.ndarray:
+    partes = []
+    for matrices in _ejecutar_tramos(_scores_tramo, modelo, bloques, procesos):
+        partes.extend(matrices)
+    return np.concatenate(partes, axis=1)
+
+
+# Semiamplitud máxima de los intervalos de confianza de media y prob_ganar
+def _semiamplitud_maxima(acumulador: AcumuladorEstadisticas, z: float) -> float:
+    n = acumulador.n
+
+    # Media: aproximación normal con la desviación muestral
+    semi_media = z * acumulador.desviacion() / np.sqrt(n)
+
+    # Proporción: Agresti-Coull, no colapsa a cero cuando p = 0 o p = 1
+    n_ajustado = n + z ** 2
+    p_ajustada = (acumulador.victorias + z ** 2 / 2) / n_ajustado
+    semi_prob  = z * np.sqrt(p_ajustada * (1 - p_ajustada) / n_ajustado)
+
+    return float(max(semi_media.max(), semi_prob.max()))
+
+
+# Simular por rondas crecientes hasta que los intervalos converjan
+def _simular_adaptativo(modelo: dict,
+                        max_iteraciones: int,
+                        tam_bloque: int,
+                        raiz: np.random.SeedSequence,
+                        procesos: int,
+                        tolerancia: float,
+                        confianza: float) -> tuple:
+    """
+    Cada ronda duplica el número de bloques de la anterior. Las rondas se
+    fusionan en orden, así que el resultado sigue sin depender de `procesos`.
+    Retorna (acumulador, convergio).
+    """
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+
+    acumulador    = AcumuladorEstadisticas(*_limites_scores(modelo),
+                                           antiteticas=modelo["antiteticas"])
+    bloques_ronda = 1
+
+    while acumulador.n < max_iteraciones:
+        n_ronda = min(bloques_ronda * tam_bloque, max_iteraciones - acumulador.n)
+        bloques = _semillas_bloques(raiz, n_ronda, tam_bloque)
+        acumulador.combinar(_simular_por_bloques(modelo, bloques, procesos))
+
+        if _semiamplitud_maxima(acumulador, z) <= tolerancia:
+            return acumulador, True
+        bloques_ronda *= 2
+
+    return acumulador, False
+
+
+# Resultados por alternativa a partir de un acumulador
+def _resultados_acumulador(acumulador: AcumuladorEstadisticas,
+                           nombres: list,
+                           niveles_var: tuple = NIVELES_VAR) -> dict:
+    desviacion = acumulador.desviacion()
+    cuantiles  = {q: acumulador.percentil(q) for q in CUANTILES_RESUMEN}
+    var        = {a: acumulador.percentil(100 - a) for a in niveles_var}
+    cvar       = {a: acumulador.cvar(a) for a in niveles_var}
+    histograma = acumulador.histograma_compacto()
+    prob       = acumulador.victorias / acumulador.n
+
+    resultados = {}
     for i, nombre in enumerate(nombres):
-        veces = np.sum(ganadores == i)
-        probabilidades[nombre] = round(float(veces / iteraciones), 4)
+        stats = {
+            "media":        round(float(acumulador.media[i]),  4),
+            "desviacion":   round(float(desviacion[i]),        4),
+            "percentil_5":  round(float(cuantiles[5][i]),      4),
+            "percentil_95": round(float(cuantiles[95][i]),     4),
+            "minimo":       round(float(acumulador.minimo[i]), 4),
+            "maximo":       round(float(acumulador.maximo[i]), 4),
+            "cuantiles":    {q: round(float(v[i]), 4) for q, v in cuantiles.items()},
+            "var":          {a: round(float(v[i]), 4) for a, v in var.items()},
+            "cvar":         {a: round(float(v[i]), 4) for a, v in cvar.items()},
+            "histograma":   _resumen_histograma(histograma[i], acumulador.inferior[i],
+                                                acumulador.superior[i])
+        }
+        stats["riesgo"]     = clasificar_riesgo(stats["desviacion"])
+        stats["prob_ganar"] = round(float(prob[i]), 4)
+        resultados[nombre]  = stats
+
+    return resultados
+
+
+# Copia float32 de la matriz de scores, en memoria o mapeada a disco
+def _borrar_archivo(ruta: str):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+def _guardar_muestras(matriz: np.ndarray, destino: str, archivo: str = None) -> np.ndarray:
+    """
+    "disco": con `archivo` el memmap se escribe ahí y el archivo es del
+    llamador. Sin él se usa un temporal que se borra solo cuando se libera
+    el último arreglo que lo mapea (o al salir del intérprete).
+    """
+    if destino == "memoria":
+        return matriz.astype(np.float32)
 
-    return probabilidades
+    temporal = archivo is None
+    if temporal:
+        fd, archivo = tempfile.mkstemp(prefix="montecarlo_", suffix=".f32")
+        os.close(fd)
+    mapa = np.memmap(archivo, dtype=np.float32, mode="w+", shape=matriz.shape)
+    mapa[:] = matriz
+    mapa.flush()
+    if temporal:
+        # El mapeo vive mientras quede alguna fila de "muestras"; al cerrarse se borra
+        weakref.finalize(mapa._mmap, _borrar_archivo, archivo)
+    return mapa
+
+
+# Alternativas que llegan a la simulación con filtrar_dominadas / top_k
+def seleccionar_finalistas(problema,
+                           pesos_normalizados: dict = None,
+                           filtrar_dominadas: bool = False,
+                           top_k: int = None) -> tuple:
+    """
+    Retorna (índices en el orden original, extra), donde extra lleva
+    "dominadas" y/o "finalistas" (en orden de score) como en simular_todas.
+    """
+    extra   = {}
+    indices = np.arange(problema.n_alternativas)
+    if filtrar_dominadas:
+        filtro  = frontera_dominancia(problema)
+        indices = np.asarray(filtro["no_dominadas"], dtype=int)
+        extra["dominadas"] = filtro["dominadas"]
+    if top_k is not None:
+        _, nombres_crit, X, pesos = matriz_normalizada(problema)
+        if pesos_normalizados is not None:
+            pesos = np.array([pesos_normalizados[n] for n in nombres_crit], dtype=float)
+        scores  = np.round(X[indices] @ pesos, 4)
+        indices = indices[seleccionar_top_k(scores, top_k)]
+        extra["finalistas"] = [problema.nombres[i] for i in indices]
+    return np.sort(indices), extra
 
 
 # FUNCIÓN PRINCIPAL — Simular TODAS las alternativas
-def simular_todas(alternativas: list,
-                  criterios: list,
-                  pesos_normalizados: dict,
-                  iteraciones: int = 10000) -> dict:
-    # Calcular rangos globales para normalización
-    rangos_globales = calcular_rangos_globales(alternativas, criterios)
+def simular_todas(alternativas,
+                  criterios: list = None,
+                  pesos_normalizados: dict = None,
+                  iteraciones: int = 10000,
+                  tam_bloque: int = None,
+                  semilla: int = None,
+                  procesos: int = 1,
+                  tolerancia: float = None,
+                  confianza: float = 0.95,
+                  muestreo: str = "aleatorio",
+                  antiteticas: bool = False,
+                  muestras: str = None,
+                  archivo_muestras: str = None,
+                  niveles_var: tuple = NIVELES_VAR,
+                  correlaciones: list = None,
+                  incertidumbre_pesos: str = None,
+                  concentracion: float = 100.0,
+                  comparaciones=None,
+                  dispersion_juicios: float = 0.2,
+                  metodo: str = "wsm",
+                  parametros_metodo: dict = None,
+                  filtrar_dominadas: bool = False,
+                  top_k: int = None) -> dict:
+    """
+    Acepta registros (alternativas, criterios, pesos) o un DecisionProblem
+    como primer argumento; sin `pesos_normalizados` se usan sus pesos.
+
+    Cada resultado guarda un resumen compacto ("cuantiles" e "histograma")
+    en lugar de todos los scores simulados.
+
+    tam_bloque: si se indica, simula por bloques de ese tamaño con
+    estadísticas en línea (memoria constante).
+    Si es None, se usa la matriz completa mientras quepa en
+    MAX_ELEMENTOS_BLOQUE y por bloques en caso contrario.
+
+    semilla: hace la simulación reproducible. Cada bloque recibe una
+    SeedSequence hija, así que el resultado es el mismo para cualquier
+    valor de `procesos` (None = todos los núcleos).
+
+    tolerancia: activa el modo adaptativo. Se simula por rondas hasta que
+    la semiamplitud de los intervalos de confianza (nivel `confianza`) de
+    prob_ganar y de la media de cada alternativa sea <= tolerancia;
+    `iteraciones` pasa a ser el máximo. El resultado incluye siempre
+    "iteraciones" (las realmente usadas) y, en este modo, "convergencia".
+
+    muestreo: "aleatorio" (por defecto), "sobol", "halton" o "lhs".
+
+    antiteticas: variables antitéticas (pares u, 1 - u). El resultado
+    incluye "reduccion_varianza" en todos los modos (ver
+    calcular_reduccion_varianza).
+
+    muestras: conservar los scores crudos en float32 bajo la clave
+    "muestras" de cada resultado: "memoria" (arreglo) o "disco" (np.memmap).
+    Solo en modo matriz. Con `archivo_muestras` el memmap se escribe en esa
+    ruta y borrarlo queda a cargo del llamador; sin ella se usa un archivo
+    temporal que se borra al liberar el último resultado que lo usa.
+
+    niveles_var: niveles (%) de VaR y CVaR del score que se reportan
+    en "var" y "cvar" de cada alternativa.
+
+    correlaciones: filas {'Criterio A', 'Criterio B', 'Correlacion'[,
+    'Alternativa']} que correlacionan los criterios mediante una cópula
+    gaussiana (ver leer_correlaciones en excel_reader).
 
-    scores_todas = {}
-    resultados   = {}
+    incertidumbre_pesos: None (pesos fijos), "dirichlet" (pesos alrededor
+    de las importancias, con dispersión controlada por `concentracion`) o
+    "simplex" (cualquier vector de pesos) o "ahp" (juicios de
+    `comparaciones` perturbados con dispersión `dispersion_juicios` en
+    escala log). Cada iteración usa un vector de pesos común a todas las
+    alternativas.
 
-    print(f"\nEjecutando {iteraciones:,} simulaciones por alternativa...")
+    metodo: "wsm" (suma ponderada, por defecto), "topsis", "vikor" o
+    "promethee". Todas las estadísticas (prob_ganar, cuantiles, VaR) se
+    calculan sobre el score del método; `parametros_metodo` ajusta sus
+    umbrales (v de VIKOR, indiferencia/preferencia de PROMETHEE).
 
-    for alt in alternativas:
-        nombre = alt['Alternativa']
-        print(f"   Simulando: {nombre}...")
+    filtrar_dominadas: no simular las alternativas dominadas por intervalos
+    (ver dominancia.py), que nunca pueden ganar. Las demás se normalizan con
+    los rangos de todas, así que con "wsm" sus resultados no cambian salvo
+    por el flujo aleatorio; los métodos relativos (TOPSIS, VIKOR,
+    PROMETHEE) se calculan sobre las que quedan. El resultado incluye
+    "dominadas": {alternativa: alternativa que la domina}.
 
-        scores = simular_alternativa(
-            alt, criterios, pesos_normalizados,
-            rangos_globales, iteraciones
+    top_k: simular solo las k mejores según el score determinista del WSM
+    (ver rankear_alternativas), también con los rangos de todas. Para
+    catálogos muy grandes: prob_ganar se calcula entre las finalistas,
+    listadas en "finalistas" del resultado.
+    """
+    if muestras not in (None, "memoria", "disco"):
+        raise ValueError("muestras debe ser None, 'memoria' o 'disco'.")
+
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+
+    # Descartar las que nunca pueden ganar y quedarse con las finalistas,
+    # normalizando siempre con los rangos de todas
+    extra  = {}
+    rangos = None
+    if filtrar_dominadas or top_k is not None:
+        problema = como_problema(alternativas, criterios)
+        indices, extra = seleccionar_finalistas(problema, pesos_normalizados,
+                                                filtrar_dominadas, top_k)
+        if indices.size < problema.n_alternativas:
+            rangos = rangos_problema(problema)
+            alternativas, criterios = problema.subconjunto(indices), None
+
+    # Compilar el problema una sola vez (incluye rangos globales)
+    modelo  = _preparar_modelo(alternativas, criterios, pesos_normalizados,
+                               rangos_globales=rangos, muestreo=muestreo,
+                               antiteticas=antiteticas, correlaciones=correlaciones,
+                               incertidumbre_pesos=incertidumbre_pesos,
+                               concentracion=concentracion,
+                               comparaciones=comparaciones,
+                               dispersion_juicios=dispersion_juicios,
+                               metodo=metodo, parametros_metodo=parametros_metodo)
+    nombres = modelo["nombres"]
+
+    elementos_iteracion = max(modelo["mins"].size, 1)
+    max_bloque = max(MAX_ELEMENTOS_BLOQUE // elementos_iteracion, 1)
+    en_bloques = (tam_bloque is not None
+                  or iteraciones * elementos_iteracion > MAX_ELEMENTOS_BLOQUE)
+    if muestras is not None and (en_bloques or tolerancia is not None):
+        raise ValueError("Las muestras crudas solo se conservan en modo matriz.")
+    if tam_bloque is None:
+        defecto    = TAM_BLOQUE_DEFECTO if tolerancia is None else TAM_BLOQUE_ADAPTATIVO
+        tam_bloque = min(defecto, max_bloque)
+
+    raiz  = np.random.SeedSequence(semilla)
+
+    if tolerancia is not None:
+        print(f"\nSimulando hasta tolerancia ±{tolerancia} (máx. {iteraciones:,} iteraciones)...")
+        acumulador, convergio = _simular_adaptativo(
+            modelo, iteraciones, tam_bloque, raiz, procesos, tolerancia, confianza
         )
+        resultados  = _resultados_acumulador(acumulador, nombres, niveles_var)
+        iteraciones = acumulador.n
+        extra["convergencia"] = convergio
+        if antiteticas:
+            extra["reduccion_varianza"] = acumulador.reduccion_varianza(nombres)
+        print(f"Iteraciones usadas: {iteraciones:,}")
+
+    elif en_bloques:
+        print(f"\nEjecutando {iteraciones:,} simulaciones por alternativa...")
+        bloques    = _semillas_bloques(raiz, iteraciones, tam_bloque)
+        acumulador = _simular_por_bloques(modelo, bloques, procesos)
+        resultados = _resultados_acumulador(acumulador, nombres, niveles_var)
+        if antiteticas:
+            extra["reduccion_varianza"] = acumulador.reduccion_varianza(nombres)
+    else:
+        print(f"\nEjecutando {iteraciones:,} simulaciones por alternativa...")
+        bloques = _semillas_bloques(raiz, iteraciones, tam_bloque)
+
+        # Matriz (alternativas × iteraciones), sin pasar por listas
+        matriz = _simular_matriz_bloques(modelo, bloques, procesos)
+
+        # Todas las estadísticas de todas las alternativas en un solo paso
+        kernel = calcular_estadisticas_matriz(matriz, _limites_scores(modelo),
+                                              niveles_var=niveles_var)
+
+        resultados = {}
+        for i, nombre in enumerate(nombres):
+            stats           = _estadisticas_fila(kernel, i)
+            stats["riesgo"] = clasificar_riesgo(stats["desviacion"])
+            resultados[nombre] = stats
+
+        # Probabilidad de ganar de cada alternativa
+        victorias = _victorias_matriz(matriz) / iteraciones
+        for i, nombre in enumerate(nombres):
+            resultados[nombre]["prob_ganar"] = round(float(victorias[i]), 4)
 
-        scores_todas[nombre]    = scores
-        stats                   = calcular_estadisticas(scores)
-        stats["riesgo"]         = clasificar_riesgo(stats["desviacion"])
-        resultados[nombre]      = stats
+        if antiteticas:
+            extra["reduccion_varianza"] = calcular_reduccion_varianza(
+                matriz, nombres, [tam for tam, _ in bloques]
+            )
 
-    # Probabilidad de ganar de cada alternativa
-    probs = calcular_prob_ganadora(scores_todas)
-    for nombre in resultados:
-        resultados[nombre]["prob_ganar"] = probs[nombre]
+        if muestras is not None:
+            crudas = _guardar_muestras(matriz, muestras, archivo_muestras)
+            for i, nombre in enumerate(nombres):
+                resultados[nombre]["muestras"] = crudas[i]
 
     # Ganador = mayor media
     ganador = max(resultados, key=lambda x: resultados[x]["media"])
@@ -166,8 +1134,10 @@ def simular_todas(alternativas: list,
     print(f"Ganador Monte Carlo: {ganador}")
 
     return {
-        "ganador":    ganador,
-        "resultados": resultados
+        "ganador":     ganador,
+        "resultados":  resultados,
+        "iteraciones": iteraciones,
+        **extra
     }
 
 # PRUEBA
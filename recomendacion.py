@@ -65,6 +65,54 @@ def generar_advertencias(resultados_mc):
     
     return "\n\n".join(advertencias)
 
+def generar_estabilidad(estabilidad):
+    """
+    Explica cuánto puede cambiar el peso de cada criterio sin que cambie el ganador.
+    """
+    ganador = estabilidad['ganador']
+    lineas = []
+
+    for criterio, datos in estabilidad['criterios'].items():
+        linea = (f"- **{criterio}** (peso actual {datos['peso']*100:.1f}%): {ganador} sigue siendo "
+                 f"la mejor opción con pesos entre {datos['minimo']*100:.1f}% y {datos['maximo']*100:.1f}%.")
+        # Un margen menor a 5 puntos es una decisión frágil frente a ese criterio;
+        # un lado sin rival no tiene cruce, así que no cuenta como margen
+        margenes = []
+        if datos['rival_minimo'] is not None:
+            margenes.append((datos['peso'] - datos['minimo'], datos['rival_minimo']))
+        if datos['rival_maximo'] is not None:
+            margenes.append((datos['maximo'] - datos['peso'], datos['rival_maximo']))
+        if margenes:
+            margen, rival = min(margenes, key=lambda m: m[0])
+            if margen < 0.05:
+                linea += f" ⚠️ Margen estrecho: un pequeño cambio favorecería a {rival}."
+        lineas.append(linea)
+
+    return "\n".join(lineas)
+
+def generar_consistencia(consistencia):
+    """
+    Resume la consistencia de la matriz de comparaciones (índice de Saaty).
+    """
+    texto = (f"Razón de consistencia (CR): {consistencia['cr']:.3f} "
+             f"(CI = {consistencia['ci']:.3f}, λmax = {consistencia['lambda_max']:.3f}).")
+    if consistencia['consistente']:
+        texto += " Los juicios son consistentes (CR ≤ 0.10)."
+    else:
+        texto += (" ⚠️ Los juicios son inconsistentes (CR > 0.10): conviene revisar "
+                  "las comparaciones antes de confiar en los pesos.")
+    return texto
+
+def generar_dominadas(dominadas):
+    """
+    Lista las alternativas descartadas antes de simular y quién las domina.
+    """
+    lineas = [f"Se descartaron {len(dominadas)} alternativas: en el peor caso de la dominante "
+              "siguen siendo peores en todos los criterios, así que no pueden ganar."]
+    for nombre, dominante in dominadas.items():
+        lineas.append(f"- **{nombre}**: dominada por {dominante}.")
+    return "\n".join(lineas)
+
 def generar_tabla_resumen(resultados_ahp_lista, resultados_mc):
     """
     Crea una tabla final con toda la información condensada.
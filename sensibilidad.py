@@ -0,0 +1,210 @@
+# Análisis de sensibilidad de los pesos en el ranking WSM
+
+import numpy as np
+
+from ahp_wsm import matriz_normalizada
+
+
+# Parte del score que no depende del criterio j, con los demás pesos reescalados
+def _restos(X: np.ndarray, pesos: np.ndarray) -> np.ndarray:
+    """
+    Al fijar el peso del criterio j en t, los demás se reescalan para
+    seguir sumando 1 conservando sus proporciones, así que el score es
+    lineal en t:
+        S(t) = t · X[:, j] + (1 - t) · R[:, j]
+        R[:, j] = (X @ pesos - pesos[j] · X[:, j]) / (1 - pesos[j])
+    Retorna R (alternativas × criterios) para todos los criterios a la vez.
+    Si un criterio tiene todo el peso, los demás se reparten por igual.
+    """
+    n_crit = X.shape[1]
+    otros  = 1 - pesos
+    restos = (X @ pesos)[:, None] - X * pesos
+
+    unico = otros <= 1e-12
+    restos[:, ~unico] /= otros[~unico]
+    if unico.any():
+        iguales = (X.sum(axis=1, keepdims=True) - X) / max(n_crit - 1, 1)
+        restos[:, unico] = iguales[:, unico]
+    return restos
+
+
+# Posición (1 = primera) de cada alternativa en cada fila de scores
+def _posiciones(scores: np.ndarray) -> np.ndarray:
+    orden      = np.argsort(-scores, axis=-1, kind="stable")
+    posiciones = np.empty_like(orden)
+    np.put_along_axis(posiciones, orden, np.arange(1, scores.shape[-1] + 1)
+                      * np.ones_like(orden), axis=-1)
+    return posiciones
+
+
+# Barrido del peso de cada criterio sobre una rejilla
+def barrido_pesos(alternativas, criterios: list = None, puntos: int = 101) -> dict:
+    """
+    Evalúa cada punto de la rejilla [0, 1] de cada criterio con un solo
+    producto exterior (puntos × alternativas) por criterio. Como el resto
+    de este módulo, acepta registros o un DecisionProblem.
+
+    Retorna:
+      - "pesos": la rejilla;
+      - "pesos_actuales": {criterio: peso};
+      - "ganadores": {criterio: [ganador en cada punto]};
+      - "inversiones": cada cambio de orden entre dos alternativas, en
+        cualquier lugar del ranking ({criterio, peso, antes, despues,
+        posiciones_antes, posiciones_despues}). "antes" va delante hasta
+        el peso exacto del cruce y "despues" desde ahí; las posiciones
+        (1 = primera) de ambas son las de los puntos de la rejilla que
+        rodean el cruce. Como el score es lineal en el peso, cada par se
+        cruza a lo sumo una vez por criterio.
+    """
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    restos = _restos(X, pesos)
+    t      = np.linspace(0.0, 1.0, puntos)
+
+    ganadores   = {}
+    inversiones = []
+    for j, criterio in enumerate(nombres_crit):
+        scores     = np.outer(t, X[:, j]) + np.outer(1 - t, restos[:, j])
+        posiciones = _posiciones(scores)                       # (puntos × alternativas)
+        ganadores[criterio] = [nombres[i] for i in scores.argmax(axis=1)]
+
+        # Pares (a delante de b al inicio) cuyo orden es otro al final de la rejilla
+        inicio, fin = posiciones[0], posiciones[-1]
+        a, b = np.nonzero((inicio[:, None] < inicio[None, :]) & (fin[:, None] > fin[None, :]))
+        if a.size == 0:
+            continue
+
+        # Último punto de la rejilla con a todavía delante
+        delante = posiciones[:, a] < posiciones[:, b]          # (puntos × pares)
+        k       = np.argmin(delante, axis=0) - 1
+
+        # Cruce exacto de las dos rectas: R_ab + t (X_ab - R_ab) = 0
+        d_resto = restos[a, j] - restos[b, j]
+        d_crit  = X[a, j] - X[b, j]
+        divisor = np.where(d_resto != d_crit, d_resto - d_crit, 1.0)
+        cruce   = np.where(d_resto != d_crit, d_resto / divisor, t[k + 1])
+        cruce   = np.clip(cruce, t[k], t[k + 1])
+
+        for m in np.argsort(cruce, kind="stable"):
+            ia, ib, km = a[m], b[m], k[m]
+            inversiones.append({
+                "criterio": criterio,
+                "peso":     float(cruce[m]),
+                "antes":    nombres[ia],
+                "despues":  nombres[ib],
+                "posiciones_antes":   {nombres[ia]: int(posiciones[km, ia]),
+                                       nombres[ib]: int(posiciones[km, ib])},
+                "posiciones_despues": {nombres[ia]: int(posiciones[km + 1, ia]),
+                                       nombres[ib]: int(posiciones[km + 1, ib])}
+            })
+
+    return {
+        "pesos":          t.tolist(),
+        "pesos_actuales": dict(zip(nombres_crit, pesos.tolist())),
+        "ganadores":      ganadores,
+        "inversiones":    inversiones
+    }
+
+
+# Índice de la alternativa analizada (por defecto, la ganadora actual)
+def _indice_alternativa(nombres: list, X: np.ndarray, pesos: np.ndarray, alternativa: str) -> int:
+    if alternativa is None:
+        return int(np.argmax(X @ pesos))
+    if alternativa not in nombres:
+        raise ValueError(f"La alternativa '{alternativa}' no existe.")
+    return nombres.index(alternativa)
+
+
+# Datos para un gráfico de tornado
+def datos_tornado(alternativas,
+                  criterios: list = None,
+                  variacion: float = 0.5,
+                  alternativa: str = None) -> dict:
+    """
+    Score de `alternativa` cuando el peso de cada criterio baja o sube un
+    `variacion` relativo (0.5 = ±50 %). Las barras van ordenadas de mayor
+    a menor amplitud, como se dibujan en el tornado.
+    """
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    i      = _indice_alternativa(nombres, X, pesos, alternativa)
+    restos = _restos(X, pesos)[i]
+
+    bajo = np.clip(pesos * (1 - variacion), 0.0, 1.0)
+    alto = np.clip(pesos * (1 + variacion), 0.0, 1.0)
+    score_bajo = bajo * X[i] + (1 - bajo) * restos
+    score_alto = alto * X[i] + (1 - alto) * restos
+    amplitud   = np.abs(score_alto - score_bajo)
+
+    barras = [{
+        "criterio":   nombres_crit[j],
+        "peso_bajo":  float(bajo[j]),
+        "peso_alto":  float(alto[j]),
+        "score_bajo": float(score_bajo[j]),
+        "score_alto": float(score_alto[j]),
+        "amplitud":   float(amplitud[j])
+    } for j in np.argsort(-amplitud, kind="stable")]
+
+    return {"alternativa": nombres[i], "score_base": float(X[i] @ pesos), "barras": barras}
+
+
+# Datos para un gráfico de araña (spider)
+def datos_arana(alternativas,
+                criterios: list = None,
+                variacion: float = 0.5,
+                puntos: int = 21,
+                alternativa: str = None) -> dict:
+    """
+    Una línea por criterio con el score de `alternativa` cuando su peso
+    cambia de -variacion a +variacion (relativo) y los demás se reescalan.
+    """
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    i      = _indice_alternativa(nombres, X, pesos, alternativa)
+    restos = _restos(X, pesos)[i]
+
+    cambios = np.linspace(-variacion, variacion, puntos)
+    t       = np.clip(pesos[:, None] * (1 + cambios), 0.0, 1.0)     # (criterios × puntos)
+    lineas  = t * X[i][:, None] + (1 - t) * restos[:, None]
+
+    return {
+        "alternativa": nombres[i],
+        "variaciones": cambios.tolist(),
+        "lineas":      dict(zip(nombres_crit, lineas.tolist()))
+    }
+
+
+if __name__ == "__main__":
+    try:
+        from excel_reader import leer_alternativas, leer_criterios
+
+        archivo = "plantilla.xlsx"
+        alternativas, err = leer_alternativas(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+        criterios, err = leer_criterios(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        barrido = barrido_pesos(alternativas, criterios, puntos=1001)
+        print("=" * 55)
+        print("   PUNTOS DE INVERSIÓN DEL RANKING")
+        print("=" * 55)
+        for inv in barrido["inversiones"]:
+            actual   = barrido["pesos_actuales"][inv["criterio"]]
+            antes    = inv["posiciones_antes"]
+            despues  = inv["posiciones_despues"]
+            print(f"  {inv['criterio']:<15} peso {inv['peso'] * 100:5.1f}% "
+                  f"(actual {actual * 100:.1f}%): {inv['despues']} "
+                  f"({antes[inv['despues']]}° → {despues[inv['despues']]}°) supera a "
+                  f"{inv['antes']} ({antes[inv['antes']]}° → {despues[inv['antes']]}°)")
+        if not barrido["inversiones"]:
+            print("  El orden no cambia con ningún peso.")
+
+        tornado = datos_tornado(alternativas, criterios)
+        print(f"\n   TORNADO (±50% de peso) — {tornado['alternativa']}")
+        for barra in tornado["barras"]:
+            print(f"  {barra['criterio']:<15} {barra['score_bajo']:.4f} – {barra['score_alto']:.4f}"
+                  f"  {'█' * int(barra['amplitud'] * 100)}")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
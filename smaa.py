@@ -0,0 +1,229 @@
+# Análisis de aceptabilidad estocástica (SMAA-2)
+
+import os
+
+import numpy as np
+
+import montecarlo
+from modelo import como_problema
+from montecarlo import (MAX_ELEMENTOS_BLOQUE, TAM_BLOQUE_DEFECTO, _ejecutar_tramos,
+                        _muestrear_normalizados, _muestrear_pesos, _preparar_modelo,
+                        _puntuar, _semillas_bloques)
+
+
+# Conteo de posiciones: conteos[i, r] = veces que la alternativa i quedó en el lugar r
+def _conteos_rangos(scores: np.ndarray, max_rango: int) -> np.ndarray:
+    """
+    `scores` es (alternativas × iteraciones). Con max_rango < alternativas
+    solo se ordenan los primeros lugares (argpartition + argsort parcial).
+    """
+    n_alt = scores.shape[0]
+    if max_rango < n_alt:
+        candidatos = np.argpartition(-scores, max_rango - 1, axis=0)[:max_rango]
+        parciales  = np.take_along_axis(scores, candidatos, axis=0)
+        orden      = np.take_along_axis(candidatos,
+                                        np.argsort(-parciales, axis=0, kind="stable"), axis=0)
+    else:
+        orden = np.argsort(-scores, axis=0, kind="stable")
+
+    # orden[r, k] = alternativa en el lugar r de la iteración k
+    indices = orden * max_rango + np.arange(max_rango)[:, None]
+    return np.bincount(indices.ravel(), minlength=n_alt * max_rango).reshape(n_alt, max_rango)
+
+
+# Matriz de aceptabilidad de rangos a partir de una matriz de scores
+def matriz_aceptabilidad(scores: np.ndarray, max_rango: int = None) -> np.ndarray:
+    """
+    Retorna b (alternativas × posiciones): b[i, r] es la probabilidad de que
+    la alternativa i quede en el lugar r + 1. La primera columna coincide
+    con prob_ganar de Monte Carlo.
+    """
+    n_alt, n = scores.shape
+    max_rango = n_alt if max_rango is None else min(max_rango, n_alt)
+    return _conteos_rangos(scores, max_rango) / n
+
+
+# Bloques acotados por el mayor arreglo por iteración de cada pasada
+def _tam_bloque(elementos_iteracion: int) -> int:
+    return max(min(TAM_BLOQUE_DEFECTO, MAX_ELEMENTOS_BLOQUE // max(elementos_iteracion, 1)), 1)
+
+
+def _modelo_de(modelo: dict) -> dict:
+    return modelo if modelo is not None else montecarlo._MODELO_TRABAJADOR
+
+
+# Primera pasada: posiciones y suma de pesos de cada ganador, por bloque
+def _aceptabilidad_tramo(tramo: list, modelo: dict = None) -> list:
+    modelo = _modelo_de(modelo)
+    n_alt  = len(modelo["nombres"])
+
+    parciales = []
+    for n, semilla in tramo:
+        rng    = np.random.default_rng(semilla)
+        norm   = _muestrear_normalizados(modelo, n, rng)
+        pesos  = _muestrear_pesos(modelo, n, rng)
+        scores = _puntuar(modelo, norm, pesos)
+
+        ganador    = np.argmax(scores, axis=0)
+        suma_pesos = np.stack([np.bincount(ganador, weights=pesos[:, j], minlength=n_alt)
+                               for j in range(pesos.shape[1])], axis=1)
+        parciales.append((_conteos_rangos(scores, modelo["max_rango"]), suma_pesos))
+    return parciales
+
+
+# Segunda pasada: cuántas veces gana cada alternativa con su vector central
+def _confianza_tramo(tramo: list, modelo: dict = None) -> np.ndarray:
+    modelo     = _modelo_de(modelo)
+    candidatas = modelo["candidatas"]                # alternativas que alguna vez ganan
+    centrales  = modelo["pesos_centrales"][candidatas]
+    aciertos   = np.zeros(len(candidatas), dtype=np.int64)
+
+    for n, semilla in tramo:
+        norm = _muestrear_normalizados(modelo, n, np.random.default_rng(semilla))
+        if modelo["metodo"] == "wsm":
+            scores  = norm @ centrales.T             # (n, alternativa evaluada, vector central)
+            ganador = np.argmax(scores, axis=1)
+            aciertos += (ganador == candidatas).sum(axis=0)
+        else:
+            # Los demás métodos no son lineales en los pesos: un vector central a la vez
+            for k, i in enumerate(candidatas):
+                aciertos[k] += np.count_nonzero(np.argmax(_puntuar(modelo, norm, centrales[k]),
+                                                          axis=0) == i)
+    return aciertos
+
+
+def analizar_smaa(alternativas,
+                  criterios: list = None,
+                  pesos_normalizados: dict = None,
+                  iteraciones: int = 10000,
+                  semilla: int = None,
+                  procesos: int = 1,
+                  max_rango: int = None,
+                  muestreo: str = "aleatorio",
+                  correlaciones: list = None,
+                  incertidumbre_pesos: str = None,
+                  concentracion: float = 100.0,
+                  comparaciones=None,
+                  dispersion_juicios: float = 0.2,
+                  metodo: str = "wsm",
+                  parametros_metodo: dict = None) -> dict:
+    """
+    SMAA-2 sobre la misma simulación de valores y pesos que Monte Carlo.
+    Acepta registros o un DecisionProblem (sin `criterios`).
+
+    pesos_normalizados: None = sin información de preferencias (pesos
+    uniformes sobre el simplex); un dict {criterio: peso} los fija o, con
+    incertidumbre_pesos="dirichlet", los usa como centro. Con
+    incertidumbre_pesos="ahp" los pesos salen de `comparaciones`
+    perturbadas (ver montecarlo._muestrear_pesos).
+
+    metodo: cómo se ordenan las alternativas en cada iteración ("wsm",
+    "topsis", "vikor" o "promethee", ver mcda.py), así que la aceptabilidad
+    de rangos sale para cualquiera de ellos.
+
+    Retorna un dict con:
+      - "aceptabilidad": {alternativa: [P(lugar 1), P(lugar 2), …]}
+        (hasta `max_rango` lugares);
+      - "pesos_centrales": {alternativa: {criterio: peso}}, el vector de
+        pesos promedio con el que cada alternativa gana (None si nunca gana);
+      - "confianza": {alternativa: P(ganar con su vector central)} (None si
+        nunca gana);
+      - "iteraciones".
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+
+    problema     = como_problema(alternativas, criterios)
+    nombres_crit = problema.criterios
+    if pesos_normalizados is None:
+        pesos_normalizados  = {n: 1 / len(nombres_crit) for n in nombres_crit}
+        incertidumbre_pesos = "simplex"
+
+    modelo = _preparar_modelo(problema, pesos_normalizados=pesos_normalizados,
+                              muestreo=muestreo, correlaciones=correlaciones,
+                              incertidumbre_pesos=incertidumbre_pesos,
+                              concentracion=concentracion,
+                              comparaciones=comparaciones,
+                              dispersion_juicios=dispersion_juicios,
+                              metodo=metodo, parametros_metodo=parametros_metodo)
+    nombres = modelo["nombres"]
+    n_alt   = len(nombres)
+    modelo["max_rango"] = n_alt if max_rango is None else min(max_rango, n_alt)
+
+    raiz = np.random.SeedSequence(semilla)
+
+    # 1) Aceptabilidad de rangos y pesos centrales
+    conteos    = np.zeros((n_alt, modelo["max_rango"]), dtype=np.int64)
+    suma_pesos = np.zeros((n_alt, len(nombres_crit)))
+    bloques    = _semillas_bloques(raiz, iteraciones, _tam_bloque(modelo["mins"].size))
+    for parciales in _ejecutar_tramos(_aceptabilidad_tramo, modelo, bloques, procesos):
+        for conteos_b, suma_b in parciales:
+            conteos    += conteos_b
+            suma_pesos += suma_b
+
+    victorias = conteos[:, 0]
+    gana      = victorias > 0
+    centrales = np.zeros_like(suma_pesos)
+    centrales[gana] = suma_pesos[gana] / victorias[gana, None]
+
+    # 2) Factores de confianza con valores nuevos, solo para quienes ganan
+    candidatas = np.flatnonzero(gana)
+    modelo["pesos_centrales"] = centrales
+    modelo["candidatas"]      = candidatas
+
+    aciertos = np.zeros(n_alt, dtype=np.int64)
+    bloques  = _semillas_bloques(raiz, iteraciones,
+                                 _tam_bloque(max(modelo["mins"].size, n_alt * len(candidatas))))
+    for parcial in _ejecutar_tramos(_confianza_tramo, modelo, bloques, procesos):
+        aciertos[candidatas] += parcial
+
+    return {
+        "aceptabilidad": {
+            nombre: (conteos[i] / iteraciones).tolist() for i, nombre in enumerate(nombres)
+        },
+        "pesos_centrales": {
+            nombre: dict(zip(nombres_crit, centrales[i].tolist())) if gana[i] else None
+            for i, nombre in enumerate(nombres)
+        },
+        "confianza": {
+            nombre: float(aciertos[i] / iteraciones) if gana[i] else None
+            for i, nombre in enumerate(nombres)
+        },
+        "iteraciones": iteraciones
+    }
+
+
+# Probabilidad de quedar entre los k primeros
+def prob_top(resultado: dict, k: int) -> dict:
+    return {nombre: float(sum(b[:k])) for nombre, b in resultado["aceptabilidad"].items()}
+
+
+if __name__ == "__main__":
+    try:
+        from excel_reader import leer_alternativas, leer_criterios
+
+        archivo = "plantilla.xlsx"
+        alternativas, err = leer_alternativas(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+        criterios, err = leer_criterios(archivo)
+        if err:
+            print(f"[!] {err}")
+            exit(1)
+
+        resultado = analizar_smaa(alternativas, criterios, iteraciones=20000, semilla=42)
+        top3      = prob_top(resultado, 3)
+
+        print("=" * 60)
+        print("   ACEPTABILIDAD DE RANGOS (pesos desconocidos)")
+        print("=" * 60)
+        for nombre, b in resultado["aceptabilidad"].items():
+            lugares = "  ".join(f"{p * 100:5.1f}%" for p in b)
+            confianza = resultado["confianza"][nombre]
+            texto_conf = f"{confianza * 100:.1f}%" if confianza is not None else "—"
+            print(f"{nombre:<20} {lugares}   top-3: {top3[nombre] * 100:5.1f}%   "
+                  f"confianza: {texto_conf}")
+
+    except FileNotFoundError:
+        print("[!] No se encontró plantilla.xlsx.")
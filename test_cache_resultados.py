@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+import cache_resultados
+from cache_resultados import CacheResultados, clave_analisis
+
+ALTERNATIVAS = [{"Alternativa": "A", "Costo_Min": 800, "Costo_Max": 1200}]
+CRITERIOS    = [{"Criterio": "Costo", "Importancia (1-10)": 9, "Tipo": "minimizar"}]
+PESOS        = {"Costo": 1.0}
+
+
+def test_clave_ignora_representacion_de_los_numeros():
+    enteros = clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=1)
+    numpy   = clave_analisis([{"Alternativa": "A ", "Costo_Min": np.int64(800),
+                               "Costo_Max": 1200.0}], CRITERIOS, PESOS, np.int64(1000), semilla=1)
+    assert enteros == numpy
+
+
+def test_clave_cambia_con_opciones_version_y_codigo(monkeypatch):
+    base = clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=1)
+
+    assert clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=2) != base
+    assert clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=1,
+                          muestreo="sobol") != base
+
+    monkeypatch.setattr(cache_resultados, "VERSION_CACHE", cache_resultados.VERSION_CACHE + 1)
+    assert clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=1) != base
+    monkeypatch.undo()
+
+    monkeypatch.setattr(cache_resultados, "_HUELLA_CODIGO", "otro código")
+    assert clave_analisis(ALTERNATIVAS, CRITERIOS, PESOS, 1000, semilla=1) != base
+
+
+def test_memoria_lru_y_copias():
+    cache = CacheResultados(directorio=None, max_memoria=2)
+    cache.guardar("a", {"x": [1]})
+    cache.guardar("b", 2)
+    cache.obtener("a")                     # "a" pasa a ser la más reciente
+    cache.guardar("c", 3)
+
+    assert cache.obtener("b") is None
+    copia = cache.obtener("a")
+    copia["x"].append(2)
+    assert cache.obtener("a") == {"x": [1]}
+
+
+def test_disco_compartido_y_archivo_danado(tmp_path):
+    escritor = CacheResultados(directorio=str(tmp_path))
+    escritor.guardar("ab" * 32, {"ganador": "A"})
+
+    lector = CacheResultados(directorio=str(tmp_path))
+    assert lector.obtener("ab" * 32) == {"ganador": "A"}
+
+    ruta = lector._ruta("cd" * 32)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "wb") as f:
+        f.write(b"no es un pickle")
+    assert lector.obtener("cd" * 32) is None
+    assert not os.path.exists(ruta)
+
+
+def test_disco_poda_los_menos_usados(tmp_path):
+    cache = CacheResultados(directorio=str(tmp_path), max_memoria=0, max_bytes_disco=5000)
+    claves = [f"{i:02d}" * 32 for i in range(4)]
+    for i, clave in enumerate(claves):
+        cache.guardar(clave, bytes(1000))
+        os.utime(cache._ruta(clave), (i, i))
+
+    # La quinta entrada excede el límite: sale la de uso más antiguo
+    cache.guardar("ff" * 32, bytes(1000))
+    assert cache.obtener(claves[0]) is None
+    assert cache.obtener(claves[1]) == bytes(1000)
+    assert cache.obtener("ff" * 32) == bytes(1000)
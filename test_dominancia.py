@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from dominancia import _dominan, _intervalos, frontera_dominancia
+from modelo import como_problema
+from montecarlo import simular_todas
+
+
+@pytest.mark.parametrize("tam_bloque", [4, 256])
+def test_frontera_igual_a_fuerza_bruta(problema_aleatorio, monkeypatch, tam_bloque):
+    monkeypatch.setattr("dominancia.TAM_BLOQUE_DOMINANCIA", tam_bloque)
+    rng = np.random.default_rng(tam_bloque)
+
+    for _ in range(20):
+        problema    = como_problema(*problema_aleatorio(rng, n_alt=60, n_crit=3))
+        peor, mejor = _intervalos(problema)
+        dominadas   = _dominan(peor, mejor).any(axis=0)
+
+        filtro = frontera_dominancia(problema)
+        assert filtro["no_dominadas"] == np.flatnonzero(~dominadas).tolist()
+
+        # Cada dominadora reportada está en la frontera y domina de verdad
+        indice = {n: i for i, n in enumerate(problema.nombres)}
+        assert {indice[n] for n in filtro["dominadas"]} == set(np.flatnonzero(dominadas))
+        for nombre, dominadora in filtro["dominadas"].items():
+            a, b = indice[dominadora], indice[nombre]
+            assert a in filtro["no_dominadas"]
+            assert _dominan(peor[[a]], mejor[[b]])[0, 0]
+
+
+def test_dominadas_nunca_ganan(problema_aleatorio):
+    alternativas, criterios = problema_aleatorio(np.random.default_rng(5), n_alt=30, n_crit=3)
+    filtro    = frontera_dominancia(alternativas, criterios)
+    resultado = simular_todas(alternativas, criterios, iteraciones=5000, semilla=1,
+                              incertidumbre_pesos="simplex")
+
+    assert filtro["dominadas"]
+    for nombre in filtro["dominadas"]:
+        assert resultado["resultados"][nombre]["prob_ganar"] == 0
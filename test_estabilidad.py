@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from ahp_wsm import intervalos_estabilidad, matriz_normalizada, normalizar_pesos
+
+
+# Registros (alternativas, criterios) a partir de una matriz de valores fijos
+def _registros(valores: np.ndarray, importancias: list) -> tuple:
+    criterios = [{"Criterio": f"C{j + 1}", "Importancia (1-10)": imp, "Tipo": "maximizar"}
+                 for j, imp in enumerate(importancias)]
+    alternativas = []
+    for i, fila in enumerate(valores):
+        registro = {"Alternativa": f"A{i + 1}"}
+        for j, valor in enumerate(fila):
+            registro[f"C{j + 1}_Min"] = registro[f"C{j + 1}_Max"] = float(valor)
+        alternativas.append(registro)
+    return alternativas, normalizar_pesos(criterios)
+
+
+# Scores con el peso j movido a t y los demás reescalados en proporción
+def _scores_barrido(X: np.ndarray, pesos: np.ndarray, j: int, t: np.ndarray) -> np.ndarray:
+    resto = np.delete(np.arange(pesos.size), j)
+    W = np.zeros((t.size, pesos.size))
+    W[:, j] = t
+    W[:, resto] = pesos[resto] * ((1 - t) / (1 - pesos[j]))[:, None]
+    return W @ X.T
+
+
+def _verificar_contra_barrido(alternativas, criterios, margen=1e-3):
+    estabilidad = intervalos_estabilidad(alternativas, criterios)
+    nombres, nombres_crit, X, pesos = matriz_normalizada(alternativas, criterios)
+    t = np.linspace(0.0, 1.0, 2001)
+
+    for j, criterio in enumerate(nombres_crit):
+        info   = estabilidad["criterios"][criterio]
+        scores = _scores_barrido(X, pesos, j, t)
+        ganadores = np.array(nombres)[np.argmax(scores, axis=1)]
+
+        # Dentro del intervalo gana siempre el mismo
+        dentro = (t > info["minimo"] + margen) & (t < info["maximo"] - margen)
+        assert (ganadores[dentro] == estabilidad["ganador"]).all()
+
+        # Dentro del intervalo del ranking no cambia el orden completo
+        rango  = estabilidad["ranking"][criterio]
+        dentro = (t > rango["minimo"] + margen) & (t < rango["maximo"] - margen)
+        ordenes = np.argsort(-scores[dentro], axis=1, kind="stable")
+        assert (ordenes == np.argsort(-(X @ pesos), kind="stable")).all()
+
+        # Fuera del intervalo gana otro, y el rival existe solo si hay cruce
+        for lado, fuera in (("minimo", t < info["minimo"] - margen),
+                            ("maximo", t > info["maximo"] + margen)):
+            rival = info[f"rival_{lado}"]
+            assert (rival is None) == (not fuera.any())
+            if fuera.any():
+                # Justo pasado el límite gana el rival
+                cercano = np.flatnonzero(fuera)[-1 if lado == "minimo" else 0]
+                assert ganadores[cercano] == rival
+
+
+def test_limites_coinciden_con_barrido_de_pesos():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n_alt, n_crit = rng.integers(2, 7), rng.integers(2, 5)
+        valores      = rng.random((n_alt, n_crit))
+        importancias = rng.integers(1, 11, n_crit).tolist()
+        _verificar_contra_barrido(*_registros(valores, importancias))
+
+
+def test_cruce_fuera_de_rango_no_tiene_rival():
+    alternativas, criterios = _registros(np.array([[1, 1, 0], [0, 0, 1]]), [0.4, 5, 4.6])
+    info = intervalos_estabilidad(alternativas, criterios)["criterios"]["C1"]
+
+    assert info["minimo"] == pytest.approx(0.0)
+    assert info["maximo"] == pytest.approx(1.0)
+    assert info["rival_minimo"] is None
+    assert info["rival_maximo"] is None
+    _verificar_contra_barrido(alternativas, criterios)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from ahp_wsm import normalizar_pesos, rankear_alternativas
+from incremental import RankingIncremental, SimulacionIncremental
+from montecarlo import calcular_rangos_globales, simular_todas
+
+
+def _igual_a_rankear(motor, alternativas, criterios):
+    esperado = rankear_alternativas(alternativas, criterios)
+    obtenido = motor.ranking()
+
+    assert [r['alternativa'] for r in obtenido] == [r['alternativa'] for r in esperado]
+    for a, b in zip(obtenido, esperado):
+        assert a['score'] == pytest.approx(b['score'], abs=1e-4)
+        assert a['desglose'] == pytest.approx(b['desglose'], abs=1e-4)
+    assert motor.rangos_globales() == calcular_rangos_globales(alternativas, criterios)
+
+
+def test_ranking_tras_ediciones_igual_a_rankear(problema_aleatorio):
+    rng = np.random.default_rng(0)
+    alternativas, criterios = problema_aleatorio(rng, n_alt=12)
+    motor = RankingIncremental(alternativas, criterios)
+    _igual_a_rankear(motor, alternativas, criterios)
+
+    for paso in range(60):
+        accion = paso % 4
+        if accion == 0:
+            # Editar una fila, a veces llevándola fuera de los extremos actuales
+            i = int(rng.integers(len(alternativas)))
+            editada = dict(alternativas[i])
+            for c in criterios:
+                factor = rng.choice([0.5, 0.95, 1.05, 2.0])
+                editada[f"{c['Criterio']}_Min"] *= factor
+                editada[f"{c['Criterio']}_Max"] *= factor
+            alternativas[i] = editada
+            motor.actualizar_alternativa(editada)
+        elif accion == 1:
+            nueva = dict(alternativas[0], Alternativa=f"N{paso}")
+            for c in criterios:
+                nueva[f"{c['Criterio']}_Min"] *= rng.uniform(0.5, 2.0)
+                nueva[f"{c['Criterio']}_Max"] = nueva[f"{c['Criterio']}_Min"] + rng.uniform(0, 30)
+            alternativas.append(nueva)
+            motor.agregar_alternativa(nueva)
+        elif accion == 2 and len(alternativas) > 3:
+            # Eliminar la que tiene el extremo de un criterio obliga a recalcularlo
+            i = int(np.argmax([a["C1_Max"] for a in alternativas]))
+            motor.eliminar_alternativa(alternativas.pop(i)['Alternativa'])
+        else:
+            for c in criterios:
+                c['Importancia (1-10)'] = int(rng.integers(1, 11))
+            criterios = normalizar_pesos(criterios)
+            motor.actualizar_pesos([c['peso'] for c in criterios])
+
+        _igual_a_rankear(motor, alternativas, criterios)
+
+
+def test_sincronizar_igual_a_rankear(problema_aleatorio):
+    rng = np.random.default_rng(1)
+    alternativas, criterios = problema_aleatorio(rng, n_alt=20)
+    motor = RankingIncremental(alternativas, criterios)
+
+    # Pocos cambios: se aplican fila por fila
+    editadas = [dict(a) for a in alternativas[1:]]
+    editadas[3]["C2_Min"] *= 3
+    editadas.append(dict(alternativas[0], Alternativa="Nueva"))
+    estado = motor.sincronizar(editadas, criterios)
+    assert not estado["reconstruido"]
+    _igual_a_rankear(motor, editadas, criterios)
+
+    # Otro orden de las alternativas: se reconstruye
+    invertidas = editadas[::-1]
+    assert motor.sincronizar(invertidas, criterios)["reconstruido"]
+    _igual_a_rankear(motor, invertidas, criterios)
+
+
+def test_simulacion_tras_editar_igual_a_corrida_nueva(plantilla):
+    alternativas, criterios = plantilla
+    simulacion = SimulacionIncremental()
+    simulacion.simular(alternativas, criterios, iteraciones=5000, semilla=3)
+
+    # Editar la que tiene el mínimo de un criterio re-normaliza a todas
+    editadas = [dict(a) for a in alternativas]
+    editadas[-1]["Costo_Min"] *= 0.5
+    reuso = simulacion.simular(editadas, criterios, iteraciones=5000, semilla=3)
+    nueva = SimulacionIncremental().simular(editadas, criterios, iteraciones=5000, semilla=3)
+
+    assert reuso.pop("redibujadas") == [editadas[-1]["Alternativa"]]
+    assert len(nueva.pop("redibujadas")) == len(editadas)
+    np.testing.assert_equal(reuso, nueva)
+
+
+def test_simulacion_no_depende_de_procesos_ni_filtros(problema_aleatorio):
+    alternativas, criterios = problema_aleatorio(np.random.default_rng(2), n_alt=25, n_crit=3)
+    opciones = {"iteraciones": 3000, "semilla": 11}
+
+    uno = SimulacionIncremental().simular(alternativas, criterios, procesos=1, **opciones)
+    dos = SimulacionIncremental().simular(alternativas, criterios, procesos=2, **opciones)
+    np.testing.assert_equal(uno, dos)
+
+    # Las dominadas nunca ganan: quitarlas no cambia a las demás
+    simulacion = SimulacionIncremental()
+    simulacion.simular(alternativas, criterios, **opciones)
+    filtrada = simulacion.simular(alternativas, criterios, filtrar_dominadas=True, **opciones)
+    assert filtrada["dominadas"] and filtrada["redibujadas"] == []
+    for nombre, stats in filtrada["resultados"].items():
+        np.testing.assert_equal(stats, uno["resultados"][nombre])
+
+    # Top k: las mismas finalistas que simular_todas, sin volver a muestrear
+    top = simulacion.simular(alternativas, criterios, top_k=5, **opciones)
+    assert top["finalistas"] == simular_todas(alternativas, criterios, top_k=5, **opciones)["finalistas"]
+    assert top["redibujadas"] == [] and set(top["resultados"]) == set(top["finalistas"])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from ahp_wsm import pesos_ahp, rankear_alternativas
+from lote import evaluar_lote
+from montecarlo import simular_todas
+
+
+# Problemas de tamaños variados (alternativas y criterios) para un lote
+def _lote(problema_aleatorio, rng, n: int = 12) -> list:
+    return [problema_aleatorio(rng, n_alt=int(rng.integers(2, 9)), n_crit=int(rng.integers(2, 6)))
+            for _ in range(n)]
+
+
+# Matriz de Saaty recíproca a partir de pesos con algo de ruido
+def _comparaciones(rng, n_crit: int) -> np.ndarray:
+    pesos = rng.dirichlet(np.ones(n_crit))
+    ruido = rng.normal(0, 0.1, (n_crit, n_crit))
+    return pesos[:, None] / pesos[None, :] * np.exp(ruido - ruido.T)
+
+
+def test_ranking_y_pesos_iguales_a_cada_problema(problema_aleatorio):
+    rng   = np.random.default_rng(0)
+    lote  = _lote(problema_aleatorio, rng)
+    comps = [_comparaciones(rng, len(c)) if k % 2 else None for k, (_, c) in enumerate(lote)]
+
+    salida = evaluar_lote(lote, comparaciones=comps, iteraciones=200, semilla=1)
+
+    for (alternativas, criterios), comp, res in zip(lote, comps, salida):
+        consistencia = None
+        if comp is not None:
+            criterios, consistencia = pesos_ahp(criterios, comp)
+            assert res["consistencia"] == pytest.approx(consistencia)
+        else:
+            assert res["consistencia"] is None
+
+        esperado = rankear_alternativas(alternativas, criterios)
+        assert [r['alternativa'] for r in res["ranking"]] == [r['alternativa'] for r in esperado]
+        for a, b in zip(res["ranking"], esperado):
+            assert a['score'] == pytest.approx(b['score'], abs=1e-4)
+            assert a['desglose'] == pytest.approx(b['desglose'], abs=1e-4)
+
+
+def test_montecarlo_coincide_en_distribucion_con_simular_todas(problema_aleatorio):
+    rng  = np.random.default_rng(1)
+    lote = _lote(problema_aleatorio, rng, n=6)
+
+    salida = evaluar_lote(lote, iteraciones=40000, semilla=2, incertidumbre_pesos="dirichlet")
+
+    for problema, res in zip(lote, salida):
+        separado = simular_todas(*problema, iteraciones=40000, semilla=3,
+                                 incertidumbre_pesos="dirichlet")
+        assert res["montecarlo"].keys() == separado.keys()
+        for nombre, stats in separado["resultados"].items():
+            obtenido = res["montecarlo"]["resultados"][nombre]
+            assert obtenido.keys() == stats.keys()
+            assert obtenido["prob_ganar"] == pytest.approx(stats["prob_ganar"], abs=0.02)
+            assert obtenido["media"] == pytest.approx(stats["media"], abs=0.01)
+            assert obtenido["percentil_95"] == pytest.approx(stats["percentil_95"], abs=0.02)
+
+
+def test_lote_reproducible_y_sin_depender_de_procesos(problema_aleatorio):
+    lote = _lote(problema_aleatorio, np.random.default_rng(2))
+    # Un problema con correlaciones va por separado, con su propia semilla hija
+    correlaciones = [None] * len(lote)
+    criterios     = lote[0][1]
+    correlaciones[0] = [{"Criterio A": criterios[0]["Criterio"],
+                         "Criterio B": criterios[1]["Criterio"], "Correlacion": 0.5}]
+
+    uno = evaluar_lote(lote, correlaciones=correlaciones, iteraciones=2000, semilla=5, procesos=1)
+    dos = evaluar_lote(lote, correlaciones=correlaciones, iteraciones=2000, semilla=5, procesos=2)
+    np.testing.assert_equal(uno, dos)
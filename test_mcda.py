@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from mcda import (INDIFERENCIA, MAX_ALT_PARES, PREFERENCIA, _preferencia_neta,
+                  _preferencia_pares, puntuar, puntuar_promethee)
+
+
+@pytest.mark.parametrize("n_alt", [2, 5, 40])
+def test_preferencia_neta_igual_a_pares(n_alt):
+    rng = np.random.default_rng(n_alt)
+    bloque = rng.random((30, n_alt, 4))
+    # Empates y diferencias justo en los umbrales
+    bloque[:, 1] = bloque[:, 0]
+    bloque[:, -1] = np.clip(bloque[:, 0] + PREFERENCIA, 0, 1)
+
+    pares = _preferencia_pares(bloque, INDIFERENCIA, PREFERENCIA)
+    filas = np.swapaxes(bloque, 1, 2).reshape(-1, n_alt)
+    neta  = _preferencia_neta(filas, INDIFERENCIA, PREFERENCIA)
+    neta  = np.swapaxes(neta.reshape(30, 4, n_alt), 1, 2)
+
+    np.testing.assert_allclose(neta, pares, atol=1e-9)
+
+
+def test_promethee_por_orden_igual_a_pares(monkeypatch):
+    # Bloques de pocas iteraciones, para cubrir también los cortes entre bloques
+    monkeypatch.setattr("mcda.MAX_ELEMENTOS_PROMETHEE", 500)
+    rng    = np.random.default_rng(0)
+    n_alt  = MAX_ALT_PARES + 9
+    bloque = rng.random((50, n_alt, 3))
+    pesos  = rng.dirichlet(np.ones(3), 50)
+
+    esperado = _preferencia_pares(bloque, INDIFERENCIA, PREFERENCIA)
+    esperado = (esperado * pesos[:, None, :]).sum(axis=-1) / (n_alt - 1)
+    np.testing.assert_allclose(puntuar_promethee(bloque, pesos), esperado, atol=1e-9)
+
+
+@pytest.mark.parametrize("metodo", ["wsm", "topsis", "vikor", "promethee"])
+def test_lote_igual_a_cada_iteracion(metodo):
+    rng    = np.random.default_rng(1)
+    bloque = rng.random((20, 6, 3))
+    pesos  = rng.dirichlet(np.ones(3), 20)
+
+    lote = puntuar(metodo, bloque, pesos)
+    for k in range(20):
+        np.testing.assert_allclose(lote[k], puntuar(metodo, bloque[k], pesos[k]), atol=1e-12)
+
+
+@pytest.mark.parametrize("metodo", ["wsm", "topsis", "vikor", "promethee"])
+def test_alternativa_dominante_gana(metodo):
+    normalizados = np.array([[1.0, 1.0, 1.0],
+                             [0.5, 0.2, 0.7],
+                             [0.0, 0.0, 0.0]])
+    scores = puntuar(metodo, normalizados, np.array([0.5, 0.3, 0.2]))
+
+    assert np.argmax(scores) == 0
+    assert np.argmin(scores) == 2
+    if metodo in ("topsis", "vikor"):
+        assert scores[0] == pytest.approx(1.0)
+        assert scores[2] == pytest.approx(0.0)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from montecarlo import (_preparar_modelo, _semillas_bloques, _simular_matriz_bloques,
+                        _simular_por_bloques, calcular_reduccion_varianza, simular_todas)
+
+
+@pytest.mark.parametrize("opciones", [
+    {},
+    {"tam_bloque": 1000},
+    {"tolerancia": 0.01},
+    {"muestreo": "sobol", "antiteticas": True},
+    {"incertidumbre_pesos": "dirichlet", "metodo": "promethee"},
+])
+def test_resultado_no_depende_de_procesos(plantilla, opciones):
+    # Más de TAM_BLOQUE_DEFECTO iteraciones, para que el modo matriz reparta bloques
+    uno = simular_todas(*plantilla, iteraciones=150000, semilla=7, procesos=1, **opciones)
+    dos = simular_todas(*plantilla, iteraciones=150000, semilla=7, procesos=2, **opciones)
+    np.testing.assert_equal(uno, dos)
+
+
+def test_antiteticas_no_cambian_prob_ganar(plantilla):
+    base  = simular_todas(*plantilla, iteraciones=40000, semilla=1)
+    pares = simular_todas(*plantilla, iteraciones=40000, semilla=2, antiteticas=True)
+
+    for nombre, stats in base["resultados"].items():
+        assert pares["resultados"][nombre]["prob_ganar"] == pytest.approx(stats["prob_ganar"], abs=0.02)
+
+
+@pytest.mark.parametrize("opciones", [{}, {"tam_bloque": 1000}, {"tolerancia": 0.01}])
+def test_reduccion_varianza_en_todos_los_modos(plantilla, opciones):
+    resultado = simular_todas(*plantilla, iteraciones=40000, semilla=1,
+                              antiteticas=True, **opciones)
+    factores  = resultado["reduccion_varianza"]["factores"]
+
+    assert set(factores) == set(resultado["resultados"])
+    assert all(np.isfinite(f) and f > 1 for f in factores.values())
+
+
+def test_reduccion_varianza_por_bloques_igual_a_matriz(plantilla):
+    modelo  = _preparar_modelo(*plantilla, antiteticas=True)
+    bloques = _semillas_bloques(np.random.SeedSequence(3), 5000, 1000)
+
+    matriz     = _simular_matriz_bloques(modelo, bloques, 1)
+    acumulador = _simular_por_bloques(modelo, bloques, 1)
+
+    assert (acumulador.reduccion_varianza(modelo["nombres"])
+            == calcular_reduccion_varianza(matriz, modelo["nombres"], [1000] * 5))